@@ -5,6 +5,7 @@ from .session import (
     get_engine,
     get_session,
     get_session_context,
+    release_session,
     set_session_context,
 )
 
@@ -15,5 +16,6 @@ __all__ = [
     "get_engine",
     "get_session",
     "get_session_context",
+    "release_session",
     "set_session_context",
 ]
@@ -12,8 +12,18 @@ from .config import get_database_url, get_engine_kwargs, get_session_kwargs
 # Create engine (singleton)
 _engine = None
 
+
+class _SessionScope:
+    """Holder for a request's session, created on first use."""
+
+    __slots__ = ("session",)
+
+    def __init__(self):
+        self.session: Optional[Session] = None
+
+
 # ContextVar for request-scoped session
-_session_ctx: ContextVar[Optional[Session]] = ContextVar("db_session", default=None)
+_session_ctx: ContextVar[Optional[_SessionScope]] = ContextVar("db_session", default=None)
 
 
 def get_engine():
@@ -30,7 +40,9 @@ def get_session() -> Session:
     """Get the current request-scoped database session.
 
     This is the primary way to access the database session in services.
-    The session is automatically set by the database middleware.
+    The database middleware sets up the request scope; the session itself
+    is created on the first call, so requests that never touch the
+    database never create one.
 
     Usage in services:
         def my_service_function():
@@ -40,37 +52,57 @@ def get_session() -> Session:
     Raises:
         RuntimeError: If called outside of a request context
     """
-    session = _session_ctx.get()
-    if session is None:
+    scope = _session_ctx.get()
+    if scope is None:
         raise RuntimeError(
             "No database session in context. "
             "Ensure the request is processed through the database middleware, "
             "or use get_session_context() for non-request code."
         )
-    return session
+    if scope.session is None:
+        scope.session = Session(get_engine(), **get_session_kwargs())
+    return scope.session
+
+
+def release_session() -> None:
+    """Close the request-scoped session and return its connection to the pool.
+
+    Call this before long-running work that no longer needs the database,
+    such as streaming a model response, so the request does not hold a
+    pool slot until it finishes. A later get_session() call in the same
+    request opens a fresh session.
+
+    Usage in routes:
+        conversation = get_or_create_conversation(...)
+        release_session()
+        return StreamingResponse(...)
+    """
+    scope = _session_ctx.get()
+    if scope is not None and scope.session is not None:
+        scope.session.close()
+        scope.session = None
 
 
 @contextmanager
-def set_session_context() -> Generator[Session, None, None]:
+def set_session_context() -> Generator[None, None, None]:
     """Set up a request-scoped database session context.
 
-    Used by middleware to establish the session for a request.
-    The session is automatically available via get_session().
+    Used by middleware to establish the session scope for a request.
+    The session is created lazily by get_session() and closed on exit.
 
     Usage in middleware:
-        with set_session_context() as session:
+        with set_session_context():
             # handle request - session is available via get_session()
-            response = await call_next(request)
+            await self.app(scope, receive, send)
     """
-    engine = get_engine()
-    session_kwargs = get_session_kwargs()
-    session = Session(engine, **session_kwargs)
-    token: Token = _session_ctx.set(session)
+    session_scope = _SessionScope()
+    token: Token = _session_ctx.set(session_scope)
     try:
-        yield session
+        yield
     finally:
         _session_ctx.reset(token)
-        session.close()
+        if session_scope.session is not None:
+            session_scope.session.close()
 
 
 @contextmanager
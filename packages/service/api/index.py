@@ -1,35 +1,90 @@
 """
 Main FastAPI application entry point.
 """
+import os
+from contextlib import asynccontextmanager
+
 from dotenv import load_dotenv
 from fastapi import FastAPI
-from fastapi import Request as FastAPIRequest
-from vercel.headers import set_headers
 
-from .middleware.auth import authenticate_requests
-from .middleware.database import database_session_middleware
+from .middleware import (
+    AuthenticationMiddleware,
+    DatabaseSessionMiddleware,
+    ProfilingMiddleware,
+    RequestContextMiddleware,
+    VercelHeadersMiddleware,
+)
 from .routes import auth, conversations, agent, files, agents
+from .services.jwks_service import get_jwks_manager
+from .services.oidc_service import get_userinfo_client
+from .services.parse_queue import get_parse_queue
+from .services.s3_storage import get_async_s3_storage
+from .telemetry import (
+    get_loop_monitor_config,
+    get_profiler_config,
+    setup_metrics,
+    setup_tracing,
+    shutdown_metrics,
+    shutdown_tracing,
+    start_loop_monitor,
+    stop_loop_monitor,
+)
 
 load_dotenv(".env.local")
 
-app = FastAPI()
+# Tracing must be configured before Strands agents are created so that
+# their model/tool spans share our tracer provider
+setup_tracing()
+setup_metrics()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start and stop background tasks with the application."""
+    start_loop_monitor()
+    # Prefetch signing keys and the userinfo endpoint so the first request
+    # does not wait for the IdP
+    if os.getenv("OIDC_ISSUER"):
+        await get_jwks_manager().start()
+        await get_userinfo_client().start()
+    # Background document parsing; requeues documents left unfinished
+    await get_parse_queue().start()
+    yield
+    await get_parse_queue().stop()
+    await get_async_s3_storage().close()
+    if os.getenv("OIDC_ISSUER"):
+        await get_userinfo_client().stop()
+        await get_jwks_manager().stop()
+    stop_loop_monitor()
+    shutdown_metrics()
+    shutdown_tracing()
 
 
-# Vercel headers middleware
-@app.middleware("http")
-async def _vercel_set_headers(request: FastAPIRequest, call_next):
-    set_headers(dict(request.headers))
-    return await call_next(request)
+app = FastAPI(lifespan=lifespan)
 
 
 # Middleware execution order: last registered = first executed
-# So we register auth first (inner), then database (outer)
+# All middlewares are pure ASGI so that streamed (SSE) response bodies pass
+# straight through without per-chunk task and memory stream overhead
+
+# Vercel headers middleware (innermost)
+app.add_middleware(VercelHeadersMiddleware)
+
+# On-demand profiling middleware (needs the authenticated user
+# to check the admin gate; only registered when enabled)
+if get_profiler_config()["enabled"]:
+    app.add_middleware(ProfilingMiddleware)
+
+# Authentication middleware (needs session context)
+app.add_middleware(AuthenticationMiddleware)
 
-# Authentication middleware (runs second - needs session context)
-app.middleware("http")(authenticate_requests)
+# Database session middleware (sets up session context)
+app.add_middleware(DatabaseSessionMiddleware)
 
-# Database session middleware (runs first - sets up session context)
-app.middleware("http")(database_session_middleware)
+# Request context middleware (outermost - lets the loop monitor attribute
+# a blocked loop to the route being served; only registered when enabled)
+if get_loop_monitor_config()["enabled"]:
+    app.add_middleware(RequestContextMiddleware)
 
 
 # Register routers
@@ -1,7 +1,16 @@
 """
 Middleware package.
 """
-from .auth import authenticate_requests
-from .database import database_session_middleware
+from .auth import AuthenticationMiddleware
+from .database import DatabaseSessionMiddleware
+from .profiling import ProfilingMiddleware
+from .request_context import RequestContextMiddleware
+from .vercel import VercelHeadersMiddleware
 
-__all__ = ["authenticate_requests", "database_session_middleware"]
+__all__ = [
+    "AuthenticationMiddleware",
+    "DatabaseSessionMiddleware",
+    "ProfilingMiddleware",
+    "RequestContextMiddleware",
+    "VercelHeadersMiddleware",
+]
@@ -3,12 +3,15 @@ Authentication middleware for API routes.
 """
 import logging
 import os
+from typing import Optional
 
-from fastapi import Request as FastAPIRequest
 from fastapi.responses import JSONResponse
+from starlette.requests import Request
+from starlette.types import ASGIApp, Receive, Scope, Send
 
 from ..database.session import get_session
 from ..services.user_service import get_or_create_user
+from ..telemetry import start_span
 from ..utils.auth import verify_token
 
 logger = logging.getLogger(__name__)
@@ -17,17 +20,35 @@ logger = logging.getLogger(__name__)
 PUBLIC_PATHS = frozenset(["/health", "/docs", "/openapi.json", "/redoc"])
 
 
-async def authenticate_requests(request: FastAPIRequest, call_next):
+class AuthenticationMiddleware:
     """
     Global authentication middleware for all API routes.
     Verifies JWT token for all /api/* endpoints and loads user from database.
     """
-    # Skip authentication for public endpoints
-    if request.url.path in PUBLIC_PATHS:
-        return await call_next(request)
 
-    # Check if this is an API endpoint that requires authentication
-    if request.url.path.startswith("/api/"):
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        # Skip authentication for public endpoints and non-API paths
+        if (
+            scope["type"] != "http"
+            or scope["path"] in PUBLIC_PATHS
+            or not scope["path"].startswith("/api/")
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        request = Request(scope)
+        error_response = await self._authenticate(request)
+        if error_response is not None:
+            await error_response(scope, receive, send)
+            return
+
+        await self.app(scope, receive, send)
+
+    async def _authenticate(self, request: Request) -> Optional[JSONResponse]:
+        """Authenticate the request, returning an error response on failure."""
         # Get authorization header
         auth_header = request.headers.get("authorization")
 
@@ -59,15 +80,16 @@ async def authenticate_requests(request: FastAPIRequest, call_next):
 
         # Verify token
         try:
-            user_claims = verify_token(token, issuer, audience)
-            # Store user claims in request state for use in route handlers
-            request.state.user = user_claims
+            with start_span("middleware.authenticate"):
+                user_claims = await verify_token(token, issuer, audience)
+                # Store user claims in request state for use in route handlers
+                request.state.user = user_claims
 
-            # Get or create user from database
-            # Session is available via ContextVar (set by database middleware)
-            session = get_session()
-            db_user = get_or_create_user(session, user_claims, token)
-            request.state.db_user = db_user
+                # Get or create user from database
+                # Session is available via ContextVar (set by database middleware)
+                session = get_session()
+                db_user = await get_or_create_user(session, user_claims, token)
+                request.state.db_user = db_user
 
         except Exception as e:
             logger.error(f"Authentication failed: {str(e)}")
@@ -76,4 +98,4 @@ async def authenticate_requests(request: FastAPIRequest, call_next):
                 content={"detail": f"Token verification failed: {str(e)}"}
             )
 
-    return await call_next(request)
+        return None
@@ -1,22 +1,33 @@
 """
 Database middleware for request-scoped session management.
 """
-from fastapi import Request as FastAPIRequest
+from starlette.types import ASGIApp, Receive, Scope, Send
 
 from ..database.session import set_session_context
+from ..telemetry import start_span
 
 
-async def database_session_middleware(request: FastAPIRequest, call_next):
+class DatabaseSessionMiddleware:
     """
-    Middleware that sets up a database session for each request.
+    Middleware that sets up a database session scope for each request.
 
     The session is available via get_session() in any service code
-    without needing to pass it explicitly.
+    without needing to pass it explicitly. It is only created when a
+    service first asks for it, and closed once the response is sent.
     """
-    # Only set up session for API routes that might need database access
-    if request.url.path.startswith("/api/"):
-        with set_session_context():
-            response = await call_next(request)
-            return response
 
-    return await call_next(request)
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        # Only set up session for API routes that might need database access
+        if scope["type"] != "http" or not scope["path"].startswith("/api/"):
+            await self.app(scope, receive, send)
+            return
+
+        with start_span(
+            "middleware.database_session",
+            {"http.method": scope["method"], "http.target": scope["path"]},
+        ):
+            with set_session_context():
+                await self.app(scope, receive, send)
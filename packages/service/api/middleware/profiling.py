@@ -0,0 +1,69 @@
+"""
+On-demand request profiling middleware.
+"""
+import logging
+
+from starlette.datastructures import MutableHeaders
+from starlette.requests import Request
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ..telemetry.profiler import start_request_profile
+from ..telemetry.request_context import bind_request, unbind_request
+from ..utils.auth import is_admin
+
+logger = logging.getLogger(__name__)
+
+# Trigger profiling with either the header or the query parameter
+PROFILE_HEADER = "x-debug-profile"
+PROFILE_QUERY_PARAM = "debug_profile"
+
+
+def _profile_requested(request: Request) -> bool:
+    value = request.headers.get(PROFILE_HEADER) or request.query_params.get(PROFILE_QUERY_PARAM)
+    return value is not None and value.lower() in ("1", "true")
+
+
+class ProfilingMiddleware:
+    """
+    Middleware that profiles a request when an administrator asks for it.
+
+    Must run after authentication: the trigger is ignored unless the
+    verified token belongs to a user listed in ADMIN_USER_IDS. The profile
+    covers the route handler and, for streaming responses, the whole body;
+    its id is returned in the X-Profile-Id response header.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request = Request(scope)
+        if not _profile_requested(request):
+            await self.app(scope, receive, send)
+            return
+
+        if not is_admin(getattr(request.state, "user", None)):
+            logger.warning(f"Ignoring profile request from non-admin user on {scope['path']}")
+            await self.app(scope, receive, send)
+            return
+
+        token = bind_request(scope)
+        profiler = start_request_profile(scope)
+        profile_id = profiler.profile_id if profiler is not None else "rate-limited"
+
+        async def send_with_profile_id(message: Message):
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message)["X-Profile-Id"] = profile_id
+            await send(message)
+
+        try:
+            # Returns once the (possibly streaming) body has been sent
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            if profiler is not None:
+                profiler.stop()
+            unbind_request(token)
@@ -0,0 +1,28 @@
+"""
+Request context middleware for out-of-band attribution.
+"""
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from ..telemetry.request_context import bind_request, unbind_request
+
+
+class RequestContextMiddleware:
+    """
+    Middleware that binds the request scope to the tasks serving it.
+
+    Lets the event loop monitor attribute a blocked loop to a route.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        token = bind_request(scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            unbind_request(token)
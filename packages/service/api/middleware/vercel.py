@@ -0,0 +1,21 @@
+"""
+Vercel request headers middleware.
+"""
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Receive, Scope, Send
+from vercel.headers import set_headers
+
+
+class VercelHeadersMiddleware:
+    """
+    Middleware that exposes the request headers to the Vercel SDK helpers
+    (e.g. geolocation and ip_address) for the duration of the request.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] == "http":
+            set_headers(dict(Headers(scope=scope)))
+        await self.app(scope, receive, send)
@@ -5,7 +5,19 @@ from .user import User
 from .agent import Agent, AgentCreate, AgentRead, AgentUpdate
 from .conversation import Conversation
 from .message import Message
-from .file_upload import FileUpload, FileUploadCreate, FileUploadRead
+from .file_blob import FileBlob
+from .document_chunk import DocumentChunk
+from .file_upload import (
+    FileParseStatusRead,
+    FileUpload,
+    FileUploadCreate,
+    FileUploadRead,
+    PresignedUploadComplete,
+    PresignedUploadCreate,
+    PresignedUploadPart,
+    PresignedUploadRead,
+    UploadedPart,
+)
 
 __all__ = [
     "UUIDMixin",
@@ -17,7 +29,15 @@ __all__ = [
     "AgentUpdate",
     "Conversation",
     "Message",
+    "FileBlob",
+    "DocumentChunk",
     "FileUpload",
     "FileUploadCreate",
     "FileUploadRead",
+    "FileParseStatusRead",
+    "PresignedUploadCreate",
+    "PresignedUploadPart",
+    "PresignedUploadRead",
+    "UploadedPart",
+    "PresignedUploadComplete",
 ]
@@ -0,0 +1,50 @@
+"""Document chunk model definition."""
+
+from typing import Dict, Optional
+from uuid import UUID
+
+from sqlalchemy import Index, Text, UniqueConstraint
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlmodel import SQLModel, Field, Column
+
+
+class DocumentChunk(SQLModel, table=True):
+    """A slice of a document's Markdown, indexed for lexical retrieval.
+
+    Documents too large to send whole are sent as the chunks that best
+    match the user's message (BM25 over the chunk's term frequencies).
+    Chunks are consecutive: joined in position order they give back the
+    whole Markdown. They are deleted with their file record.
+    """
+
+    __tablename__ = "document_chunks"
+    __table_args__ = (
+        # Also serves lookups by file
+        UniqueConstraint("file_uuid", "position"),
+        # Inverted index: finds the chunks containing any query term
+        Index("ix_document_chunks_term_freqs", "term_freqs", postgresql_using="gin"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    file_uuid: UUID = Field(
+        foreign_key="file_uploads.uuid",
+        ondelete="CASCADE",
+        description="UUID of the document's file record"
+    )
+    position: int = Field(
+        description="Order of the chunk in the document, from 0"
+    )
+    content: str = Field(
+        sa_column=Column(Text, nullable=False),
+        description="Markdown of the chunk"
+    )
+    token_count: int = Field(
+        description="Estimated model tokens of the content"
+    )
+    term_count: int = Field(
+        description="Number of indexed terms in the content"
+    )
+    term_freqs: Dict[str, int] = Field(
+        sa_column=Column(JSONB, nullable=False),
+        description="Occurrences of every indexed term"
+    )
@@ -0,0 +1,63 @@
+"""Content-addressed file blob model definition."""
+
+from typing import Optional
+
+from sqlalchemy import Text
+from sqlmodel import Field, Column
+
+from .base import TimestampMixin
+
+
+class FileBlob(TimestampMixin, table=True):
+    """Stored file content, shared by all uploads with the same bytes.
+
+    Uploads are hashed while they stream in; an upload whose SHA-256 is
+    already known reuses the blob's S3 object (and its parsed Markdown)
+    instead of storing the content again. For images the blob also
+    records the derivative sent to the model. The objects are deleted when
+    the last file record referencing the blob is deleted.
+    """
+
+    __tablename__ = "file_blobs"
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    sha256: str = Field(
+        max_length=64,
+        unique=True,
+        index=True,
+        description="Hex SHA-256 of the content"
+    )
+    s3_key: str = Field(
+        max_length=500,
+        description="S3 storage key/path of the content"
+    )
+    size: int = Field(
+        description="Content size in bytes"
+    )
+    mime_type: str = Field(
+        max_length=100,
+        description="MIME type the content was first uploaded as"
+    )
+    markdown_content: Optional[str] = Field(
+        default=None,
+        sa_column=Column(Text),
+        description="Parsed markdown content, reused by uploads of the same MIME type"
+    )
+    derivative_s3_key: Optional[str] = Field(
+        default=None,
+        max_length=500,
+        description="S3 key of the image prepared for LLM input (the original's key if usable as is)"
+    )
+    derivative_mime_type: Optional[str] = Field(
+        default=None,
+        max_length=100,
+        description="MIME type of the LLM-ready image"
+    )
+    derivative_size: Optional[int] = Field(
+        default=None,
+        description="Size of the LLM-ready image in bytes"
+    )
+    ref_count: int = Field(
+        default=1,
+        description="Number of file records referencing this blob"
+    )
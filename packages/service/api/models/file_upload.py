@@ -1,6 +1,6 @@
 """File upload model definition."""
 
-from typing import Optional, TYPE_CHECKING
+from typing import Dict, List, Optional, TYPE_CHECKING
 from uuid import UUID
 
 from sqlalchemy import Text
@@ -11,6 +11,15 @@ from .base import UUIDMixin, TimestampMixin
 if TYPE_CHECKING:
     from .user import User
 
+# Document parsing states. Images have nothing to parse and are stored as
+# completed, except images uploaded directly to S3, which stay pending until
+# their LLM-ready version is prepared. Direct uploads are processing while
+# their completion is verified.
+PARSE_STATUS_PENDING = "pending"
+PARSE_STATUS_PROCESSING = "processing"
+PARSE_STATUS_COMPLETED = "completed"
+PARSE_STATUS_FAILED = "failed"
+
 
 class FileUploadBase(SQLModel):
     """Base file upload fields."""
@@ -31,6 +40,12 @@ class FileUploadBase(SQLModel):
         sa_column=Column(Text),
         description="Parsed markdown content from the document"
     )
+    parse_status: str = Field(
+        default=PARSE_STATUS_COMPLETED,
+        max_length=20,
+        index=True,
+        description="Document parsing state: pending, processing, completed or failed"
+    )
 
 
 class FileUpload(FileUploadBase, UUIDMixin, TimestampMixin, table=True):
@@ -43,15 +58,36 @@ class FileUpload(FileUploadBase, UUIDMixin, TimestampMixin, table=True):
         max_length=500,
         description="S3 storage key/path"
     )
+    content_sha256: Optional[str] = Field(
+        default=None,
+        max_length=64,
+        index=True,
+        description="SHA-256 of the content, referencing file_blobs (unset for legacy uploads)"
+    )
+    derivative_s3_key: Optional[str] = Field(
+        default=None,
+        max_length=500,
+        description="S3 key of the image prepared for LLM input (unset for documents and legacy uploads)"
+    )
+    derivative_mime_type: Optional[str] = Field(
+        default=None,
+        max_length=100,
+        description="MIME type of the LLM-ready image"
+    )
+    derivative_size: Optional[int] = Field(
+        default=None,
+        description="Size of the LLM-ready image in bytes"
+    )
     user_uuid: UUID = Field(
         foreign_key="users.uuid",
         index=True,
         description="UUID of the user who uploaded the file"
     )
 
-    # Relationship with user
+    # Relationship with user. Loaded on access: eager loading would pull in
+    # the user's conversations and their messages with every file record
     user: Optional["User"] = Relationship(
-        sa_relationship_kwargs={"lazy": "selectin"}
+        sa_relationship_kwargs={"lazy": "select"}
     )
 
 
@@ -64,3 +100,66 @@ class FileUploadRead(FileUploadBase, UUIDMixin, TimestampMixin):
     """Schema for reading a file upload record."""
 
     id: int
+
+
+class FileParseStatusRead(SQLModel):
+    """Schema for polling a file's parsing state."""
+
+    uuid: UUID
+    parse_status: str
+
+
+class PresignedUploadCreate(SQLModel):
+    """Schema for requesting a direct-to-S3 upload."""
+
+    filename: str = Field(max_length=255, description="Original filename")
+    mime_type: str = Field(max_length=100, description="MIME type of the file")
+    file_size: int = Field(description="File size in bytes")
+    sha256: Optional[str] = Field(
+        default=None,
+        min_length=64,
+        max_length=64,
+        description="Hex SHA-256 of the content. S3 verifies it on single-PUT uploads, "
+                    "which lets the upload share content already stored",
+    )
+
+
+class PresignedUploadPart(SQLModel):
+    """URL for one part of a multipart upload."""
+
+    part_number: int
+    url: str
+
+
+class PresignedUploadRead(SQLModel):
+    """Schema for the URLs a client uploads a file to.
+
+    Single uploads PUT the content to `url` with `headers`; multipart
+    uploads PUT each `part_size` slice to its part URL and keep the ETag
+    of every response for the completion request.
+    """
+
+    file_id: UUID
+    method: str = Field(description="PUT or multipart")
+    url: Optional[str] = None
+    headers: Dict[str, str] = Field(default_factory=dict)
+    upload_id: Optional[str] = None
+    part_size: Optional[int] = None
+    parts: List[PresignedUploadPart] = Field(default_factory=list)
+    expires_in: int = Field(description="URL lifetime in seconds")
+
+
+class UploadedPart(SQLModel):
+    """A part the client uploaded, as reported back for completion."""
+
+    part_number: int
+    etag: str
+
+
+class PresignedUploadComplete(SQLModel):
+    """Schema for completing a direct-to-S3 upload."""
+
+    filename: str = Field(max_length=255, description="Filename given when the upload was requested")
+    mime_type: str = Field(max_length=100, description="MIME type given when the upload was requested")
+    upload_id: Optional[str] = Field(default=None, description="Multipart upload ID, for multipart uploads")
+    parts: List[UploadedPart] = Field(default_factory=list)
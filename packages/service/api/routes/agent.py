@@ -8,7 +8,7 @@ from fastapi import APIRouter, HTTPException, Query, Request as FastAPIRequest
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
-from ..database.session import get_session
+from ..database.session import release_session
 from ..services.agent_service import (
     get_or_create_conversation,
     save_user_message,
@@ -72,8 +72,11 @@ async def chat_with_agent(
     def on_finish_callback(buffered_message: dict, message_id: str = None):
         save_ai_message(UUID(conversation_id), buffered_message, message_id)
 
+    # Return the connection to the pool before streaming; the response can
+    # take minutes and the remaining database work uses its own sessions
+    release_session()
+
     # Generate streaming response
-    session = get_session()
     async def generate():
         async for chunk in stream_strands_agent(
             agent_with_session,
@@ -82,7 +85,6 @@ async def chat_with_agent(
             on_finish=on_finish_callback,
             file_ids=request.file_ids,
             user_uuid=user.uuid,
-            session=session,
         ):
             yield chunk
 
@@ -1,19 +1,32 @@
 """
 File upload routes.
 """
-from typing import List
+from typing import AsyncIterator, List
 from uuid import UUID
 
 from fastapi import APIRouter, File, HTTPException, Request as FastAPIRequest, UploadFile, status
 
 from ..database.session import get_session
-from ..models.file_upload import FileUploadCreate, FileUploadRead
+from ..models.file_upload import (
+    FileParseStatusRead,
+    FileUploadCreate,
+    FileUploadRead,
+    PresignedUploadComplete,
+    PresignedUploadCreate,
+    PresignedUploadRead,
+)
 from ..services.file_service import FileService
-from ..utils.file_format import ALLOWED_MIME_TYPES, MAX_FILE_SIZE
+from ..utils.file_format import ALLOWED_MIME_TYPES, MAX_FILE_SIZE, UPLOAD_CHUNK_SIZE
 
 router = APIRouter()
 
 
+async def _read_chunks(file: UploadFile) -> AsyncIterator[bytes]:
+    """Read an uploaded file in chunks instead of all at once."""
+    while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+        yield chunk
+
+
 @router.post("/upload", response_model=List[FileUploadRead])
 async def upload_files(
     request: FastAPIRequest,
@@ -28,7 +41,7 @@ async def upload_files(
     user = request.state.db_user
     session = get_session()
     file_service = FileService(session)
-    results: List[FileUploadRead] = []
+    uploads = []
 
     for file in files:
         # Validate file type
@@ -38,32 +51,86 @@ async def upload_files(
                 detail=f"Unsupported file type: {file.content_type}. Allowed: PDF, Word (.doc, .docx)",
             )
 
-        # Read file content
-        content = await file.read()
-
-        # Validate file size
-        if len(content) > MAX_FILE_SIZE:
+        # Validate file size up front when the multipart parser knows it;
+        # the service enforces the limit again while streaming
+        if file.size is not None and file.size > MAX_FILE_SIZE:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"File {file.filename} exceeds size limit (20MB)",
             )
 
-        # Create file record
         file_data = FileUploadCreate(
             filename=file.filename or "unnamed",
             mime_type=file.content_type or "application/octet-stream",
-            file_size=len(content),
+            file_size=file.size or 0,
         )
+        uploads.append((file_data, _read_chunks(file)))
 
-        file_record = file_service.create_file(
-            file_data=file_data,
-            file_content=content,
-            user_uuid=user.uuid,
+    # Files are processed concurrently; if any of them fails, none is saved
+    try:
+        file_records = await file_service.create_files(uploads, user_uuid=user.uuid)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
         )
 
-        results.append(FileUploadRead.model_validate(file_record))
+    return [FileUploadRead.model_validate(record) for record in file_records]
+
+
+@router.post("/uploads", response_model=PresignedUploadRead)
+async def create_presigned_upload(
+    body: PresignedUploadCreate,
+    request: FastAPIRequest,
+) -> PresignedUploadRead:
+    """
+    Request presigned URLs to upload a file directly to S3.
+
+    The client uploads the content to the returned URL(s), then calls
+    POST /uploads/{file_id}/complete.
+    """
+    user = request.state.db_user
+    session = get_session()
+    file_service = FileService(session)
+
+    file_data = FileUploadCreate(
+        filename=body.filename,
+        mime_type=body.mime_type,
+        file_size=body.file_size,
+    )
+    try:
+        upload = await file_service.create_presigned_upload(file_data, body.sha256, user.uuid)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+
+    return PresignedUploadRead(**upload)
+
+
+@router.post("/uploads/{file_id}/complete", response_model=FileUploadRead)
+async def complete_presigned_upload(
+    file_id: str,
+    body: PresignedUploadComplete,
+    request: FastAPIRequest,
+) -> FileUploadRead:
+    """
+    Record a file uploaded directly to S3, after checking the stored object.
+    """
+    user = request.state.db_user
+    session = get_session()
+    file_service = FileService(session)
+
+    try:
+        file_record = await file_service.complete_presigned_upload(UUID(file_id), body, user.uuid)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
 
-    return results
+    return FileUploadRead.model_validate(file_record)
 
 
 @router.get("/{file_uuid}", response_model=FileUploadRead)
@@ -89,6 +156,29 @@ async def get_file(
     return FileUploadRead.model_validate(file_record)
 
 
+@router.get("/{file_uuid}/status", response_model=FileParseStatusRead)
+async def get_file_status(
+    file_uuid: str,
+    request: FastAPIRequest,
+) -> FileParseStatusRead:
+    """
+    Get a file's document parsing status, for polling after upload.
+    """
+    user = request.state.db_user
+    session = get_session()
+    file_service = FileService(session)
+
+    parse_status = file_service.get_parse_status(UUID(file_uuid), user.uuid)
+
+    if parse_status is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="File not found",
+        )
+
+    return FileParseStatusRead(uuid=UUID(file_uuid), parse_status=parse_status)
+
+
 @router.delete("/{file_uuid}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_file(
     file_uuid: str,
@@ -101,7 +191,7 @@ async def delete_file(
     session = get_session()
     file_service = FileService(session)
 
-    success = file_service.delete_file(UUID(file_uuid), user.uuid)
+    success = await file_service.delete_file(UUID(file_uuid), user.uuid)
 
     if not success:
         raise HTTPException(
@@ -1,7 +1,8 @@
 """
 Services package.
 """
-from .oidc_service import fetch_userinfo_from_oidc
+from .oidc_service import OIDCUserInfoClient, fetch_userinfo_from_oidc, get_userinfo_client
+from .jwks_service import JWKSManager, add_key_change_listener, get_jwks_manager
 from .user_service import get_or_create_user
 from .conversation_service import (
     get_user_conversations,
@@ -14,13 +15,20 @@ from .agent_service import (
     save_ai_message,
     create_agent_with_session
 )
-from .s3_storage import S3Storage, get_s3_storage
+from .s3_storage import AsyncS3Storage, S3Storage, get_async_s3_storage, get_s3_storage
 from .file_service import FileService
 from .content_builder import ContentBlockBuilder
 from .document_parser import DocumentParser, get_document_parser
+from .parse_queue import ParseQueue, get_parse_config, get_parse_queue
+from .document_index import get_document_chunks, get_document_index_config
 
 __all__ = [
+    "OIDCUserInfoClient",
     "fetch_userinfo_from_oidc",
+    "get_userinfo_client",
+    "JWKSManager",
+    "add_key_change_listener",
+    "get_jwks_manager",
     "get_or_create_user",
     "get_user_conversations",
     "get_conversation_messages",
@@ -31,8 +39,15 @@ __all__ = [
     "create_agent_with_session",
     "S3Storage",
     "get_s3_storage",
+    "AsyncS3Storage",
+    "get_async_s3_storage",
     "FileService",
     "ContentBlockBuilder",
     "DocumentParser",
     "get_document_parser",
+    "ParseQueue",
+    "get_parse_config",
+    "get_parse_queue",
+    "get_document_chunks",
+    "get_document_index_config",
 ]
@@ -9,8 +9,10 @@ from sqlmodel import select
 
 from ..database.session import get_session
 from ..models import Agent
+from ..telemetry import traced
 
 
+@traced()
 def get_all_agents() -> List[Dict[str, Any]]:
     """Get all agents (visible to all users)."""
     session = get_session()
@@ -27,6 +29,7 @@ def get_all_agents() -> List[Dict[str, Any]]:
     ]
 
 
+@traced()
 def get_agent_by_uuid(agent_uuid: UUID) -> Optional[Dict[str, Any]]:
     """Get a specific agent by UUID.
 
@@ -46,6 +49,7 @@ def get_agent_by_uuid(agent_uuid: UUID) -> Optional[Dict[str, Any]]:
     }
 
 
+@traced()
 def create_agent(user_uuid: UUID, name: Optional[str] = None) -> Dict[str, Any]:
     """Create a new agent.
 
@@ -69,6 +73,7 @@ def create_agent(user_uuid: UUID, name: Optional[str] = None) -> Dict[str, Any]:
     }
 
 
+@traced()
 def update_agent(agent_uuid: UUID, name: Optional[str] = None) -> Dict[str, Any]:
     """Update an agent.
 
@@ -96,6 +101,7 @@ def update_agent(agent_uuid: UUID, name: Optional[str] = None) -> Dict[str, Any]
     }
 
 
+@traced()
 def delete_agent(agent_uuid: UUID) -> Dict[str, Any]:
     """Delete an agent.
 
@@ -1,9 +1,11 @@
 """
 Agent service for AI agent operations.
 """
+import json
 import logging
 import os
-from typing import Dict, Any
+from functools import lru_cache
+from typing import Dict, Any, Optional
 from uuid import UUID
 
 from mcp.client.sse import sse_client
@@ -15,11 +17,16 @@ from strands.tools.mcp import MCPClient
 
 from ..database.session import get_session, get_session_context
 from ..models import Conversation, Message
+from ..telemetry import traced
 from ..utils.prompt import ClientMessage
 
 logger = logging.getLogger(__name__)
 
+# Agent configuration used for conversations
+DEFAULT_AGENT_CONFIG = "api/config/default_agent.json"
 
+
+@traced()
 def get_or_create_conversation(conversation_id: str, user_uuid: UUID, agent_uuid: UUID) -> Conversation:
     """Get or create a conversation for the user.
 
@@ -51,6 +58,7 @@ def get_or_create_conversation(conversation_id: str, user_uuid: UUID, agent_uuid
     return conversation
 
 
+@traced()
 def save_user_message(conversation_uuid: UUID, message: ClientMessage) -> None:
     """Save user message to database.
 
@@ -92,6 +100,7 @@ def save_user_message(conversation_uuid: UUID, message: ClientMessage) -> None:
     session.commit()
 
 
+@traced()
 def save_ai_message(
     conversation_uuid: UUID, buffered_message: Dict[str, Any], message_id: str = None
 ) -> None:
@@ -121,7 +130,8 @@ def save_ai_message(
             raise
 
 
-def create_agent_with_session(conversation_id: str, config_path: str = "api/config/default_agent.json"):
+@traced()
+def create_agent_with_session(conversation_id: str, config_path: str = DEFAULT_AGENT_CONFIG):
     """Create Strands agent with S3 session manager.
 
     Session data is stored in S3 under: s3://{MSC_S3_BUCKET}/sessions/{session_id}/
@@ -140,3 +150,10 @@ def create_agent_with_session(conversation_id: str, config_path: str = "api/conf
     agent: Agent = config_to_agent(
         config=config_path, session_manager=session_manager, tools=tools)
     return agent
+
+
+@lru_cache(maxsize=None)
+def get_agent_model_id(config_path: str = DEFAULT_AGENT_CONFIG) -> Optional[str]:
+    """Get the model ID an agent configuration runs on, without creating the agent."""
+    with open(config_path, encoding="utf-8") as f:
+        return json.load(f).get("model")
@@ -1,16 +1,25 @@
 """Content block builder for Strands Agent."""
 
-from typing import List, Optional
+import asyncio
+import logging
+from typing import List, Optional, Tuple
 from uuid import UUID
 
-from sqlmodel import Session
+from starlette.concurrency import run_in_threadpool
 from strands.types.content import ContentBlock
 
-from ..models.file_upload import FileUpload
+from ..database.session import get_session_context
+from ..models.file_upload import FileUpload, PARSE_STATUS_COMPLETED, PARSE_STATUS_FAILED
+from ..services.agent_service import get_agent_model_id
+from ..services.document_index import get_document_chunks
 from ..services.file_service import FileService
+from ..services.object_cache import fetch_objects
+from ..services.parse_queue import UNFINISHED_STATUSES, get_parse_config, get_parse_queue
+from ..telemetry import traced
 from ..utils.file_format import is_image_type, get_image_format, MIME_TO_IMAGE_FORMAT
-from ..utils.image_processor import compress_image
+from ..utils.image_processor import ImageTooLargeError, compress_image_for_model
 
+logger = logging.getLogger(__name__)
 
 # Document template for LLM input
 DOCUMENT_TEMPLATE = """## 文档: {filename}
@@ -18,14 +27,36 @@ DOCUMENT_TEMPLATE = """## 文档: {filename}
 {content}
 """
 
+# Shown instead of the content of documents that are not parsed yet
+DOCUMENT_PENDING_NOTE = "（文档仍在解析中，暂时无法读取内容）"
+DOCUMENT_FAILED_NOTE = "（文档解析失败，无法读取内容）"
 
-class ContentBlockBuilder:
-    """Build Strands ContentBlock list from files and text."""
+# Precedes the excerpts of documents too large to send whole
+DOCUMENT_EXCERPT_NOTE = (
+    "（文档较长，以下是与问题最相关的 {selected}/{total} 个片段，按原文顺序排列，"
+    "不相邻的片段之间以“……”分隔）"
+)
+DOCUMENT_GAP = "\n\n……\n\n"
 
-    def __init__(self, session: Session):
-        self.file_service = FileService(session)
 
-    def build(
+class ContentBlockBuilder:
+    """Build Strands ContentBlock list from files and text.
+
+    Runs while the response is streaming, after the request has released
+    its database connection, so file records are loaded in a short-lived
+    session of their own. Documents that are still being parsed are waited
+    for up to PARSE_WAIT_TIMEOUT_S; after that the model is told the
+    content is not available yet. Documents over DOCUMENT_TOKEN_BUDGET are
+    sent as the chunks most relevant to the message text. Images are
+    fitted to the image targets of the model the message is sent to.
+    """
+
+    def __init__(self, model_id: Optional[str] = None):
+        self.model_id = model_id or get_agent_model_id()
+        self.wait_timeout_s = get_parse_config()["wait_timeout_s"]
+
+    @traced()
+    async def build(
         self,
         text: str,
         file_uuids: Optional[List[UUID]],
@@ -46,19 +77,37 @@ class ContentBlockBuilder:
 
         # 1. Add file ContentBlocks (documents and images)
         if file_uuids:
-            # Get files with content for images
-            files_with_content = self.file_service.get_files_with_content(
-                file_uuids, user_uuid
+            # Load the records, then release the connection before the
+            # image downloads (documents are sent from their chunks)
+            files = self._load_files(file_uuids, user_uuid)
+            if any(f.parse_status in UNFINISHED_STATUSES for f in files):
+                await get_parse_queue().wait_for(
+                    [f.uuid for f in files], self.wait_timeout_s
+                )
+                files = self._load_files(file_uuids, user_uuid)
+
+            # Download the images concurrently (through the local cache),
+            # while the documents' chunks are selected
+            images = [f for f in files if is_image_type(f.mime_type)]
+            documents = [
+                f.uuid for f in files
+                if not is_image_type(f.mime_type) and f.parse_status == PARSE_STATUS_COMPLETED
+            ]
+            image_contents, document_chunks = await asyncio.gather(
+                fetch_objects([f.derivative_s3_key or f.s3_key for f in images]),
+                run_in_threadpool(get_document_chunks, documents, text or ""),
             )
-            for file, content in files_with_content:
+            contents = dict(zip([f.uuid for f in images], image_contents))
+
+            for file in files:
                 if is_image_type(file.mime_type):
                     # Build image content block
-                    image_block = self._build_image_block(file, content)
+                    image_block = self._build_image_block(file, contents[file.uuid])
                     if image_block:
                         content_blocks.append(image_block)
                 else:
-                    # Build document content block (from stored markdown)
-                    doc_block = self._build_document_block(file)
+                    # Build document content block (from stored chunks)
+                    doc_block = self._build_document_block(file, document_chunks.get(file.uuid))
                     if doc_block:
                         content_blocks.append(doc_block)
 
@@ -68,25 +117,55 @@ class ContentBlockBuilder:
 
         return content_blocks
 
+    def _load_files(self, file_uuids: List[UUID], user_uuid: UUID) -> List[FileUpload]:
+        with get_session_context() as session:
+            return FileService(session).get_files_for_llm(file_uuids, user_uuid)
+
     def _build_document_block(
         self,
         file: FileUpload,
+        chunks: Optional[Tuple[List[Tuple[int, str]], int]],
     ) -> Optional[ContentBlock]:
         """
-        Build document ContentBlock from file record's markdown content.
+        Build document ContentBlock from the document's chunks.
 
         Args:
-            file: FileUpload record with markdown_content
+            file: FileUpload record
+            chunks: Chunks to send as (position, content) in document
+                order, and the document's chunk count (see
+                get_document_chunks)
 
         Returns:
             ContentBlock with document text, or None if no markdown content
         """
-        if not file.markdown_content:
+        if file.parse_status in UNFINISHED_STATUSES:
+            return {"text": DOCUMENT_TEMPLATE.format(
+                filename=file.filename, content=DOCUMENT_PENDING_NOTE
+            )}
+        if file.parse_status == PARSE_STATUS_FAILED:
+            return {"text": DOCUMENT_TEMPLATE.format(
+                filename=file.filename, content=DOCUMENT_FAILED_NOTE
+            )}
+        if not chunks:
             return None
 
+        selected, total = chunks
+        if len(selected) == total:
+            # Chunks are consecutive slices of the Markdown
+            content = "".join(text for _, text in selected)
+        else:
+            parts = [DOCUMENT_EXCERPT_NOTE.format(selected=len(selected), total=total), "\n\n"]
+            previous = None
+            for position, text in selected:
+                if previous is not None and position != previous + 1:
+                    parts.append(DOCUMENT_GAP)
+                parts.append(text)
+                previous = position
+            content = "".join(parts)
+
         document_text = DOCUMENT_TEMPLATE.format(
             filename=file.filename,
-            content=file.markdown_content,
+            content=content,
         )
 
         return {"text": document_text}
@@ -99,11 +178,15 @@ class ContentBlockBuilder:
         """
         Build image ContentBlock from file content.
 
-        Compresses large images to fit within LLM size limits (5MB).
+        Uses the LLM-ready derivative stored at upload. It is fitted to
+        the model's image targets again, which only reads its header if it
+        already fits; images uploaded before derivatives existed are
+        compressed here from the original.
 
         Args:
             file: FileUpload record
-            content: Image file content bytes
+            content: Derivative bytes, or original image bytes if the
+                file has no derivative
 
         Returns:
             ContentBlock with image data, or None if format not supported
@@ -112,8 +195,14 @@ class ContentBlockBuilder:
         if not image_format:
             return None
 
-        # Compress image if needed (Bedrock has 5MB limit)
-        compressed_content, output_mime = compress_image(content, file.mime_type)
+        mime_type = file.derivative_mime_type if file.derivative_s3_key else file.mime_type
+        try:
+            compressed_content, output_mime = compress_image_for_model(
+                content, mime_type, self.model_id
+            )
+        except ImageTooLargeError as e:
+            logger.warning(f"Skipping image {file.filename}: {str(e)}")
+            return None
 
         # Get the format for the compressed image
         output_format = MIME_TO_IMAGE_FORMAT.get(output_mime, image_format)
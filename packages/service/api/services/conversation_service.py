@@ -9,8 +9,10 @@ from sqlmodel import select
 
 from ..database.session import get_session
 from ..models import Conversation, Message
+from ..telemetry import traced
 
 
+@traced()
 def get_user_conversations(user_uuid: UUID) -> List[Dict[str, Any]]:
     """Get all conversations for a user.
 
@@ -34,6 +36,7 @@ def get_user_conversations(user_uuid: UUID) -> List[Dict[str, Any]]:
     ]
 
 
+@traced()
 def get_agent_conversations(agent_uuid: UUID, user_uuid: UUID) -> List[Dict[str, Any]]:
     """Get all conversations for a specific agent.
 
@@ -59,6 +62,7 @@ def get_agent_conversations(agent_uuid: UUID, user_uuid: UUID) -> List[Dict[str,
     ]
 
 
+@traced()
 def get_conversation_messages(
     conversation_uuid: UUID, user_uuid: UUID
 ) -> List[Dict[str, Any]]:
@@ -137,6 +141,7 @@ def get_conversation_messages(
     ]
 
 
+@traced()
 def delete_user_conversation(conversation_uuid: UUID, user_uuid: UUID) -> Dict[str, Any]:
     """Delete a conversation with ownership verification.
 
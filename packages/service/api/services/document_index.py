@@ -0,0 +1,249 @@
+"""Chunk index of parsed documents, for sending large documents in part."""
+
+import logging
+import math
+import os
+from typing import Dict, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from sqlalchemy import Uuid, func, literal
+from sqlalchemy.dialects.postgresql import array, insert
+from sqlmodel import Session, select
+
+from ..database.session import get_session_context
+from ..models.document_chunk import DocumentChunk
+from ..models.file_upload import FileUpload
+from ..telemetry import get_meter
+from ..utils.document_chunker import chunk_document, tokenize
+
+logger = logging.getLogger(__name__)
+
+# BM25 parameters (the usual defaults)
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Terms of the user's message searched for, in order of occurrence
+MAX_QUERY_TERMS = 64
+
+meter = get_meter()
+document_tokens_counter = meter.create_counter(
+    "documents.tokens",
+    description="Estimated document tokens sent to the model, by mode (whole or excerpt)",
+)
+
+
+def get_document_index_config() -> dict:
+    """Get document chunking and retrieval settings from environment."""
+    return {
+        # Documents up to this size are sent whole; larger ones as the
+        # chunks most relevant to the message, up to this size
+        "token_budget": int(os.getenv("DOCUMENT_TOKEN_BUDGET", "16000")),
+        "chunk_tokens": int(os.getenv("DOCUMENT_CHUNK_TOKENS", "512")),
+    }
+
+
+def store_chunks(session: Session, file_uuid: UUID, chunks: List[Dict]) -> None:
+    """
+    Add a document's chunks (see chunk_document) to the session's transaction.
+
+    Chunks already stored for the file are kept.
+
+    Args:
+        session: Database session, committed by the caller
+        file_uuid: File UUID of the document
+        chunks: Chunks in document order
+    """
+    if not chunks:
+        return
+    session.execute(
+        insert(DocumentChunk)
+        .values([
+            {"file_uuid": file_uuid, "position": position, **chunk}
+            for position, chunk in enumerate(chunks)
+        ])
+        .on_conflict_do_nothing()
+    )
+
+
+def _copy_chunks(session: Session, file_uuid: UUID, sha256: str, mime_type: str) -> bool:
+    """Copy the chunks of another upload of the same content, if there is one."""
+    source = (
+        select(DocumentChunk.file_uuid)
+        .join(FileUpload, FileUpload.uuid == DocumentChunk.file_uuid)
+        .where(
+            FileUpload.content_sha256 == sha256,
+            FileUpload.mime_type == mime_type,
+            FileUpload.uuid != file_uuid,
+        )
+        .limit(1)
+        .scalar_subquery()
+    )
+    columns = ["position", "content", "token_count", "term_count", "term_freqs"]
+    result = session.execute(
+        insert(DocumentChunk)
+        .from_select(
+            ["file_uuid", *columns],
+            select(
+                literal(file_uuid, Uuid),
+                *(getattr(DocumentChunk, column) for column in columns),
+            ).where(DocumentChunk.file_uuid == source),
+        )
+        .on_conflict_do_nothing()
+    )
+    return result.rowcount > 0
+
+
+def _index_documents(session: Session, file_uuids: Sequence[UUID], chunk_tokens: int) -> None:
+    """Chunk documents parsed without being indexed (e.g. before chunks existed)."""
+    rows = session.exec(
+        select(
+            FileUpload.uuid,
+            FileUpload.content_sha256,
+            FileUpload.mime_type,
+            FileUpload.markdown_content,
+        ).where(FileUpload.uuid.in_(file_uuids))
+    ).all()
+    for file_uuid, sha256, mime_type, markdown in rows:
+        if not markdown:
+            continue
+        if sha256 and _copy_chunks(session, file_uuid, sha256, mime_type):
+            continue
+        store_chunks(session, file_uuid, chunk_document(markdown, chunk_tokens))
+    session.commit()
+
+
+def _chunk_stats(session: Session, file_uuids: Sequence[UUID]) -> Dict[UUID, Tuple[int, int, float]]:
+    """Chunk count, total tokens and average term count of each document."""
+    rows = session.exec(
+        select(
+            DocumentChunk.file_uuid,
+            func.count(),
+            func.sum(DocumentChunk.token_count),
+            func.avg(DocumentChunk.term_count),
+        )
+        .where(DocumentChunk.file_uuid.in_(file_uuids))
+        .group_by(DocumentChunk.file_uuid)
+    ).all()
+    return {row[0]: (row[1], int(row[2]), float(row[3])) for row in rows}
+
+
+def _rank_chunks(
+    session: Session,
+    file_uuid: UUID,
+    stats: Tuple[int, int, float],
+    terms: List[str],
+    token_budget: int,
+) -> List[int]:
+    """
+    Pick the chunks of a document that best match the terms (BM25).
+
+    Chunks are taken by descending score while they fit in the budget.
+    The budget left after the matching chunks is filled with unmatched
+    chunks from the start of the document, which usually introduces it.
+
+    Returns:
+        IDs of the picked chunks
+    """
+    count, _, average_terms = stats
+    chunks = session.exec(
+        select(DocumentChunk.id, DocumentChunk.position, DocumentChunk.token_count)
+        .where(DocumentChunk.file_uuid == file_uuid)
+    ).all()
+
+    scores: Dict[int, float] = {}
+    if terms:
+        # Only chunks containing a term are read, through the GIN index
+        matches = session.exec(
+            select(
+                DocumentChunk.id,
+                DocumentChunk.term_count,
+                *(DocumentChunk.term_freqs[term].as_integer() for term in terms),
+            ).where(
+                DocumentChunk.file_uuid == file_uuid,
+                DocumentChunk.term_freqs.has_any(array(terms)),
+            )
+        ).all()
+        document_freqs = [sum(1 for row in matches if row[2 + i]) for i in range(len(terms))]
+        idfs = [math.log(1 + (count - df + 0.5) / (df + 0.5)) for df in document_freqs]
+        for chunk_id, term_count, *freqs in matches:
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * term_count / max(average_terms, 1))
+            scores[chunk_id] = sum(
+                idf * freq * (BM25_K1 + 1) / (freq + norm)
+                for idf, freq in zip(idfs, freqs)
+                if freq
+            )
+
+    picked = []
+    remaining = token_budget
+    for chunk_id, _, token_count in sorted(chunks, key=lambda c: (-scores.get(c[0], 0), c[1])):
+        if token_count <= remaining:
+            picked.append(chunk_id)
+            remaining -= token_count
+    return picked
+
+
+def get_document_chunks(
+    file_uuids: Sequence[UUID],
+    query: str,
+    token_budget: Optional[int] = None,
+) -> Dict[UUID, Tuple[List[Tuple[int, str]], int]]:
+    """
+    Get the content of parsed documents to send to the model.
+
+    Documents within the token budget are returned whole. Of larger
+    documents, the chunks most relevant to the query are returned, up to
+    the budget. Documents not indexed yet are chunked first.
+
+    Args:
+        file_uuids: File UUIDs of parsed documents
+        query: Text of the user's message
+        token_budget: Maximum estimated tokens per document (default
+            DOCUMENT_TOKEN_BUDGET)
+
+    Returns:
+        Per document with content: the (position, content) of the
+        returned chunks in document order, and the document's chunk count
+    """
+    config = get_document_index_config()
+    if token_budget is None:
+        token_budget = config["token_budget"]
+    if not file_uuids:
+        return {}
+
+    with get_session_context() as session:
+        stats = _chunk_stats(session, file_uuids)
+        missing = [file_uuid for file_uuid in file_uuids if file_uuid not in stats]
+        if missing:
+            _index_documents(session, missing, config["chunk_tokens"])
+            stats.update(_chunk_stats(session, missing))
+
+        whole = {file_uuid for file_uuid, s in stats.items() if s[1] <= token_budget}
+        large = [file_uuid for file_uuid in stats if file_uuid not in whole]
+        picked: List[int] = []
+        if large:
+            terms = list(dict.fromkeys(tokenize(query)))[:MAX_QUERY_TERMS]
+            for file_uuid in large:
+                picked.extend(_rank_chunks(session, file_uuid, stats[file_uuid], terms, token_budget))
+
+        rows = session.exec(
+            select(
+                DocumentChunk.file_uuid,
+                DocumentChunk.position,
+                DocumentChunk.content,
+                DocumentChunk.token_count,
+            )
+            .where(DocumentChunk.file_uuid.in_(whole) | DocumentChunk.id.in_(picked))
+            .order_by(DocumentChunk.file_uuid, DocumentChunk.position)
+        ).all()
+
+    documents: Dict[UUID, Tuple[List[Tuple[int, str]], int]] = {}
+    sent_tokens = {"whole": 0, "excerpt": 0}
+    for file_uuid, position, content, token_count in rows:
+        if file_uuid not in documents:
+            documents[file_uuid] = ([], stats[file_uuid][0])
+        documents[file_uuid][0].append((position, content))
+        sent_tokens["whole" if file_uuid in whole else "excerpt"] += token_count
+    for mode, tokens in sent_tokens.items():
+        if tokens:
+            document_tokens_counter.add(tokens, {"mode": mode})
+    return documents
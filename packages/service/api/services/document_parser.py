@@ -2,10 +2,11 @@
 
 import logging
 import os
-import tempfile
-from typing import Optional
+from typing import BinaryIO, Optional
 
-from markitdown import MarkItDown
+from ..telemetry import start_span
+from ..utils.document_worker import convert_document
+from ..utils.file_format import get_file_extension
 
 logger = logging.getLogger(__name__)
 
@@ -13,53 +14,36 @@ logger = logging.getLogger(__name__)
 class DocumentParser:
     """Document parser service: convert documents to Markdown using markitdown."""
 
-    def __init__(self):
-        self.md = MarkItDown()
-
-    def parse(self, content: bytes, mime_type: str, filename: str) -> Optional[str]:
+    def parse(self, content: BinaryIO, mime_type: str, filename: str) -> Optional[str]:
         """
         Parse document content to Markdown text.
 
         Args:
-            content: File binary content
+            content: Seekable binary file with the document, e.g. a spooled
+                temporary file
             mime_type: MIME type of the file
             filename: Original filename
 
         Returns:
             Markdown text or None if parsing fails
         """
-        ext = self._get_extension(mime_type, filename)
+        ext = get_file_extension(mime_type, filename)
         if not ext:
             return None
 
-        tmp_path = None
         try:
-            with tempfile.NamedTemporaryFile(suffix=ext, delete=False) as tmp:
-                tmp.write(content)
-                tmp.flush()
-                tmp_path = tmp.name
-
-            result = self.md.convert(tmp_path)
-            markdown = result.text_content if result.text_content else None
+            size = content.seek(0, os.SEEK_END)
+            content.seek(0)
+            with start_span(
+                "document.parse",
+                {"document.extension": ext, "document.size": size},
+            ):
+                markdown = convert_document(content, ext, mime_type, filename)
             logger.info(f"Parsed document {filename}, markdown length: {len(markdown) if markdown else 0}")
             return markdown
         except Exception as e:
             logger.error(f"Failed to parse document {filename}: {e}", exc_info=True)
             return None
-        finally:
-            if tmp_path and os.path.exists(tmp_path):
-                os.unlink(tmp_path)
-
-    def _get_extension(self, mime_type: str, filename: str) -> Optional[str]:
-        """Get file extension from MIME type or filename."""
-        if filename and "." in filename:
-            return "." + filename.rsplit(".", 1)[-1].lower()
-        mime_to_ext = {
-            "application/pdf": ".pdf",
-            "application/vnd.openxmlformats-officedocument.wordprocessingml.document": ".docx",
-            "application/msword": ".doc",
-        }
-        return mime_to_ext.get(mime_type)
 
 
 _document_parser: Optional[DocumentParser] = None
@@ -0,0 +1,286 @@
+"""Content-addressed blob store shared by file uploads."""
+
+import asyncio
+import logging
+import threading
+from datetime import datetime
+from typing import Iterable, List, Optional, Tuple
+
+from opentelemetry.metrics import CallbackOptions, Observation
+from sqlalchemy import delete, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import Session, select
+from starlette.concurrency import run_in_threadpool
+
+from ..database.session import get_session_context
+from ..models.file_blob import FileBlob
+from ..telemetry import get_meter
+from ..utils.image_processor import ImageTooLargeError, compress_image_for_model
+from .agent_service import get_agent_model_id
+from .s3_storage import get_async_s3_storage, get_s3_storage
+
+logger = logging.getLogger(__name__)
+
+# Uploads seen by this process, for the dedup ratio gauge
+_totals = {"uploads": 0, "hits": 0}
+_totals_lock = threading.Lock()
+
+
+def _observe_dedup_ratio(options: CallbackOptions) -> Iterable[Observation]:
+    with _totals_lock:
+        uploads, hits = _totals["uploads"], _totals["hits"]
+    if uploads:
+        yield Observation(hits / uploads)
+
+
+meter = get_meter()
+upload_counter = meter.create_counter(
+    "files.uploads",
+    description="Stored uploads, by dedup result (hit: content already stored, or miss)",
+)
+upload_bytes_counter = meter.create_counter(
+    "files.upload_bytes",
+    unit="By",
+    description="Bytes of stored uploads, by dedup result; hit bytes were not written to S3",
+)
+meter.create_observable_gauge(
+    "files.dedup_ratio",
+    callbacks=[_observe_dedup_ratio],
+    description="Share of uploads since startup whose content was already stored",
+)
+
+
+def record_upload(size: int, hit: bool) -> None:
+    """Count a stored upload for the dedup metrics."""
+    attributes = {"dedup": "hit" if hit else "miss"}
+    upload_counter.add(1, attributes)
+    upload_bytes_counter.add(size, attributes)
+    with _totals_lock:
+        _totals["uploads"] += 1
+        _totals["hits"] += hit
+
+
+def acquire_blob(sha256: str) -> Optional[FileBlob]:
+    """
+    Take a reference to a stored blob, if the content is already known.
+
+    Args:
+        sha256: Hex SHA-256 of the content
+
+    Returns:
+        The blob, with the reference counted, or None if not stored
+    """
+    with get_session_context() as session:
+        blob = session.execute(
+            update(FileBlob)
+            .where(FileBlob.sha256 == sha256, FileBlob.ref_count > 0)
+            .values(ref_count=FileBlob.ref_count + 1, updated_at=datetime.utcnow())
+            .returning(FileBlob)
+        ).scalars().first()
+        session.commit()
+        return blob
+
+
+def register_blob(sha256: str, s3_key: str, size: int, mime_type: str) -> str:
+    """
+    Record newly stored content, taking a reference to it.
+
+    If another upload registered the same content in the meantime, its
+    object wins: the reference is taken on the existing blob and the
+    caller should delete the object it stored.
+
+    Args:
+        sha256: Hex SHA-256 of the content
+        s3_key: Where the caller stored the content
+        size: Content size in bytes
+        mime_type: MIME type of the upload
+
+    Returns:
+        S3 key of the blob
+    """
+    with get_session_context() as session:
+        statement = insert(FileBlob).values(
+            sha256=sha256,
+            s3_key=s3_key,
+            size=size,
+            mime_type=mime_type,
+            ref_count=1,
+            created_at=datetime.utcnow(),
+        )
+        statement = statement.on_conflict_do_update(
+            index_elements=[FileBlob.sha256],
+            set_={"ref_count": FileBlob.ref_count + 1, "updated_at": datetime.utcnow()},
+        ).returning(FileBlob.s3_key)
+        blob_key = session.execute(statement).scalar_one()
+        session.commit()
+        return blob_key
+
+
+def drop_blob_reference(session: Session, sha256: str) -> Optional[List[str]]:
+    """
+    Drop a reference to a blob in the session's transaction.
+
+    The S3 objects of the blob are left to the caller, to delete once the
+    transaction is committed.
+
+    Args:
+        session: Database session, committed by the caller
+        sha256: Hex SHA-256 of the content
+
+    Returns:
+        S3 keys of the blob if this was the last reference, else None
+    """
+    remaining = session.execute(
+        update(FileBlob)
+        .where(FileBlob.sha256 == sha256)
+        .values(ref_count=FileBlob.ref_count - 1, updated_at=datetime.utcnow())
+        .returning(FileBlob.ref_count)
+    ).scalar()
+    if remaining is None or remaining > 0:
+        return None
+    # The row lock taken above makes concurrent uploads of the same content
+    # wait, and then store it anew
+    deleted = session.execute(
+        delete(FileBlob)
+        .where(FileBlob.sha256 == sha256, FileBlob.ref_count <= 0)
+        .returning(FileBlob.s3_key, FileBlob.derivative_s3_key)
+    ).first()
+    if deleted is None:
+        return None
+    s3_key, derivative_s3_key = deleted
+    if derivative_s3_key and derivative_s3_key != s3_key:
+        return [s3_key, derivative_s3_key]
+    return [s3_key]
+
+
+def _drop_reference(sha256: str) -> Optional[List[str]]:
+    """Drop a reference to a blob, returning its S3 keys if it was the last."""
+    with get_session_context() as session:
+        s3_keys = drop_blob_reference(session, sha256)
+        session.commit()
+        return s3_keys
+
+
+def release_blob(sha256: str) -> bool:
+    """
+    Drop a reference to a blob, deleting its objects with the last one.
+
+    Args:
+        sha256: Hex SHA-256 of the content
+
+    Returns:
+        True if this was the last reference and the blob was deleted
+    """
+    s3_keys = _drop_reference(sha256)
+    if s3_keys is None:
+        return False
+    s3 = get_s3_storage()
+    for s3_key in s3_keys:
+        s3.delete(s3_key)
+    return True
+
+
+async def release_blob_async(sha256: str) -> bool:
+    """Like release_blob, for request handlers: deletes objects with the async client."""
+    s3_keys = await run_in_threadpool(_drop_reference, sha256)
+    if s3_keys is None:
+        return False
+    s3 = get_async_s3_storage()
+    await asyncio.gather(*(s3.delete(s3_key) for s3_key in s3_keys))
+    return True
+
+
+def get_blob_markdown(sha256: str, mime_type: str) -> Optional[str]:
+    """Get the parsed Markdown of content uploaded with this MIME type."""
+    with get_session_context() as session:
+        return session.exec(
+            select(FileBlob.markdown_content).where(
+                FileBlob.sha256 == sha256,
+                FileBlob.mime_type == mime_type,
+            )
+        ).first()
+
+
+def cache_blob_markdown(sha256: str, mime_type: str, markdown_content: str) -> None:
+    """Keep a document's parsed Markdown for later uploads of the same content."""
+    with get_session_context() as session:
+        session.execute(
+            update(FileBlob)
+            .where(
+                FileBlob.sha256 == sha256,
+                FileBlob.mime_type == mime_type,
+                FileBlob.markdown_content.is_(None),
+            )
+            .values(markdown_content=markdown_content)
+        )
+        session.commit()
+
+
+def set_blob_derivative(
+    sha256: str, derivative_s3_key: str, derivative_mime_type: str, derivative_size: int
+) -> None:
+    """Record the LLM-ready version of an image blob."""
+    with get_session_context() as session:
+        session.execute(
+            update(FileBlob)
+            .where(FileBlob.sha256 == sha256)
+            .values(
+                derivative_s3_key=derivative_s3_key,
+                derivative_mime_type=derivative_mime_type,
+                derivative_size=derivative_size,
+            )
+        )
+        session.commit()
+
+
+def get_blob_derivative(sha256: str) -> Optional[Tuple[str, str, int]]:
+    """Get the LLM-ready version of an image blob, if one was stored."""
+    with get_session_context() as session:
+        row = session.exec(
+            select(
+                FileBlob.derivative_s3_key,
+                FileBlob.derivative_mime_type,
+                FileBlob.derivative_size,
+            ).where(FileBlob.sha256 == sha256, FileBlob.derivative_s3_key.is_not(None))
+        ).first()
+        return tuple(row) if row else None
+
+
+async def store_derivative(
+    s3_key: str, sha256: Optional[str], content: bytes, mime_type: str
+) -> Optional[Tuple[str, str, int]]:
+    """
+    Prepare an image for LLM input and store it next to the original.
+
+    The image is fitted to the targets of the model agents are configured
+    with, and recorded on its blob (if the content is hashed).
+
+    Returns:
+        Tuple of (S3 key, MIME type, size) of the derivative, or None if
+        the image cannot be read
+
+    Raises:
+        ImageTooLargeError: If the image has too many pixels
+    """
+    try:
+        derivative, derivative_mime = await run_in_threadpool(
+            compress_image_for_model, content, mime_type, get_agent_model_id()
+        )
+    except ImageTooLargeError:
+        raise
+    except Exception as e:
+        logger.warning(f"Failed to prepare image {s3_key} for LLM input: {str(e)}")
+        return None
+
+    if derivative is content:
+        # Already within the limits: the original is sent as is
+        derivative_key = s3_key
+    else:
+        derivative_key = await get_async_s3_storage().upload_derivative(
+            s3_key, derivative, derivative_mime
+        )
+    if sha256:
+        await run_in_threadpool(
+            set_blob_derivative, sha256, derivative_key, derivative_mime, len(derivative)
+        )
+    return derivative_key, derivative_mime, len(derivative)
@@ -1,14 +1,88 @@
 """File upload service with S3 storage."""
 
-from typing import List, Optional, Tuple
+import asyncio
+import base64
+import hashlib
+import io
+import os
+from datetime import datetime
+from typing import AsyncIterator, Awaitable, Callable, List, Optional, Tuple, TypeVar
 from uuid import UUID, uuid4
 
+from botocore.exceptions import ClientError
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import defer
+from sqlalchemy.orm.attributes import set_committed_value
 from sqlmodel import Session, select
-
-from ..models.file_upload import FileUpload, FileUploadCreate
-from ..utils.file_format import is_allowed_file_type, is_image_type, MAX_FILE_SIZE
-from .s3_storage import get_s3_storage
+from starlette.concurrency import run_in_threadpool
+
+from ..models.file_blob import FileBlob
+from ..models.file_upload import (
+    FileUpload,
+    FileUploadCreate,
+    PARSE_STATUS_COMPLETED,
+    PARSE_STATUS_PENDING,
+    PARSE_STATUS_PROCESSING,
+    PresignedUploadComplete,
+)
+from ..telemetry import traced
+from ..utils.file_format import (
+    MAX_FILE_SIZE,
+    is_allowed_file_type,
+    is_image_type,
+    sniff_mime_type,
+)
+from ..utils.image_processor import check_image_header
+from .file_blobs import (
+    acquire_blob,
+    cache_blob_markdown,
+    drop_blob_reference,
+    record_upload,
+    register_blob,
+    release_blob_async,
+    store_derivative,
+)
+from .s3_storage import (
+    MULTIPART_PART_SIZE,
+    AsyncS3UploadWriter,
+    get_async_s3_storage,
+    upload_key,
+)
 from .document_parser import get_document_parser
+from .parse_queue import get_parse_queue
+
+T = TypeVar("T")
+
+# Files of one upload request processed at the same time
+UPLOAD_CONCURRENCY = int(os.getenv("UPLOAD_CONCURRENCY", "4"))
+
+# Lifetime of presigned upload URLs
+PRESIGNED_URL_EXPIRES_S = int(os.getenv("PRESIGNED_URL_EXPIRES_S", "900"))
+# Direct uploads larger than this are split into multipart upload parts
+PRESIGNED_MULTIPART_THRESHOLD = int(os.getenv("PRESIGNED_MULTIPART_THRESHOLD_MB", "16")) * 1024 * 1024
+
+# Leading bytes of a direct upload read to verify it (file type signature,
+# image dimensions)
+SNIFF_SIZE = 64 * 1024
+
+
+async def _run_to_completion(
+    operation: Awaitable[T], undo: Callable[[T], Awaitable[object]]
+) -> T:
+    """Run an operation to the end, undoing it if the caller is cancelled.
+
+    Cancelling the operation halfway (or a cancelled run_in_threadpool(),
+    which stops waiting but not the thread) would lose a blob reference it
+    takes. Here the operation is awaited to the end and its effect undone
+    before the cancellation propagates.
+    """
+    task = asyncio.ensure_future(operation)
+    try:
+        return await asyncio.shield(task)
+    except asyncio.CancelledError:
+        result = await task
+        await undo(result)
+        raise
 
 
 class FileService:
@@ -16,21 +90,23 @@ class FileService:
 
     def __init__(self, session: Session):
         self.session = session
-        self.s3 = get_s3_storage()
+        self.s3 = get_async_s3_storage()
         self.parser = get_document_parser()
+        self.parse_queue = get_parse_queue()
 
-    def create_file(
+    @traced()
+    async def create_file(
         self,
         file_data: FileUploadCreate,
-        file_content: bytes,
+        chunks: AsyncIterator[bytes],
         user_uuid: UUID,
     ) -> FileUpload:
         """
-        Create file record and upload to S3.
+        Stream a file to S3 and create its record.
 
         Args:
             file_data: File metadata
-            file_content: File binary content
+            chunks: File binary content, in chunks
             user_uuid: User UUID
 
         Returns:
@@ -39,52 +115,462 @@ class FileService:
         Raises:
             ValueError: If file type is not allowed or file is too large
         """
+        return (await self.create_files([(file_data, chunks)], user_uuid))[0]
+
+    @traced()
+    async def create_files(
+        self,
+        uploads: List[Tuple[FileUploadCreate, AsyncIterator[bytes]]],
+        user_uuid: UUID,
+    ) -> List[FileUpload]:
+        """
+        Stream several files to S3 concurrently and create their records.
+
+        Up to UPLOAD_CONCURRENCY files are uploaded and parsed at a time.
+        The batch is all-or-nothing: if any file fails, the remaining ones
+        are cancelled, the files already stored are released (deleting
+        content no other file uses) and no record is created. Otherwise all
+        records are inserted in one commit and the documents are queued for
+        parsing (unless parsing runs inline or the content was parsed
+        before).
+
+        Args:
+            uploads: (metadata, content chunks) per file
+            user_uuid: User UUID
+
+        Returns:
+            Created FileUpload records, in the order of uploads
+
+        Raises:
+            ValueError: If a file type is not allowed or a file is too large
+        """
+        semaphore = asyncio.Semaphore(UPLOAD_CONCURRENCY)
+
+        async def store(file_data: FileUploadCreate, chunks: AsyncIterator[bytes]) -> FileUpload:
+            async with semaphore:
+                try:
+                    return await self._store_file(file_data, chunks, user_uuid)
+                except ValueError as e:
+                    raise ValueError(f"File {file_data.filename}: {str(e)}") from e
+
+        tasks = [asyncio.ensure_future(store(*upload)) for upload in uploads]
+        try:
+            await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+        finally:
+            # On failure (or if the request itself was cancelled) cancel the
+            # rest of the batch and release what was already stored
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            stored = [t.result() for t in tasks if not t.cancelled() and t.exception() is None]
+            if len(stored) < len(tasks):
+                await asyncio.gather(*(release_blob_async(f.content_sha256) for f in stored))
+
+        # Report the first failure rather than the cancellations it caused
+        for task in tasks:
+            if not task.cancelled() and task.exception() is not None:
+                raise task.exception()
+
+        try:
+            self.session.add_all(stored)
+            self.session.commit()
+        except Exception:
+            # No record was saved: release every stored file
+            self.session.rollback()
+            await asyncio.gather(*(release_blob_async(f.content_sha256) for f in stored))
+            raise
+        for file_upload in stored:
+            self.session.refresh(file_upload)
+            if file_upload.parse_status == PARSE_STATUS_PENDING:
+                self.parse_queue.enqueue(file_upload.uuid)
+        return stored
+
+    async def _store_file(
+        self,
+        file_data: FileUploadCreate,
+        chunks: AsyncIterator[bytes],
+        user_uuid: UUID,
+    ) -> FileUpload:
+        """
+        Upload a file to S3, returning an unsaved record.
+
+        Chunks are pushed to S3 as multipart upload parts and hashed as
+        they arrive. If the
+        same content is already stored, the upload is dropped and the
+        record shares the stored blob, along with its parsed Markdown or
+        LLM-ready image. Otherwise documents are left pending for the parse
+        queue, or with inline parsing collected in memory (at most
+        MAX_FILE_SIZE) and parsed right away; images are collected in
+        memory too and compressed for the model.
+
+        The returned record holds a blob reference; callers that do not
+        save it must release it.
+        """
         # Validate file type
         if not is_allowed_file_type(file_data.mime_type):
             raise ValueError(f"Unsupported file type: {file_data.mime_type}")
 
-        # Validate file size
-        if len(file_content) > MAX_FILE_SIZE:
-            raise ValueError(f"File size exceeds limit: {MAX_FILE_SIZE} bytes")
-
         # Generate file ID
         file_id = uuid4()
 
-        # Upload to S3
-        s3_key = self.s3.upload(
-            file_content=file_content,
+        is_document = not is_image_type(file_data.mime_type)
+        parse_inline = is_document and self.parse_queue.inline
+        writer = await self.s3.open_upload(
             user_uuid=user_uuid,
             file_id=file_id,
             filename=file_data.filename,
             content_type=file_data.mime_type,
         )
-
-        # Parse document to markdown (skip for images)
-        markdown_content = None
-        if not is_image_type(file_data.mime_type):
-            markdown_content = self.parser.parse(
-                content=file_content,
-                mime_type=file_data.mime_type,
-                filename=file_data.filename,
+        digest = hashlib.sha256()
+        with io.BytesIO() as spool:
+            try:
+                async for chunk in chunks:
+                    # Validate file size as the content arrives
+                    if writer.size + len(chunk) > MAX_FILE_SIZE:
+                        raise ValueError(f"File size exceeds limit: {MAX_FILE_SIZE} bytes")
+                    digest.update(chunk)
+                    writer.write(chunk)
+                    if parse_inline or not is_document:
+                        spool.write(chunk)
+                    if writer.needs_flush:
+                        await writer.flush()
+            except BaseException:
+                await writer.abort()
+                raise
+
+            sha256 = digest.hexdigest()
+            s3_key, blob = await _run_to_completion(
+                self._store_content(writer, sha256, file_data.mime_type),
+                undo=lambda _: release_blob_async(sha256),
             )
 
-        # Create database record
-        file_upload = FileUpload(
+            markdown_content = None
+            derivative = None
+            if blob is not None:
+                if blob.mime_type == file_data.mime_type:
+                    markdown_content = blob.markdown_content
+                if blob.derivative_s3_key:
+                    derivative = (
+                        blob.derivative_s3_key, blob.derivative_mime_type, blob.derivative_size
+                    )
+
+            try:
+                # Parse document to markdown (skip for images, documents
+                # parsed in the background, and content parsed before)
+                if parse_inline and markdown_content is None:
+                    markdown_content = await run_in_threadpool(
+                        self.parser.parse,
+                        content=spool,
+                        mime_type=file_data.mime_type,
+                        filename=file_data.filename,
+                    )
+                    if markdown_content:
+                        await run_in_threadpool(
+                            cache_blob_markdown, sha256, file_data.mime_type, markdown_content
+                        )
+                # Prepare images for the model once, instead of on every
+                # chat turn that uses them
+                if not is_document and derivative is None:
+                    derivative = await store_derivative(
+                        s3_key, sha256, spool.getvalue(), file_data.mime_type,
+                    )
+            except BaseException:
+                await release_blob_async(sha256)
+                raise
+
+        record_upload(writer.size, hit=blob is not None)
+        return FileUpload(
             uuid=file_id,
             filename=file_data.filename,
             mime_type=file_data.mime_type,
-            file_size=len(file_content),
+            file_size=writer.size,
             s3_key=s3_key,
+            content_sha256=sha256,
+            derivative_s3_key=derivative[0] if derivative else None,
+            derivative_mime_type=derivative[1] if derivative else None,
+            derivative_size=derivative[2] if derivative else None,
             user_uuid=user_uuid,
             markdown_content=markdown_content,
+            parse_status=(
+                PARSE_STATUS_PENDING
+                if is_document and not parse_inline and markdown_content is None
+                else PARSE_STATUS_COMPLETED
+            ),
         )
 
-        self.session.add(file_upload)
-        self.session.commit()
-        self.session.refresh(file_upload)
+    async def _store_content(
+        self, writer: AsyncS3UploadWriter, sha256: str, mime_type: str
+    ) -> Tuple[str, Optional[FileBlob]]:
+        """
+        Finish a streamed upload, taking a reference to its blob.
+
+        If the content is already stored the upload is discarded and the
+        existing blob is shared; otherwise the object is completed and
+        registered as a new blob.
 
+        Returns:
+            Tuple of (S3 key of the blob, existing blob or None if new)
+        """
+        try:
+            blob = await run_in_threadpool(acquire_blob, sha256)
+        except BaseException:
+            await writer.abort()
+            raise
+        if blob is not None:
+            await writer.abort()
+            return blob.s3_key, blob
+
+        try:
+            s3_key = await writer.complete()
+        except BaseException:
+            await writer.abort()
+            raise
+        try:
+            blob_key = await run_in_threadpool(
+                register_blob, sha256, s3_key, writer.size, mime_type
+            )
+        except BaseException:
+            await self.s3.delete(s3_key)
+            raise
+        if blob_key != s3_key:
+            # A concurrent upload stored the same content first
+            await self.s3.delete(s3_key)
+        return blob_key, None
+
+    @traced()
+    async def create_presigned_upload(
+        self,
+        file_data: FileUploadCreate,
+        sha256: Optional[str],
+        user_uuid: UUID,
+    ) -> dict:
+        """
+        Issue URLs for the client to upload a file directly to S3.
+
+        The URLs only write the file's own key, under
+        uploads/{user_uuid}/{file_id}/, and expire after
+        PRESIGNED_URL_EXPIRES_S. Files over PRESIGNED_MULTIPART_THRESHOLD
+        get one URL per MULTIPART_PART_SIZE part; smaller files a single
+        PUT, signed with the content's SHA-256 when the client gives it.
+
+        Args:
+            file_data: File metadata
+            sha256: Hex SHA-256 of the content, if known
+            user_uuid: User UUID
+
+        Returns:
+            Upload instructions (see PresignedUploadRead)
+
+        Raises:
+            ValueError: If file type is not allowed or file is too large
+        """
+        if not is_allowed_file_type(file_data.mime_type):
+            raise ValueError(f"Unsupported file type: {file_data.mime_type}")
+        if not 0 < file_data.file_size <= MAX_FILE_SIZE:
+            raise ValueError(f"File size must be between 1 and {MAX_FILE_SIZE} bytes")
+
+        file_id = uuid4()
+        s3_key = upload_key(user_uuid, file_id, file_data.filename)
+        if file_data.file_size > PRESIGNED_MULTIPART_THRESHOLD:
+            upload = await self.s3.presign_multipart_upload(
+                s3_key, file_data.mime_type, file_data.file_size,
+                MULTIPART_PART_SIZE, PRESIGNED_URL_EXPIRES_S,
+            )
+            return {
+                "file_id": file_id,
+                "method": "multipart",
+                "part_size": MULTIPART_PART_SIZE,
+                "expires_in": PRESIGNED_URL_EXPIRES_S,
+                **upload,
+            }
+
+        try:
+            checksum = base64.b64encode(bytes.fromhex(sha256)).decode() if sha256 else None
+        except ValueError:
+            raise ValueError("sha256 must be a hex SHA-256 digest")
+        upload = await self.s3.presign_upload(
+            s3_key, file_data.mime_type, file_data.file_size, checksum, PRESIGNED_URL_EXPIRES_S
+        )
+        return {
+            "file_id": file_id,
+            "method": "PUT",
+            "expires_in": PRESIGNED_URL_EXPIRES_S,
+            **upload,
+        }
+
+    @traced()
+    async def complete_presigned_upload(
+        self,
+        file_id: UUID,
+        upload: PresignedUploadComplete,
+        user_uuid: UUID,
+    ) -> FileUpload:
+        """
+        Verify a file the client uploaded directly to S3 and create its record.
+
+        The record is inserted first, as processing, so that of concurrent
+        completions of one upload only one goes on. The object must exist,
+        be within MAX_FILE_SIZE and start with the signature of its
+        declared type (images are also checked for their pixel count);
+        otherwise it is deleted. Only its first SNIFF_SIZE bytes are read.
+        Content whose SHA-256 S3 verified is deduplicated like streamed
+        uploads. Documents are queued for parsing and images for their
+        LLM-ready version, unless the content was processed before.
+
+        Args:
+            file_id: File ID the upload URLs were issued for
+            upload: Filename, MIME type and, for multipart uploads, the parts
+            user_uuid: User UUID
+
+        Returns:
+            Created FileUpload record
+
+        Raises:
+            ValueError: If the upload is missing, already completed or invalid
+        """
+        if not is_allowed_file_type(upload.mime_type):
+            raise ValueError(f"Unsupported file type: {upload.mime_type}")
+
+        # Claim the file ID before touching the object: of concurrent
+        # completions (a client retrying), only one gets past the insert
+        s3_key = upload_key(user_uuid, file_id, upload.filename)
+        file_upload = FileUpload(
+            uuid=file_id,
+            filename=upload.filename,
+            mime_type=upload.mime_type,
+            file_size=0,
+            s3_key=s3_key,
+            user_uuid=user_uuid,
+            parse_status=PARSE_STATUS_PROCESSING,
+            updated_at=datetime.utcnow(),
+        )
+        try:
+            self.session.add(file_upload)
+            self.session.commit()
+        except IntegrityError:
+            self.session.rollback()
+            raise ValueError("Upload already completed")
+
+        invalid = False
+        sha256 = None
+        try:
+            if upload.upload_id:
+                try:
+                    await self.s3.complete_multipart_upload(
+                        s3_key,
+                        upload.upload_id,
+                        [{"PartNumber": p.part_number, "ETag": p.etag} for p in upload.parts],
+                    )
+                except ClientError as e:
+                    raise ValueError(
+                        f"Failed to complete upload: {e.response['Error'].get('Code')}"
+                    )
+
+            head = await self.s3.head(s3_key)
+            if head is None:
+                raise ValueError("File was not uploaded")
+            size = head["ContentLength"]
+            is_document = not is_image_type(upload.mime_type)
+            try:
+                if size > MAX_FILE_SIZE:
+                    raise ValueError(f"File size exceeds limit: {MAX_FILE_SIZE} bytes")
+                header = await self.s3.download_range(s3_key, SNIFF_SIZE)
+                if sniff_mime_type(header) != upload.mime_type:
+                    raise ValueError(f"File content is not {upload.mime_type}")
+                if not is_document:
+                    check_image_header(header)
+            except ValueError:
+                invalid = True
+                raise
+
+            # S3 checked the content against this checksum (a multipart
+            # upload's is a checksum of part checksums, which cannot be
+            # shared)
+            checksum = head.get("ChecksumSHA256")
+            full_object = head.get("ChecksumType", "FULL_OBJECT") == "FULL_OBJECT"
+            blob = None
+            if checksum and "-" not in checksum and full_object:
+                content_sha256 = base64.b64decode(checksum).hex()
+                s3_key, blob = await _run_to_completion(
+                    self._share_content(s3_key, content_sha256, size, upload.mime_type),
+                    undo=lambda _: release_blob_async(content_sha256),
+                )
+                sha256 = content_sha256
+
+            markdown_content = None
+            derivative = None
+            if blob is not None:
+                if blob.mime_type == upload.mime_type:
+                    markdown_content = blob.markdown_content
+                if blob.derivative_s3_key:
+                    derivative = (
+                        blob.derivative_s3_key, blob.derivative_mime_type, blob.derivative_size
+                    )
+            processed = markdown_content is not None if is_document else derivative is not None
+
+            file_upload.file_size = size
+            file_upload.s3_key = s3_key
+            file_upload.content_sha256 = sha256
+            if derivative:
+                (
+                    file_upload.derivative_s3_key,
+                    file_upload.derivative_mime_type,
+                    file_upload.derivative_size,
+                ) = derivative
+            file_upload.markdown_content = markdown_content
+            file_upload.parse_status = (
+                PARSE_STATUS_COMPLETED if processed else PARSE_STATUS_PENDING
+            )
+            self.session.add(file_upload)
+            self.session.commit()
+        except BaseException:
+            # Give up the claim, then what only this call references: the
+            # blob reference it took, or the object if it failed validation
+            self.session.rollback()
+            self.session.delete(file_upload)
+            self.session.commit()
+            if sha256:
+                await release_blob_async(sha256)
+            elif invalid:
+                await self.s3.delete(s3_key)
+            raise
+        record_upload(size, hit=blob is not None)
+
+        self.session.refresh(file_upload)
+        if file_upload.parse_status == PARSE_STATUS_PENDING:
+            if self.parse_queue.inline:
+                await self.parse_queue.process_now(file_upload.uuid)
+                self.session.refresh(file_upload)
+            else:
+                self.parse_queue.enqueue(file_upload.uuid)
         return file_upload
 
+    async def _share_content(
+        self, s3_key: str, sha256: str, size: int, mime_type: str
+    ) -> Tuple[str, Optional[FileBlob]]:
+        """
+        Take a reference to the blob of a directly uploaded object.
+
+        If the content is already stored the object is deleted and the
+        existing blob is shared; otherwise the object becomes a new blob.
+        If taking the reference fails the object is kept, as the blob may
+        have been registered with it.
+
+        Returns:
+            Tuple of (S3 key of the blob, existing blob or None if new)
+        """
+        blob = await run_in_threadpool(acquire_blob, sha256)
+        if blob is not None:
+            if blob.s3_key != s3_key:
+                await self.s3.delete(s3_key)
+            return blob.s3_key, blob
+        blob_key = await run_in_threadpool(register_blob, sha256, s3_key, size, mime_type)
+        if blob_key != s3_key:
+            # A concurrent upload stored the same content first
+            await self.s3.delete(s3_key)
+        return blob_key, None
+
+    @traced()
     def get_file(self, file_uuid: UUID, user_uuid: UUID) -> Optional[FileUpload]:
         """
         Get file metadata by UUID.
@@ -102,7 +588,26 @@ class FileService:
         )
         return self.session.exec(statement).first()
 
-    def get_file_content(
+    @traced()
+    def get_parse_status(self, file_uuid: UUID, user_uuid: UUID) -> Optional[str]:
+        """
+        Get a file's document parsing status without loading its content.
+
+        Args:
+            file_uuid: File UUID
+            user_uuid: User UUID (for permission check)
+
+        Returns:
+            Parse status or None if not found
+        """
+        statement = select(FileUpload.parse_status).where(
+            FileUpload.uuid == file_uuid,
+            FileUpload.user_uuid == user_uuid,
+        )
+        return self.session.exec(statement).first()
+
+    @traced()
+    async def get_file_content(
         self, file_uuid: UUID, user_uuid: UUID
     ) -> Optional[Tuple[FileUpload, bytes]]:
         """
@@ -119,9 +624,10 @@ class FileService:
         if not file_upload:
             return None
 
-        content = self.s3.download(file_upload.s3_key)
+        content = await self.s3.download(file_upload.s3_key)
         return file_upload, content
 
+    @traced()
     def get_files_by_uuids(
         self,
         file_uuids: List[UUID],
@@ -146,29 +652,47 @@ class FileService:
         )
         return list(self.session.exec(statement).all())
 
-    def get_files_with_content(
+    @traced()
+    def get_files_for_llm(
         self,
         file_uuids: List[UUID],
         user_uuid: UUID,
-    ) -> List[Tuple[FileUpload, bytes]]:
+    ) -> List[FileUpload]:
         """
-        Get multiple file metadata and contents.
+        Get multiple file records for building LLM input.
+
+        Parsed Markdown is not loaded: documents are sent from their
+        chunks (see document_index), and images from their S3 content,
+        which the caller downloads itself.
 
         Args:
             file_uuids: List of file UUIDs
             user_uuid: User UUID (for permission check)
 
         Returns:
-            List of (FileUpload, content bytes) tuples
+            List of FileUpload records
         """
-        files = self.get_files_by_uuids(file_uuids, user_uuid)
-        results = []
-        for file in files:
-            content = self.s3.download(file.s3_key)
-            results.append((file, content))
-        return results
+        if not file_uuids:
+            return []
 
-    def delete_file(self, file_uuid: UUID, user_uuid: UUID) -> bool:
+        statement = (
+            select(FileUpload)
+            .options(defer(FileUpload.markdown_content))
+            .where(
+                FileUpload.uuid.in_(file_uuids),
+                FileUpload.user_uuid == user_uuid,
+            )
+        )
+        files = []
+        for file in self.session.exec(statement).all():
+            # Unset rather than loaded on access, which would fail once
+            # the session is closed; not a change to flush back
+            set_committed_value(file, "markdown_content", None)
+            files.append(file)
+        return files
+
+    @traced()
+    async def delete_file(self, file_uuid: UUID, user_uuid: UUID) -> bool:
         """
         Delete file from S3 and database.
 
@@ -183,10 +707,18 @@ class FileService:
         if not file_upload:
             return False
 
-        # Delete from S3
-        self.s3.delete(file_upload.s3_key)
-
-        # Delete from database
+        # Delete the record, and the content once no other file shares it,
+        # in one transaction; the objects go only after it is committed
+        if file_upload.content_sha256:
+            s3_keys = drop_blob_reference(self.session, file_upload.content_sha256) or []
+        else:
+            s3_keys = [file_upload.s3_key]
+            # Presigned uploads without a verified checksum keep their
+            # derivative beside the upload, outside file_blobs
+            if file_upload.derivative_s3_key:
+                s3_keys.append(file_upload.derivative_s3_key)
         self.session.delete(file_upload)
         self.session.commit()
+
+        await asyncio.gather(*(self.s3.delete(s3_key) for s3_key in s3_keys))
         return True
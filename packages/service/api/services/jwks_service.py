@@ -0,0 +1,193 @@
+"""
+JWKS service for OIDC token signing keys.
+"""
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import httpx
+from jose import jwk
+from jose.backends.base import Key
+
+from ..telemetry import start_span
+
+logger = logging.getLogger(__name__)
+
+# Called with the issuer whenever its signing keys change
+_key_change_listeners: List[Callable[[str], None]] = []
+
+
+def add_key_change_listener(listener: Callable[[str], None]) -> None:
+    """Register a callback for signing key changes, e.g. to drop cached verifications."""
+    _key_change_listeners.append(listener)
+
+
+class JWKSManager:
+    """Signing keys of one OIDC issuer, indexed by kid.
+
+    Keys are fetched with an async client and parsed once. They are
+    refreshed in the background every `ttl` seconds, and on demand when a
+    token names an unknown kid (at most once per `min_refresh_interval`,
+    so tokens with bogus kids cannot hammer the IdP). Concurrent refreshes
+    share a single in-flight fetch.
+    """
+
+    def __init__(self, issuer: str, ttl: float = 3600, min_refresh_interval: float = 60):
+        self.issuer = issuer.rstrip("/")
+        self.ttl = ttl
+        self.min_refresh_interval = min_refresh_interval
+        self._keys: Dict[str, Key] = {}
+        # Raw JWKs, to detect key changes on refresh
+        self._key_set: Dict[str, dict] = {}
+        self._jwks_uri: Optional[str] = None
+        self._fetched_at = 0.0
+        self._last_refresh = float("-inf")
+        self._inflight: Optional[asyncio.Task] = None
+        self._refresh_loop: Optional[asyncio.Task] = None
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=10.0)
+        return self._client
+
+    async def _fetch(self) -> None:
+        """Fetch and parse the issuer's JWKS."""
+        with start_span("jwks.fetch", {"oidc.issuer": self.issuer}):
+            client = self._get_client()
+            if self._jwks_uri is None:
+                response = await client.get(f"{self.issuer}/.well-known/openid-configuration")
+                response.raise_for_status()
+                jwks_uri = response.json().get("jwks_uri")
+                if not jwks_uri:
+                    raise ValueError("JWKS URI not found in OIDC configuration")
+                self._jwks_uri = jwks_uri
+
+            response = await client.get(self._jwks_uri)
+            response.raise_for_status()
+
+        keys = {}
+        key_set = {}
+        for key_data in response.json().get("keys", []):
+            if key_data.get("use", "sig") != "sig":
+                continue
+            try:
+                key = jwk.construct(key_data, algorithm=key_data.get("alg", "RS256"))
+            except Exception as e:
+                logger.warning(f"Skipping unusable JWK {key_data.get('kid')}: {str(e)}")
+                continue
+            keys[key_data.get("kid")] = key
+            key_set[key_data.get("kid")] = key_data
+
+        if not keys:
+            raise ValueError("JWKS contains no usable signing keys")
+
+        changed = key_set != self._key_set
+        self._keys = keys
+        self._key_set = key_set
+        self._fetched_at = time.monotonic()
+        if changed:
+            logger.info(f"Loaded {len(keys)} signing keys from {self._jwks_uri}")
+            for listener in _key_change_listeners:
+                listener(self.issuer)
+
+    async def refresh(self) -> None:
+        """Refresh the keys, joining a fetch that is already in flight."""
+        if self._inflight is None or self._inflight.done():
+            self._last_refresh = time.monotonic()
+            self._inflight = asyncio.create_task(self._fetch())
+        # Shield so that a cancelled request does not cancel the shared fetch
+        await asyncio.shield(self._inflight)
+
+    async def get_key(self, kid: Optional[str]) -> Any:
+        """Get the verification key(s) for a token's kid.
+
+        Returns:
+            A parsed key, or all keys when the token has no kid
+
+        Raises:
+            LookupError: If no key matches the kid after a refresh
+        """
+        if not self._keys:
+            await self.refresh()
+        elif time.monotonic() - self._fetched_at > self.ttl:
+            # Background refresh is not running (or failing); refresh
+            # without blocking this request on the old keys
+            self._schedule_refresh()
+
+        if kid is None:
+            return list(self._keys.values())
+
+        key = self._keys.get(kid)
+        if key is None and time.monotonic() - self._last_refresh >= self.min_refresh_interval:
+            logger.info(f"Unknown kid {kid}, refreshing JWKS")
+            await self.refresh()
+            key = self._keys.get(kid)
+        if key is None:
+            raise LookupError(f"No signing key found for kid {kid}")
+        return key
+
+    def _schedule_refresh(self) -> None:
+        if self._inflight is not None and not self._inflight.done():
+            return
+        if time.monotonic() - self._last_refresh < self.min_refresh_interval:
+            return
+        task = asyncio.ensure_future(self.refresh())
+        task.add_done_callback(self._log_refresh_error)
+
+    @staticmethod
+    def _log_refresh_error(task: asyncio.Future) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"JWKS refresh failed: {str(task.exception())}")
+
+    async def _run_refresh_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.ttl)
+            try:
+                await self.refresh()
+            except Exception as e:
+                # Keep serving the previous keys until the next attempt
+                logger.error(f"JWKS refresh failed: {str(e)}")
+
+    async def start(self) -> None:
+        """Prefetch the keys and start the background refresh."""
+        try:
+            await self.refresh()
+        except Exception as e:
+            logger.error(f"JWKS prefetch failed, will retry on first request: {str(e)}")
+        if self._refresh_loop is None:
+            self._refresh_loop = asyncio.create_task(self._run_refresh_loop())
+
+    async def stop(self) -> None:
+        """Stop the background refresh and close the HTTP client."""
+        if self._refresh_loop is not None:
+            self._refresh_loop.cancel()
+            self._refresh_loop = None
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+# Singleton instances, one per issuer
+_jwks_managers: Dict[str, JWKSManager] = {}
+
+
+def get_jwks_manager(issuer: Optional[str] = None) -> JWKSManager:
+    """
+    Get the JWKS manager for an issuer (default: OIDC_ISSUER).
+
+    Returns:
+        JWKSManager instance
+    """
+    issuer = issuer or os.getenv("OIDC_ISSUER")
+    if not issuer:
+        raise ValueError("OIDC_ISSUER not configured")
+    if issuer not in _jwks_managers:
+        _jwks_managers[issuer] = JWKSManager(
+            issuer,
+            ttl=float(os.getenv("JWKS_CACHE_TTL", "3600")),
+            min_refresh_interval=float(os.getenv("JWKS_MIN_REFRESH_INTERVAL", "60")),
+        )
+    return _jwks_managers[issuer]
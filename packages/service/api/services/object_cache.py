@@ -0,0 +1,251 @@
+"""Local disk cache of S3 objects sent to the model."""
+
+import asyncio
+import hashlib
+import logging
+import mmap
+import os
+import re
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+from ..telemetry import get_meter
+from .s3_storage import get_async_s3_storage
+
+logger = logging.getLogger(__name__)
+
+meter = get_meter()
+cache_counter = meter.create_counter(
+    "files.object_cache",
+    description="S3 object reads, by cache result (hit, revalidated or miss)",
+)
+
+
+def get_object_cache_config() -> dict:
+    """Get S3 object cache settings from environment."""
+    return {
+        "enabled": os.getenv("OBJECT_CACHE_ENABLED", "true").lower() == "true",
+        "dir": os.getenv(
+            "OBJECT_CACHE_DIR", os.path.join(tempfile.gettempdir(), "strands-object-cache")
+        ),
+        # Per process (see ObjectCache)
+        "max_bytes": int(os.getenv("OBJECT_CACHE_MAX_MB", "512")) * 1024 * 1024,
+        # Upload keys are never overwritten, so cached copies are served
+        # without asking S3; with revalidation every read is a conditional
+        # GET, which still skips the transfer when the ETag matches
+        "revalidate": os.getenv("OBJECT_CACHE_REVALIDATE", "false").lower() == "true",
+        # S3 downloads in flight per chat request
+        "fetch_concurrency": int(os.getenv("S3_FETCH_CONCURRENCY", "4")),
+    }
+
+
+class ObjectCache:
+    """Size-capped directory of S3 object copies, evicted least recently used.
+
+    Entries are keyed by S3 key and ETag: the file name is the key's
+    SHA-256 followed by the ETag, so a changed object never reads as its
+    old copy. The LRU index lives in this process and is rebuilt from the
+    directory (by modification time, which hits refresh) at startup.
+    Several processes may share the directory; an entry evicted by
+    another process just reads as a miss. Each process only counts (and
+    evicts) the entries it knows of, so the cap applies per process: N
+    workers sharing a directory can fill up to N times max_bytes.
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.size = 0
+        # Key hash -> (ETag, file size), least recently used first
+        self._entries: "OrderedDict[str, Tuple[str, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._load()
+
+    def _load(self) -> None:
+        found = []
+        for entry in os.scandir(self.directory):
+            if entry.name.startswith(".tmp-"):
+                # Left by a process that stopped while writing
+                os.unlink(entry.path)
+                continue
+            name, _, etag = entry.name.partition(".")
+            if not etag or not entry.is_file():
+                continue
+            stat = entry.stat()
+            found.append((stat.st_mtime, name, etag, stat.st_size))
+        for _, name, etag, size in sorted(found):
+            self._entries[name] = (etag, size)
+            self.size += size
+        self._evict()
+
+    @staticmethod
+    def _key_hash(s3_key: str) -> str:
+        return hashlib.sha256(s3_key.encode("utf-8")).hexdigest()
+
+    def _path(self, key_hash: str, etag: str) -> str:
+        return os.path.join(self.directory, f"{key_hash}.{etag}")
+
+    def _remove(self, key_hash: str) -> None:
+        """Drop an entry (the lock must be held)."""
+        etag, size = self._entries.pop(key_hash)
+        self.size -= size
+        try:
+            os.unlink(self._path(key_hash, etag))
+        except FileNotFoundError:
+            pass
+
+    def _evict(self) -> None:
+        """Drop least recently used entries until within the size cap."""
+        while self.size > self.max_bytes and self._entries:
+            self._remove(next(iter(self._entries)))
+
+    def get(self, s3_key: str) -> Optional[Tuple[str, bytes]]:
+        """
+        Read a cached object.
+
+        Args:
+            s3_key: S3 storage path
+
+        Returns:
+            Tuple of (ETag, content), or None if not cached
+        """
+        key_hash = self._key_hash(s3_key)
+        with self._lock:
+            entry = self._entries.get(key_hash)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key_hash)
+        etag = entry[0]
+        path = self._path(key_hash, etag)
+        try:
+            with open(path, "rb") as f:
+                if entry[1] == 0:
+                    return etag, b""
+                # Mapped rather than read, so the copy comes straight from
+                # the page cache
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    content = mapped[:]
+            os.utime(path)
+        except (FileNotFoundError, ValueError):
+            # Evicted by another process
+            with self._lock:
+                if self._entries.get(key_hash) == entry:
+                    self._remove(key_hash)
+            return None
+        return etag, content
+
+    def put(self, s3_key: str, etag: str, content: bytes) -> None:
+        """
+        Store an object, replacing any copy of another version.
+
+        Args:
+            s3_key: S3 storage path
+            etag: ETag of this version
+            content: Object content
+        """
+        if len(content) > self.max_bytes:
+            return
+        # ETags are quoted hex digests, possibly with a part count suffix
+        etag = re.sub(r"[^0-9A-Za-z-]", "", etag)
+        key_hash = self._key_hash(s3_key)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(content)
+            os.replace(tmp_path, self._path(key_hash, etag))
+        except OSError as e:
+            logger.warning(f"Failed to cache {s3_key}: {str(e)}")
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            return
+        with self._lock:
+            previous = self._entries.pop(key_hash, None)
+            if previous is not None:
+                self.size -= previous[1]
+                if previous[0] != etag:
+                    try:
+                        os.unlink(self._path(key_hash, previous[0]))
+                    except FileNotFoundError:
+                        pass
+            self._entries[key_hash] = (etag, len(content))
+            self.size += len(content)
+            self._evict()
+
+
+# Singleton instance
+_object_cache: Optional[ObjectCache] = None
+_object_cache_lock = threading.Lock()
+
+
+def get_object_cache() -> Optional[ObjectCache]:
+    """
+    Get S3 object cache singleton.
+
+    Returns:
+        ObjectCache instance, or None if the cache is disabled
+    """
+    global _object_cache
+    config = get_object_cache_config()
+    if not config["enabled"]:
+        return None
+    if _object_cache is None:
+        with _object_cache_lock:
+            if _object_cache is None:
+                _object_cache = ObjectCache(config["dir"], config["max_bytes"])
+    return _object_cache
+
+
+async def fetch_object(s3_key: str) -> bytes:
+    """
+    Get an object's content, from the local cache when it has a copy.
+
+    Args:
+        s3_key: S3 storage path
+
+    Returns:
+        Object content
+    """
+    cache = get_object_cache()
+    cached = await run_in_threadpool(cache.get, s3_key) if cache else None
+    if cached is not None and not get_object_cache_config()["revalidate"]:
+        cache_counter.add(1, {"result": "hit"})
+        return cached[1]
+
+    content, etag = await get_async_s3_storage().download_if_changed(
+        s3_key, cached[0] if cached is not None else None
+    )
+    if content is None:
+        cache_counter.add(1, {"result": "revalidated"})
+        return cached[1]
+    cache_counter.add(1, {"result": "miss"})
+    if cache:
+        await run_in_threadpool(cache.put, s3_key, etag, content)
+    return content
+
+
+async def fetch_objects(s3_keys: List[str]) -> List[bytes]:
+    """
+    Get the contents of several objects, downloading them concurrently.
+
+    At most S3_FETCH_CONCURRENCY downloads are in flight at once.
+
+    Args:
+        s3_keys: S3 storage paths
+
+    Returns:
+        Object contents, in the order of s3_keys
+    """
+    semaphore = asyncio.Semaphore(get_object_cache_config()["fetch_concurrency"])
+
+    async def fetch(s3_key: str) -> bytes:
+        async with semaphore:
+            return await fetch_object(s3_key)
+
+    return list(await asyncio.gather(*(fetch(s3_key) for s3_key in s3_keys)))
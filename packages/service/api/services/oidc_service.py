@@ -1,106 +1,160 @@
 """
 OIDC service for user information retrieval.
 """
+import asyncio
+import hashlib
 import logging
 import os
-from typing import Dict, Any
-from fastapi import HTTPException
-from oic.oic import Client
-from oic.utils.authn.client import CLIENT_AUTHN_METHOD
-from oic.oic.message import Message as OICMessage, SINGLE_REQUIRED_STRING, SINGLE_OPTIONAL_STRING
+import threading
+from typing import Any, Dict, Optional
+
+import httpx
 from cachetools import TTLCache
+from fastapi import HTTPException
+
+from ..telemetry import start_span, traced
 
 logger = logging.getLogger(__name__)
 
+# Claims kept from the userinfo response
+USERINFO_CLAIMS = ("sub", "name", "email", "preferred_username")
 
-# Define UserInfo schema for OIDC
-class UserInfoSchema(OICMessage):
-    c_param = {
-        "sub": SINGLE_REQUIRED_STRING,
-        "name": SINGLE_OPTIONAL_STRING,
-        "email": SINGLE_OPTIONAL_STRING,
-        "preferred_username": SINGLE_OPTIONAL_STRING,
-    }
 
+class OIDCUserInfoClient:
+    """Async client for one issuer's userinfo endpoint.
 
-# Global OIDC client and cache
-_oidc_client = None
-_provider_configured = False
-_user_info_cache = TTLCache(maxsize=2000, ttl=3600)  # 1 hour TTL
+    All requests share one HTTP connection pool. The discovery document is
+    fetched once (prefetched by `start()`), responses are cached per token,
+    and concurrent lookups of the same token share a single in-flight
+    request, so a burst of first logins hits the IdP once.
+    """
 
+    def __init__(self, issuer: str, cache_size: int = 2000, cache_ttl: float = 3600):
+        self.issuer = issuer.rstrip("/")
+        # Keyed by token hash, so raw tokens are not kept in memory
+        self._cache = TTLCache(maxsize=cache_size, ttl=cache_ttl)
+        self._cache_lock = threading.Lock()
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._userinfo_endpoint: Optional[str] = None
+        self._discovery: Optional[asyncio.Task] = None
+        self._client: Optional[httpx.AsyncClient] = None
 
-def get_oidc_client() -> Client:
-    """Get or create OIDC client (singleton pattern)."""
-    global _oidc_client
-    if _oidc_client is None:
-        try:
-            _oidc_client = Client(client_authn_method=CLIENT_AUTHN_METHOD)
-            logger.info("OIDC client initialized successfully")
-        except Exception as e:
-            logger.error(f"Failed to initialize OIDC client: {str(e)}")
-            raise HTTPException(
-                status_code=500,
-                detail=f"OIDC client initialization failed: {str(e)}"
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=10.0,
+                limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+            )
+        return self._client
+
+    async def _discover(self) -> None:
+        with start_span("oidc.discovery", {"oidc.issuer": self.issuer}):
+            response = await self._get_client().get(
+                f"{self.issuer}/.well-known/openid-configuration"
+            )
+            response.raise_for_status()
+        endpoint = response.json().get("userinfo_endpoint")
+        if not endpoint:
+            raise ValueError("userinfo_endpoint not found in OIDC configuration")
+        self._userinfo_endpoint = endpoint
+        logger.info(f"Loaded userinfo endpoint {endpoint}")
+
+    async def get_userinfo_endpoint(self) -> str:
+        """Get the userinfo endpoint, joining a discovery fetch in flight."""
+        if self._userinfo_endpoint is None:
+            if self._discovery is None or self._discovery.done():
+                self._discovery = asyncio.create_task(self._discover())
+            # Shield so that a cancelled request does not cancel the shared fetch
+            await asyncio.shield(self._discovery)
+        return self._userinfo_endpoint
+
+    async def _fetch(self, access_token: str) -> Dict[str, Any]:
+        endpoint = await self.get_userinfo_endpoint()
+        with start_span("oidc.userinfo"):
+            response = await self._get_client().get(
+                endpoint, headers={"Authorization": f"Bearer {access_token}"}
             )
-    return _oidc_client
+        if response.status_code in (400, 401, 403):
+            raise PermissionError(
+                response.headers.get("WWW-Authenticate") or f"HTTP {response.status_code}"
+            )
+        response.raise_for_status()
+
+        data = response.json()
+        if data.get("error"):
+            raise PermissionError(f"{data.get('error')} - {data.get('error_description')}")
+        if not isinstance(data.get("sub"), str):
+            raise ValueError("userinfo response is missing 'sub'")
+        return {claim: data[claim] for claim in USERINFO_CLAIMS if claim in data}
+
+    async def fetch_userinfo(self, access_token: str) -> Dict[str, Any]:
+        """Fetch the user info for an access token.
 
+        Raises:
+            PermissionError: If the provider rejects the token
+            httpx.HTTPError, ValueError: If the provider cannot be queried
+        """
+        cache_key = hashlib.sha256(access_token.encode()).hexdigest()
+        with self._cache_lock:
+            user_info = self._cache.get(cache_key)
+        if user_info is not None:
+            return user_info
 
-def ensure_provider_configured():
-    """Ensure provider configuration is loaded (lazy loading)."""
-    global _provider_configured
-    if not _provider_configured:
-        issuer = os.getenv("OIDC_ISSUER")
-        if not issuer:
-            raise HTTPException(status_code=500, detail="OIDC_ISSUER not configured")
-        
+        task = self._inflight.get(cache_key)
+        if task is None:
+            task = asyncio.create_task(self._fetch(access_token))
+            self._inflight[cache_key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(cache_key, None))
+        user_info = await asyncio.shield(task)
+
+        with self._cache_lock:
+            self._cache[cache_key] = user_info
+        return user_info
+
+    async def start(self) -> None:
+        """Prefetch the discovery document."""
         try:
-            client = get_oidc_client()
-            logger.info(f"Loading provider configuration from: {issuer}")
-            # Get Provider's configuration, including userinfo_endpoint
-            client.provider_config(issuer)
-            _provider_configured = True
-            logger.info("Provider configuration loaded successfully")
+            await self.get_userinfo_endpoint()
         except Exception as e:
-            logger.error(f"Failed to load provider configuration: {str(e)}")
-            raise HTTPException(
-                status_code=500,
-                detail=f"Provider configuration failed: {str(e)}"
-            )
+            logger.error(f"OIDC discovery prefetch failed, will retry on first login: {str(e)}")
 
+    async def stop(self) -> None:
+        """Close the HTTP client."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
 
-def fetch_userinfo_from_oidc(access_token: str) -> Dict[str, Any]:
-    """Fetch user info from OIDC provider's userinfo endpoint using oic library."""
-    try:
-        # Check cache first
-        if access_token in _user_info_cache:
-            logger.debug("User info retrieved from cache")
-            return _user_info_cache[access_token]
-        
-        # Ensure provider is configured
-        ensure_provider_configured()
-        
-        client = get_oidc_client()
-        
-        # Use oic library to fetch user info
-        userinfo_response = client.do_user_info_request(
-            method="GET",
-            token=access_token,
-            user_info_schema=UserInfoSchema
+
+# Singleton instances, one per issuer
+_userinfo_clients: Dict[str, OIDCUserInfoClient] = {}
+
+
+def get_userinfo_client(issuer: Optional[str] = None) -> OIDCUserInfoClient:
+    """
+    Get the userinfo client for an issuer (default: OIDC_ISSUER).
+
+    Returns:
+        OIDCUserInfoClient instance
+    """
+    issuer = issuer or os.getenv("OIDC_ISSUER")
+    if not issuer:
+        raise HTTPException(status_code=500, detail="OIDC_ISSUER not configured")
+    if issuer not in _userinfo_clients:
+        _userinfo_clients[issuer] = OIDCUserInfoClient(
+            issuer,
+            cache_size=int(os.getenv("USERINFO_CACHE_SIZE", "2000")),
+            cache_ttl=float(os.getenv("USERINFO_CACHE_TTL", "3600")),
         )
-        
-        if userinfo_response.get("error"):
-            raise HTTPException(
-                status_code=401,
-                detail=f"OIDC error: {userinfo_response.get('error')} - {userinfo_response.get('error_description')}"
-            )
-        
-        # Store the result in cache
-        user_info = userinfo_response.to_dict()
-        _user_info_cache[access_token] = user_info
-        logger.debug("User info stored in cache")
-        
-        return user_info
-            
+    return _userinfo_clients[issuer]
+
+
+@traced()
+async def fetch_userinfo_from_oidc(access_token: str) -> Dict[str, Any]:
+    """Fetch user info from OIDC provider's userinfo endpoint."""
+    try:
+        return await get_userinfo_client().fetch_userinfo(access_token)
+    except PermissionError as e:
+        raise HTTPException(status_code=401, detail=f"OIDC error: {str(e)}")
     except HTTPException:
         raise
     except Exception as e:
@@ -0,0 +1,457 @@
+"""Background document parsing queue."""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import tempfile
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Sequence
+from uuid import UUID
+
+from sqlalchemy import or_, update
+from sqlmodel import select
+from starlette.concurrency import run_in_threadpool
+
+from ..database.session import get_session_context
+from ..models.file_upload import (
+    FileUpload,
+    PARSE_STATUS_COMPLETED,
+    PARSE_STATUS_FAILED,
+    PARSE_STATUS_PENDING,
+    PARSE_STATUS_PROCESSING,
+)
+from ..telemetry import start_span
+from ..utils.document_worker import (
+    convert_document_bytes,
+    convert_pdf_pages,
+    count_pdf_pages,
+    join_pdf_pages,
+    needs_pdf_text,
+    warm_up,
+)
+from ..utils.document_chunker import chunk_document
+from ..utils.file_format import get_file_extension, is_image_type
+from .file_blobs import (
+    cache_blob_markdown,
+    get_blob_derivative,
+    get_blob_markdown,
+    store_derivative,
+)
+from .document_index import get_document_index_config, store_chunks
+from .s3_storage import get_async_s3_storage
+
+logger = logging.getLogger(__name__)
+
+PARSE_WORKER_MODES = ("process", "thread", "inline")
+
+UNFINISHED_STATUSES = (PARSE_STATUS_PENDING, PARSE_STATUS_PROCESSING)
+
+
+def get_parse_config() -> dict:
+    """Get document parsing settings from environment."""
+    mode = os.getenv("PARSE_WORKER_MODE", "process").lower()
+    if mode not in PARSE_WORKER_MODES:
+        raise ValueError(
+            f"PARSE_WORKER_MODE must be one of {', '.join(PARSE_WORKER_MODES)}, got {mode}"
+        )
+    return {
+        # process: worker processes, thread: worker threads, inline: parse
+        # during the upload request (for platforms that freeze the process
+        # between requests)
+        "mode": mode,
+        "workers": int(os.getenv("PARSE_WORKERS", "2")),
+        # How long a chat request waits for attached documents to finish
+        "wait_timeout_s": float(os.getenv("PARSE_WAIT_TIMEOUT_S", "10")),
+        # Rows left in processing this long (e.g. by a crashed worker) are
+        # parsed again at startup
+        "stale_after_s": float(os.getenv("PARSE_STALE_AFTER_S", "900")),
+        # PDFs are converted in page ranges spread over the worker
+        # processes (process mode with several workers), in up to two
+        # ranges per worker of at least this many pages
+        "pdf_min_pages_per_task": int(os.getenv("PDF_MIN_PAGES_PER_TASK", "16")),
+    }
+
+
+def _claim(file_uuid: UUID) -> Optional[tuple]:
+    """Mark a pending file as processing, unless another worker got it first."""
+    with get_session_context() as session:
+        row = session.execute(
+            update(FileUpload)
+            .where(
+                FileUpload.uuid == file_uuid,
+                FileUpload.parse_status == PARSE_STATUS_PENDING,
+            )
+            .values(parse_status=PARSE_STATUS_PROCESSING, updated_at=datetime.utcnow())
+            .returning(
+                FileUpload.s3_key,
+                FileUpload.mime_type,
+                FileUpload.filename,
+                FileUpload.content_sha256,
+            )
+        ).first()
+        session.commit()
+        return tuple(row) if row else None
+
+
+def _finish(
+    file_uuid: UUID, parse_status: str, chunks: Optional[List[dict]] = None, **values
+) -> None:
+    """Record the outcome (and the markdown, chunks or derivative) of a claimed file."""
+    with get_session_context() as session:
+        result = session.execute(
+            update(FileUpload)
+            .where(
+                FileUpload.uuid == file_uuid,
+                FileUpload.parse_status == PARSE_STATUS_PROCESSING,
+            )
+            .values(parse_status=parse_status, updated_at=datetime.utcnow(), **values)
+        )
+        if result.rowcount and chunks:
+            store_chunks(session, file_uuid, chunks)
+        session.commit()
+
+
+def _reset_unfinished(stale_after_s: float) -> List[UUID]:
+    """Return stale processing rows to pending and list all pending rows."""
+    cutoff = datetime.utcnow() - timedelta(seconds=stale_after_s)
+    with get_session_context() as session:
+        session.execute(
+            update(FileUpload)
+            .where(
+                FileUpload.parse_status == PARSE_STATUS_PROCESSING,
+                or_(FileUpload.updated_at.is_(None), FileUpload.updated_at < cutoff),
+            )
+            .values(parse_status=PARSE_STATUS_PENDING)
+        )
+        session.commit()
+        return list(session.exec(
+            select(FileUpload.uuid).where(FileUpload.parse_status == PARSE_STATUS_PENDING)
+        ).all())
+
+
+def _write_temp_file(content: bytes, suffix: str) -> str:
+    with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as tmp:
+        tmp.write(content)
+        return tmp.name
+
+
+def _get_statuses(file_uuids: Sequence[UUID]) -> Dict[UUID, str]:
+    with get_session_context() as session:
+        rows = session.exec(
+            select(FileUpload.uuid, FileUpload.parse_status)
+            .where(FileUpload.uuid.in_(file_uuids))
+        ).all()
+        return {file_uuid: status for file_uuid, status in rows}
+
+
+class ParseQueue:
+    """Parses uploaded documents in the background.
+
+    Uploads store documents as pending and enqueue them (as do presigned
+    uploads of images, which are prepared for the model here instead of
+    in the upload request). Consumer tasks
+    claim each file in the database, download it into memory and convert
+    it in a process (or thread) pool (unless a duplicate upload of the
+    same content was parsed meanwhile) and chunk the Markdown for
+    retrieval, so parsing neither blocks
+    the event loop nor holds the GIL of the API worker. The database row
+    is the source of truth: rows are claimed with a conditional update, so
+    several API workers can share the table, and unfinished rows are
+    picked up again at startup.
+
+    In process mode with several workers, PDFs of at least twice
+    pdf_min_pages_per_task pages are split into page ranges converted in
+    parallel, and the ranges' Markdown is joined back in page order.
+    """
+
+    def __init__(
+        self,
+        mode: str = "process",
+        workers: int = 2,
+        stale_after_s: float = 900,
+        pdf_min_pages_per_task: int = 16,
+    ):
+        self.mode = mode
+        self.workers = workers
+        self.stale_after_s = stale_after_s
+        self.pdf_min_pages_per_task = pdf_min_pages_per_task
+        self._queue: Optional[asyncio.Queue] = None
+        self._executor: Optional[Executor] = None
+        self._consumers: List[asyncio.Task] = []
+        # Set whenever a file finishes, to wake up waiters
+        self._finished: Optional[asyncio.Event] = None
+
+    @property
+    def inline(self) -> bool:
+        """Whether documents are parsed during the upload request instead."""
+        return self.mode == "inline"
+
+    def _create_executor(self) -> Executor:
+        if self.mode == "thread":
+            return ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="parse-worker")
+        # Spawned rather than forked: the API process runs threads
+        return ProcessPoolExecutor(
+            max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+        )
+
+    async def start(self) -> None:
+        """Start the consumers and requeue unfinished documents."""
+        if self.inline or self._consumers:
+            return
+        self._queue = asyncio.Queue()
+        self._finished = asyncio.Event()
+        self._executor = self._create_executor()
+        await self._warm_up()
+        self._consumers = [
+            asyncio.create_task(self._consume()) for _ in range(self.workers)
+        ]
+        try:
+            for file_uuid in await run_in_threadpool(_reset_unfinished, self.stale_after_s):
+                self.enqueue(file_uuid)
+        except Exception as e:
+            logger.error(f"Failed to requeue unfinished documents: {str(e)}")
+
+    async def _warm_up(self) -> None:
+        # Start the workers and load markitdown before serving requests, so
+        # neither the first upload nor early requests compete with it
+        loop = asyncio.get_running_loop()
+        results = await asyncio.gather(
+            *(loop.run_in_executor(self._executor, warm_up) for _ in range(self.workers)),
+            return_exceptions=True,
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                logger.error(f"Parse worker warm-up failed: {str(result)}")
+                break
+
+    async def stop(self) -> None:
+        """Stop the consumers and the worker pool.
+
+        Files still queued stay pending in the database and are picked up
+        at the next start.
+        """
+        for task in self._consumers:
+            task.cancel()
+        await asyncio.gather(*self._consumers, return_exceptions=True)
+        self._consumers = []
+        if self._executor is not None:
+            await run_in_threadpool(self._executor.shutdown, wait=True, cancel_futures=True)
+            self._executor = None
+
+    def enqueue(self, file_uuid: UUID) -> None:
+        """Queue a pending file for parsing."""
+        if self._queue is None:
+            # Not started (e.g. a script); the row stays pending until a
+            # worker starts
+            logger.warning(f"Parse queue not running, file {file_uuid} stays pending")
+            return
+        self._queue.put_nowait(file_uuid)
+
+    async def _consume(self) -> None:
+        while True:
+            file_uuid = await self._queue.get()
+            try:
+                await self._process(file_uuid)
+            except Exception as e:
+                logger.error(f"Failed to process document {file_uuid}: {str(e)}", exc_info=True)
+            finally:
+                self._queue.task_done()
+
+    async def process_now(self, file_uuid: UUID) -> None:
+        """Process a pending file in the calling task (for inline mode)."""
+        await self._process(file_uuid)
+
+    async def _process(self, file_uuid: UUID) -> None:
+        job = await run_in_threadpool(_claim, file_uuid)
+        if job is None:
+            return
+        s3_key, mime_type, filename, sha256 = job
+
+        values = {}
+        chunks = None
+        parse_status = PARSE_STATUS_FAILED
+        try:
+            if is_image_type(mime_type):
+                values = await self._prepare_image(s3_key, mime_type, sha256)
+            else:
+                markdown_content = await self._parse_document(s3_key, mime_type, filename, sha256)
+                values = {"markdown_content": markdown_content}
+                chunks = await self._chunk(markdown_content, filename)
+            parse_status = PARSE_STATUS_COMPLETED
+        except asyncio.CancelledError:
+            # Shutting down: hand the file back to the next start
+            await run_in_threadpool(_finish, file_uuid, PARSE_STATUS_PENDING)
+            raise
+        except Exception as e:
+            logger.error(f"Failed to process {filename}: {e}", exc_info=True)
+
+        await run_in_threadpool(_finish, file_uuid, parse_status, chunks, **values)
+        if self._finished is not None:
+            self._finished.set()
+            self._finished = asyncio.Event()
+
+    async def _parse_document(
+        self, s3_key: str, mime_type: str, filename: str, sha256: Optional[str]
+    ) -> Optional[str]:
+        ext = get_file_extension(mime_type, filename)
+        if not ext:
+            raise ValueError(f"Unknown document type: {mime_type}")
+        if sha256:
+            # A duplicate of this upload may have been parsed meanwhile
+            markdown_content = await run_in_threadpool(get_blob_markdown, sha256, mime_type)
+            if markdown_content is not None:
+                return markdown_content
+
+        content = await get_async_s3_storage().download(s3_key)
+        started = time.perf_counter()
+        with start_span(
+            "document.parse",
+            {"document.extension": ext, "document.size": len(content), "document.worker": self.mode},
+        ):
+            markdown_content = await self._convert(content, ext, mime_type, filename)
+        logger.info(
+            f"Parsed document {filename} in {time.perf_counter() - started:.2f}s, "
+            f"markdown length: {len(markdown_content) if markdown_content else 0}"
+        )
+        if sha256 and markdown_content:
+            await run_in_threadpool(cache_blob_markdown, sha256, mime_type, markdown_content)
+        return markdown_content
+
+    async def _chunk(self, markdown_content: Optional[str], filename: str) -> Optional[List[dict]]:
+        """Chunk a parsed document for retrieval, in the worker pool."""
+        if not markdown_content:
+            return None
+        try:
+            return await self._run(
+                chunk_document, markdown_content, get_document_index_config()["chunk_tokens"]
+            )
+        except Exception as e:
+            # Chunked the first time a message uses the document instead
+            logger.warning(f"Failed to chunk {filename}: {e}")
+            return None
+
+    async def _prepare_image(self, s3_key: str, mime_type: str, sha256: Optional[str]) -> dict:
+        """Store the LLM-ready version of an image uploaded directly to S3."""
+        derivative = None
+        if sha256:
+            # A duplicate of this upload may have been prepared meanwhile
+            derivative = await run_in_threadpool(get_blob_derivative, sha256)
+        if derivative is None:
+            content = await get_async_s3_storage().download(s3_key)
+            derivative = await store_derivative(s3_key, sha256, content, mime_type)
+        if derivative is None:
+            return {}
+        return {
+            "derivative_s3_key": derivative[0],
+            "derivative_mime_type": derivative[1],
+            "derivative_size": derivative[2],
+        }
+
+    async def _convert(
+        self, content: bytes, ext: str, mime_type: str, filename: str
+    ) -> Optional[str]:
+        if ext == ".pdf" and self.mode == "process" and self.workers > 1:
+            return await self._convert_pdf(content, mime_type, filename)
+        return await self._run(convert_document_bytes, content, ext, mime_type, filename)
+
+    async def _convert_pdf(self, content: bytes, mime_type: str, filename: str) -> Optional[str]:
+        """Convert a PDF in page ranges, in parallel across the workers."""
+        # Workers read the document from a file rather than each being
+        # sent a copy of it
+        path = await run_in_threadpool(_write_temp_file, content, ".pdf")
+        try:
+            try:
+                pages = await self._run(count_pdf_pages, path)
+                # Every range opens the whole document again, so there are
+                # no more ranges than needed to keep the workers busy
+                tasks = min(pages // self.pdf_min_pages_per_task, 2 * self.workers)
+                if tasks > 1:
+                    bounds = [(pages * i // tasks, pages * (i + 1) // tasks) for i in range(tasks)]
+                    ranges = await asyncio.gather(
+                        *(self._run(convert_pdf_pages, path, start, stop) for start, stop in bounds)
+                    )
+                    if needs_pdf_text(ranges):
+                        # No page needs pdfplumber's rendering: use pdfminer's
+                        # text, like whole conversions of such documents
+                        ranges = await asyncio.gather(
+                            *(self._run(convert_pdf_pages, path, start, stop, True)
+                              for start, stop in bounds)
+                        )
+                    logger.info(f"Converted {filename} ({pages} pages) in {len(bounds)} page ranges")
+                    return join_pdf_pages(ranges)
+            except BrokenProcessPool:
+                raise
+            except Exception as e:
+                # Unreadable page trees and the like: let the whole
+                # conversion (and its fallbacks) deal with the document
+                logger.warning(f"Page-range conversion of {filename} failed, converting it whole: {e}")
+            return await self._run(convert_document_bytes, content, ".pdf", mime_type, filename)
+        finally:
+            await run_in_threadpool(os.unlink, path)
+
+    async def _run(self, fn, *args):
+        """Run a conversion function in the worker pool."""
+        loop = asyncio.get_running_loop()
+        executor = self._executor
+        try:
+            return await loop.run_in_executor(executor, fn, *args)
+        except BrokenProcessPool:
+            # A worker died (e.g. out of memory on a hostile document);
+            # replace the pool so the next files can still be parsed. The
+            # other tasks of a split document see the same broken pool.
+            if self._executor is executor:
+                logger.error("Parse worker pool broke, restarting it")
+                executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = self._create_executor()
+            raise
+
+    async def wait_for(self, file_uuids: Sequence[UUID], timeout: float) -> Dict[UUID, str]:
+        """Wait until the files have finished parsing, or the timeout passes.
+
+        Files parsed by another API worker are noticed by polling the
+        database.
+
+        Returns:
+            Parse status by file UUID
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            statuses = await run_in_threadpool(_get_statuses, file_uuids)
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not any(s in UNFINISHED_STATUSES for s in statuses.values()):
+                return statuses
+            finished = self._finished
+            if finished is None:
+                await asyncio.sleep(min(0.5, remaining))
+                continue
+            try:
+                await asyncio.wait_for(finished.wait(), timeout=min(0.5, remaining))
+            except asyncio.TimeoutError:
+                pass
+
+
+# Singleton instance
+_parse_queue: Optional[ParseQueue] = None
+
+
+def get_parse_queue() -> ParseQueue:
+    """
+    Get the document parse queue singleton.
+
+    Returns:
+        ParseQueue instance
+    """
+    global _parse_queue
+    if _parse_queue is None:
+        config = get_parse_config()
+        _parse_queue = ParseQueue(
+            mode=config["mode"],
+            workers=config["workers"],
+            stale_after_s=config["stale_after_s"],
+            pdf_min_pages_per_task=config["pdf_min_pages_per_task"],
+        )
+    return _parse_queue
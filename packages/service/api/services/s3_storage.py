@@ -1,37 +1,284 @@
 """S3 storage service for file uploads."""
 
+import asyncio
 import os
-from typing import Optional
+from typing import List, Optional, Tuple
 from uuid import UUID
 
 import boto3
+from aiobotocore.config import AioConfig
+from aiobotocore.session import get_session as get_aiobotocore_session
+from botocore.config import Config
 from botocore.exceptions import ClientError
 
+from ..telemetry import start_span
+
+# Size of multipart upload parts (S3 requires at least 5 MiB for all but
+# the last part). Bounds the memory held per streaming upload.
+MULTIPART_PART_SIZE = 5 * 1024 * 1024
+
+
+def get_s3_config() -> dict:
+    """Get S3 client settings from environment."""
+    bucket = os.environ.get("MSC_S3_BUCKET")
+    if not bucket:
+        raise ValueError("MSC_S3_BUCKET environment variable is required")
+    return {
+        "bucket": bucket,
+        # Any S3-compatible endpoint, e.g. MinIO or a moto server locally
+        "endpoint": os.environ.get("MSC_S3_ENDPOINT"),
+        # Connections kept open per client; requests beyond this wait
+        "max_pool_connections": int(os.getenv("S3_MAX_POOL_CONNECTIONS", "50")),
+        # How long idle connections are kept for reuse
+        "keepalive_timeout_s": float(os.getenv("S3_KEEPALIVE_TIMEOUT_S", "60")),
+        # Attempts per request, with adaptive (client-side rate limited) retries
+        "max_attempts": int(os.getenv("S3_MAX_ATTEMPTS", "5")),
+        "connect_timeout_s": float(os.getenv("S3_CONNECT_TIMEOUT_S", "5")),
+        "read_timeout_s": float(os.getenv("S3_READ_TIMEOUT_S", "60")),
+    }
+
+
+def _client_options(config: dict) -> dict:
+    """botocore Config options shared by the sync and async clients."""
+    return {
+        # Presigned URLs sign their headers (type, length, checksum) too
+        "signature_version": "s3v4",
+        "max_pool_connections": config["max_pool_connections"],
+        "retries": {"mode": "adaptive", "max_attempts": config["max_attempts"]},
+        "connect_timeout": config["connect_timeout_s"],
+        "read_timeout": config["read_timeout_s"],
+    }
+
+
+def upload_key(user_uuid: UUID, file_id: UUID, filename: str) -> str:
+    """
+    Generate S3 storage path.
+
+    Format: uploads/{user_uuid}/{file_id}/{filename}
+    """
+    return f"uploads/{user_uuid}/{file_id}/{filename}"
+
+
+class S3UploadWriter:
+    """Streams an object to S3 in multipart upload parts.
+
+    `write` only buffers; `flush` uploads the buffered full parts and
+    `complete` finishes the object. Objects smaller than one part are
+    uploaded with a single put_object. `flush`, `complete` and `abort` do
+    blocking I/O, so async callers run them in a thread.
+    """
+
+    def __init__(self, client, bucket: str, s3_key: str, content_type: str,
+                 part_size: int = MULTIPART_PART_SIZE):
+        self.client = client
+        self.bucket = bucket
+        self.s3_key = s3_key
+        self.content_type = content_type
+        self.part_size = part_size
+        self.size = 0
+        self._chunks: List[bytes] = []
+        self._buffered = 0
+        self._upload_id: Optional[str] = None
+        self._parts: List[dict] = []
+
+    @property
+    def needs_flush(self) -> bool:
+        """Whether a full part is buffered."""
+        return self._buffered >= self.part_size
+
+    def write(self, data: bytes) -> None:
+        """Buffer data for upload."""
+        self._chunks.append(data)
+        self._buffered += len(data)
+        self.size += len(data)
+
+    def _take_buffer(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        self._buffered = 0
+        return data
+
+    def _upload_part(self, body: bytes) -> None:
+        part_number = len(self._parts) + 1
+        with start_span(
+            "s3.upload_part",
+            {"s3.key": self.s3_key, "s3.part_number": part_number, "s3.size": len(body)},
+        ):
+            response = self.client.upload_part(
+                Bucket=self.bucket,
+                Key=self.s3_key,
+                UploadId=self._upload_id,
+                PartNumber=part_number,
+                Body=body,
+            )
+        self._parts.append({"PartNumber": part_number, "ETag": response["ETag"]})
+
+    def flush(self) -> None:
+        """Upload all full parts in the buffer."""
+        if not self.needs_flush:
+            return
+        if self._upload_id is None:
+            with start_span("s3.create_multipart_upload", {"s3.key": self.s3_key}):
+                response = self.client.create_multipart_upload(
+                    Bucket=self.bucket, Key=self.s3_key, ContentType=self.content_type
+                )
+            self._upload_id = response["UploadId"]
+        data = self._take_buffer()
+        offset = 0
+        while len(data) - offset >= self.part_size:
+            self._upload_part(data[offset:offset + self.part_size])
+            offset += self.part_size
+        if offset < len(data):
+            self._chunks.append(data[offset:])
+            self._buffered = len(data) - offset
+
+    def complete(self) -> str:
+        """Upload the remaining data and finish the object.
+
+        Returns:
+            S3 key (storage path)
+        """
+        if self._upload_id is None:
+            with start_span("s3.put_object", {"s3.key": self.s3_key, "s3.size": self.size}):
+                self.client.put_object(
+                    Bucket=self.bucket,
+                    Key=self.s3_key,
+                    Body=self._take_buffer(),
+                    ContentType=self.content_type,
+                )
+        else:
+            self.flush()
+            if self._buffered:
+                self._upload_part(self._take_buffer())
+            with start_span("s3.complete_multipart_upload", {"s3.key": self.s3_key}):
+                self.client.complete_multipart_upload(
+                    Bucket=self.bucket,
+                    Key=self.s3_key,
+                    UploadId=self._upload_id,
+                    MultipartUpload={"Parts": self._parts},
+                )
+        return self.s3_key
+
+    def abort(self) -> None:
+        """Discard the upload, releasing any parts already stored."""
+        self._take_buffer()
+        if self._upload_id is None:
+            return
+        with start_span("s3.abort_multipart_upload", {"s3.key": self.s3_key}):
+            try:
+                self.client.abort_multipart_upload(
+                    Bucket=self.bucket, Key=self.s3_key, UploadId=self._upload_id
+                )
+            except ClientError:
+                pass
+        self._upload_id = None
+
+
+class AsyncS3UploadWriter(S3UploadWriter):
+    """S3UploadWriter for an async client.
+
+    Buffers the same way; `flush`, `complete` and `abort` are coroutines.
+    """
+
+    async def _upload_part(self, body: bytes) -> None:
+        part_number = len(self._parts) + 1
+        with start_span(
+            "s3.upload_part",
+            {"s3.key": self.s3_key, "s3.part_number": part_number, "s3.size": len(body)},
+        ):
+            response = await self.client.upload_part(
+                Bucket=self.bucket,
+                Key=self.s3_key,
+                UploadId=self._upload_id,
+                PartNumber=part_number,
+                Body=body,
+            )
+        self._parts.append({"PartNumber": part_number, "ETag": response["ETag"]})
+
+    async def flush(self) -> None:
+        """Upload all full parts in the buffer."""
+        if not self.needs_flush:
+            return
+        if self._upload_id is None:
+            with start_span("s3.create_multipart_upload", {"s3.key": self.s3_key}):
+                response = await self.client.create_multipart_upload(
+                    Bucket=self.bucket, Key=self.s3_key, ContentType=self.content_type
+                )
+            self._upload_id = response["UploadId"]
+        data = self._take_buffer()
+        offset = 0
+        while len(data) - offset >= self.part_size:
+            await self._upload_part(data[offset:offset + self.part_size])
+            offset += self.part_size
+        if offset < len(data):
+            self._chunks.append(data[offset:])
+            self._buffered = len(data) - offset
+
+    async def complete(self) -> str:
+        """Upload the remaining data and finish the object.
+
+        Returns:
+            S3 key (storage path)
+        """
+        if self._upload_id is None:
+            with start_span("s3.put_object", {"s3.key": self.s3_key, "s3.size": self.size}):
+                await self.client.put_object(
+                    Bucket=self.bucket,
+                    Key=self.s3_key,
+                    Body=self._take_buffer(),
+                    ContentType=self.content_type,
+                )
+        else:
+            await self.flush()
+            if self._buffered:
+                await self._upload_part(self._take_buffer())
+            with start_span("s3.complete_multipart_upload", {"s3.key": self.s3_key}):
+                await self.client.complete_multipart_upload(
+                    Bucket=self.bucket,
+                    Key=self.s3_key,
+                    UploadId=self._upload_id,
+                    MultipartUpload={"Parts": self._parts},
+                )
+        return self.s3_key
+
+    async def abort(self) -> None:
+        """Discard the upload, releasing any parts already stored."""
+        self._take_buffer()
+        if self._upload_id is None:
+            return
+        with start_span("s3.abort_multipart_upload", {"s3.key": self.s3_key}):
+            try:
+                await self.client.abort_multipart_upload(
+                    Bucket=self.bucket, Key=self.s3_key, UploadId=self._upload_id
+                )
+            except ClientError:
+                pass
+        self._upload_id = None
+
 
 class S3Storage:
-    """S3 storage service for file operations."""
+    """S3 storage service for file operations.
 
-    def __init__(self):
-        self.bucket = os.environ.get("MSC_S3_BUCKET")
-        if not self.bucket:
-            raise ValueError("MSC_S3_BUCKET environment variable is required")
+    Blocking; used by scripts and worker threads. Request handlers use
+    AsyncS3Storage, which has the same interface.
+    """
 
-        self.endpoint = os.environ.get("MSC_S3_ENDPOINT")
+    def __init__(self):
+        config = get_s3_config()
+        self.bucket = config["bucket"]
+        self.endpoint = config["endpoint"]
 
         # Create S3 client
         client_kwargs = {}
         if self.endpoint:
             client_kwargs["endpoint_url"] = self.endpoint
 
-        self.client = boto3.client("s3", **client_kwargs)
+        self.client = boto3.client(
+            "s3", config=Config(tcp_keepalive=True, **_client_options(config)), **client_kwargs
+        )
 
     def _get_s3_key(self, user_uuid: UUID, file_id: UUID, filename: str) -> str:
-        """
-        Generate S3 storage path.
-
-        Format: uploads/{user_uuid}/{file_id}/{filename}
-        """
-        return f"uploads/{user_uuid}/{file_id}/{filename}"
+        return upload_key(user_uuid, file_id, filename)
 
     def upload(
         self,
@@ -56,15 +303,61 @@ class S3Storage:
         """
         s3_key = self._get_s3_key(user_uuid, file_id, filename)
 
-        self.client.put_object(
-            Bucket=self.bucket,
-            Key=s3_key,
-            Body=file_content,
-            ContentType=content_type,
-        )
+        with start_span("s3.put_object", {"s3.key": s3_key, "s3.size": len(file_content)}):
+            self.client.put_object(
+                Bucket=self.bucket,
+                Key=s3_key,
+                Body=file_content,
+                ContentType=content_type,
+            )
 
         return s3_key
 
+    def upload_derivative(self, s3_key: str, content: bytes, content_type: str) -> str:
+        """
+        Store a derived version of an object (such as an LLM-ready image)
+        next to it.
+
+        Args:
+            s3_key: S3 storage path of the original
+            content: Derived binary content
+            content_type: MIME type of the derived content
+
+        Returns:
+            S3 key of the derivative
+        """
+        derivative_key = f"{s3_key}.llm"
+        with start_span("s3.put_object", {"s3.key": derivative_key, "s3.size": len(content)}):
+            self.client.put_object(
+                Bucket=self.bucket,
+                Key=derivative_key,
+                Body=content,
+                ContentType=content_type,
+            )
+        return derivative_key
+
+    def open_upload(
+        self,
+        user_uuid: UUID,
+        file_id: UUID,
+        filename: str,
+        content_type: str,
+    ) -> S3UploadWriter:
+        """
+        Start a streaming upload to S3.
+
+        Args:
+            user_uuid: User UUID
+            file_id: File UUID
+            filename: Original filename
+            content_type: MIME type
+
+        Returns:
+            S3UploadWriter for the file's storage path
+        """
+        s3_key = self._get_s3_key(user_uuid, file_id, filename)
+        return S3UploadWriter(self.client, self.bucket, s3_key, content_type)
+
     def download(self, s3_key: str) -> bytes:
         """
         Download file from S3.
@@ -75,8 +368,33 @@ class S3Storage:
         Returns:
             File binary content
         """
-        response = self.client.get_object(Bucket=self.bucket, Key=s3_key)
-        return response["Body"].read()
+        with start_span("s3.get_object", {"s3.key": s3_key}):
+            response = self.client.get_object(Bucket=self.bucket, Key=s3_key)
+            return response["Body"].read()
+
+    def download_if_changed(
+        self, s3_key: str, etag: Optional[str] = None
+    ) -> Tuple[Optional[bytes], str]:
+        """
+        Download file from S3 unless it still has the given ETag.
+
+        Args:
+            s3_key: S3 storage path
+            etag: ETag of a copy the caller already has
+
+        Returns:
+            Tuple of (content, ETag); content is None if the object still
+            has the given ETag
+        """
+        kwargs = {"IfNoneMatch": etag} if etag else {}
+        with start_span("s3.get_object", {"s3.key": s3_key, "s3.conditional": bool(etag)}):
+            try:
+                response = self.client.get_object(Bucket=self.bucket, Key=s3_key, **kwargs)
+            except ClientError as e:
+                if etag and e.response.get("Error", {}).get("Code") in ("304", "NotModified"):
+                    return None, etag
+                raise
+            return response["Body"].read(), response["ETag"]
 
     def delete(self, s3_key: str) -> bool:
         """
@@ -88,11 +406,343 @@ class S3Storage:
         Returns:
             True if deleted successfully, False otherwise
         """
+        with start_span("s3.delete_object", {"s3.key": s3_key}):
+            try:
+                self.client.delete_object(Bucket=self.bucket, Key=s3_key)
+                return True
+            except ClientError:
+                return False
+
+
+class AsyncS3Storage:
+    """S3 storage service for file operations, on an asyncio client.
+
+    Same interface as S3Storage, with coroutines. Requests share one
+    aiobotocore client and its connection pool (up to
+    S3_MAX_POOL_CONNECTIONS connections, idle ones kept open for reuse);
+    throttled or failed requests are retried in adaptive mode. The client
+    belongs to the event loop it was created on; it is created on first
+    use and closed with `close`.
+    """
+
+    def __init__(self):
+        config = get_s3_config()
+        self.bucket = config["bucket"]
+        self.endpoint = config["endpoint"]
+        self._client_kwargs = {
+            "config": AioConfig(
+                connector_args={"keepalive_timeout": config["keepalive_timeout_s"]},
+                **_client_options(config),
+            ),
+        }
+        if self.endpoint:
+            self._client_kwargs["endpoint_url"] = self.endpoint
+        self._client_context = None
+        self._client_task: Optional[asyncio.Task] = None
+        self._client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def _create_client(self):
+        context = get_aiobotocore_session().create_client("s3", **self._client_kwargs)
+        client = await context.__aenter__()
+        self._client_context = context
+        return client
+
+    async def _get_client(self):
+        loop = asyncio.get_running_loop()
+        task = self._client_task
+        failed = task is not None and task.done() and (
+            task.cancelled() or task.exception() is not None
+        )
+        if task is None or failed or self._client_loop is not loop:
+            # A failed creation is retried rather than re-raised forever
+            self._client_loop = loop
+            self._client_task = loop.create_task(self._create_client())
+        # Shielded: a cancelled caller must not cancel the shared creation
+        return await asyncio.shield(self._client_task)
+
+    async def close(self) -> None:
+        """Close the client and its connections."""
+        task, self._client_task = self._client_task, None
+        if task is None or self._client_loop is not asyncio.get_running_loop():
+            return
         try:
-            self.client.delete_object(Bucket=self.bucket, Key=s3_key)
-            return True
-        except ClientError:
-            return False
+            await task
+        except Exception:
+            return
+        await self._client_context.__aexit__(None, None, None)
+
+    async def upload(
+        self,
+        file_content: bytes,
+        user_uuid: UUID,
+        file_id: UUID,
+        filename: str,
+        content_type: str,
+    ) -> str:
+        """
+        Upload file to S3.
+
+        Args:
+            file_content: File binary content
+            user_uuid: User UUID
+            file_id: File UUID
+            filename: Original filename
+            content_type: MIME type
+
+        Returns:
+            S3 key (storage path)
+        """
+        s3_key = upload_key(user_uuid, file_id, filename)
+        client = await self._get_client()
+        with start_span("s3.put_object", {"s3.key": s3_key, "s3.size": len(file_content)}):
+            await client.put_object(
+                Bucket=self.bucket,
+                Key=s3_key,
+                Body=file_content,
+                ContentType=content_type,
+            )
+        return s3_key
+
+    async def upload_derivative(self, s3_key: str, content: bytes, content_type: str) -> str:
+        """
+        Store a derived version of an object (such as an LLM-ready image)
+        next to it.
+
+        Args:
+            s3_key: S3 storage path of the original
+            content: Derived binary content
+            content_type: MIME type of the derived content
+
+        Returns:
+            S3 key of the derivative
+        """
+        derivative_key = f"{s3_key}.llm"
+        client = await self._get_client()
+        with start_span("s3.put_object", {"s3.key": derivative_key, "s3.size": len(content)}):
+            await client.put_object(
+                Bucket=self.bucket,
+                Key=derivative_key,
+                Body=content,
+                ContentType=content_type,
+            )
+        return derivative_key
+
+    async def open_upload(
+        self,
+        user_uuid: UUID,
+        file_id: UUID,
+        filename: str,
+        content_type: str,
+    ) -> AsyncS3UploadWriter:
+        """
+        Start a streaming upload to S3.
+
+        Args:
+            user_uuid: User UUID
+            file_id: File UUID
+            filename: Original filename
+            content_type: MIME type
+
+        Returns:
+            AsyncS3UploadWriter for the file's storage path
+        """
+        s3_key = upload_key(user_uuid, file_id, filename)
+        return AsyncS3UploadWriter(await self._get_client(), self.bucket, s3_key, content_type)
+
+    async def download(self, s3_key: str) -> bytes:
+        """
+        Download file from S3.
+
+        Args:
+            s3_key: S3 storage path
+
+        Returns:
+            File binary content
+        """
+        content, _ = await self.download_if_changed(s3_key)
+        return content
+
+    async def download_if_changed(
+        self, s3_key: str, etag: Optional[str] = None
+    ) -> Tuple[Optional[bytes], str]:
+        """
+        Download file from S3 unless it still has the given ETag.
+
+        Args:
+            s3_key: S3 storage path
+            etag: ETag of a copy the caller already has
+
+        Returns:
+            Tuple of (content, ETag); content is None if the object still
+            has the given ETag
+        """
+        client = await self._get_client()
+        kwargs = {"IfNoneMatch": etag} if etag else {}
+        with start_span("s3.get_object", {"s3.key": s3_key, "s3.conditional": bool(etag)}):
+            try:
+                response = await client.get_object(Bucket=self.bucket, Key=s3_key, **kwargs)
+            except ClientError as e:
+                if etag and e.response.get("Error", {}).get("Code") in ("304", "NotModified"):
+                    return None, etag
+                raise
+            async with response["Body"] as body:
+                return await body.read(), response["ETag"]
+
+    async def download_range(self, s3_key: str, length: int) -> bytes:
+        """
+        Download the first bytes of a file from S3.
+
+        Args:
+            s3_key: S3 storage path
+            length: Number of bytes (fewer if the file is shorter)
+
+        Returns:
+            Leading file content
+        """
+        client = await self._get_client()
+        with start_span("s3.get_object", {"s3.key": s3_key, "s3.range": length}):
+            response = await client.get_object(
+                Bucket=self.bucket, Key=s3_key, Range=f"bytes=0-{length - 1}"
+            )
+            async with response["Body"] as body:
+                return await body.read()
+
+    async def head(self, s3_key: str) -> Optional[dict]:
+        """
+        Get a file's metadata, including its checksum if it was stored
+        with one.
+
+        Args:
+            s3_key: S3 storage path
+
+        Returns:
+            head_object response, or None if the file does not exist
+        """
+        client = await self._get_client()
+        with start_span("s3.head_object", {"s3.key": s3_key}):
+            try:
+                return await client.head_object(
+                    Bucket=self.bucket, Key=s3_key, ChecksumMode="ENABLED"
+                )
+            except ClientError as e:
+                if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                    return None
+                raise
+
+    async def presign_upload(
+        self,
+        s3_key: str,
+        content_type: str,
+        size: int,
+        checksum_sha256: Optional[str],
+        expires_in: int,
+    ) -> dict:
+        """
+        Create a URL for the client to PUT a file directly to S3.
+
+        The content type, length and (if given) SHA-256 checksum are
+        signed, so S3 rejects an upload that does not match them.
+
+        Args:
+            s3_key: S3 storage path
+            content_type: MIME type
+            size: File size in bytes
+            checksum_sha256: Base64 SHA-256 of the content, if known
+            expires_in: URL lifetime in seconds
+
+        Returns:
+            Dict with the URL and the headers the PUT must carry
+        """
+        params = {
+            "Bucket": self.bucket,
+            "Key": s3_key,
+            "ContentType": content_type,
+            "ContentLength": size,
+        }
+        headers = {"Content-Type": content_type}
+        if checksum_sha256:
+            params["ChecksumSHA256"] = checksum_sha256
+            headers["x-amz-checksum-sha256"] = checksum_sha256
+        client = await self._get_client()
+        url = await client.generate_presigned_url(
+            "put_object", Params=params, ExpiresIn=expires_in
+        )
+        return {"url": url, "headers": headers}
+
+    async def presign_multipart_upload(
+        self, s3_key: str, content_type: str, size: int, part_size: int, expires_in: int
+    ) -> dict:
+        """
+        Start a multipart upload and create a URL per part for the client.
+
+        Args:
+            s3_key: S3 storage path
+            content_type: MIME type
+            size: File size in bytes
+            part_size: Size of every part but the last
+            expires_in: URL lifetime in seconds
+
+        Returns:
+            Dict with the upload ID and the part numbers and URLs
+        """
+        client = await self._get_client()
+        with start_span("s3.create_multipart_upload", {"s3.key": s3_key}):
+            response = await client.create_multipart_upload(
+                Bucket=self.bucket, Key=s3_key, ContentType=content_type
+            )
+        upload_id = response["UploadId"]
+        parts = []
+        for part_number in range(1, -(-size // part_size) + 1):
+            url = await client.generate_presigned_url(
+                "upload_part",
+                Params={
+                    "Bucket": self.bucket,
+                    "Key": s3_key,
+                    "UploadId": upload_id,
+                    "PartNumber": part_number,
+                },
+                ExpiresIn=expires_in,
+            )
+            parts.append({"part_number": part_number, "url": url})
+        return {"upload_id": upload_id, "parts": parts}
+
+    async def complete_multipart_upload(
+        self, s3_key: str, upload_id: str, parts: List[dict]
+    ) -> None:
+        """
+        Finish a multipart upload the client sent the parts of.
+
+        Args:
+            s3_key: S3 storage path
+            upload_id: Multipart upload ID
+            parts: PartNumber and ETag of every part
+        """
+        client = await self._get_client()
+        with start_span("s3.complete_multipart_upload", {"s3.key": s3_key}):
+            await client.complete_multipart_upload(
+                Bucket=self.bucket,
+                Key=s3_key,
+                UploadId=upload_id,
+                MultipartUpload={"Parts": parts},
+            )
+
+    async def delete(self, s3_key: str) -> bool:
+        """
+        Delete file from S3.
+
+        Args:
+            s3_key: S3 storage path
+
+        Returns:
+            True if deleted successfully, False otherwise
+        """
+        client = await self._get_client()
+        with start_span("s3.delete_object", {"s3.key": s3_key}):
+            try:
+                await client.delete_object(Bucket=self.bucket, Key=s3_key)
+                return True
+            except ClientError:
+                return False
 
 
 # Singleton instance
@@ -110,3 +760,19 @@ def get_s3_storage() -> S3Storage:
     if _s3_storage is None:
         _s3_storage = S3Storage()
     return _s3_storage
+
+
+_async_s3_storage: Optional[AsyncS3Storage] = None
+
+
+def get_async_s3_storage() -> AsyncS3Storage:
+    """
+    Get async S3 storage service singleton.
+
+    Returns:
+        AsyncS3Storage instance
+    """
+    global _async_s3_storage
+    if _async_s3_storage is None:
+        _async_s3_storage = AsyncS3Storage()
+    return _async_s3_storage
@@ -1,42 +1,77 @@
 """
 User service for user management operations.
 """
+import os
+import threading
 from typing import Dict, Any
 from uuid import uuid4
 from datetime import datetime
+from cachetools import TTLCache
 from fastapi import HTTPException
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import noload
 from sqlmodel import select
 from ..models import User
+from ..models.user import UserRead
+from ..telemetry import traced
 from .oidc_service import fetch_userinfo_from_oidc
 
 
-def get_or_create_user(session, user_claims: Dict[str, Any], access_token: str = None) -> User:
+# Resolved users keyed by the `sub` claim. Entries are detached UserRead
+# records, so a cache hit never touches the database or the ORM graph.
+_user_cache = TTLCache(
+    maxsize=int(os.getenv("USER_CACHE_SIZE", "10000")),
+    ttl=int(os.getenv("USER_CACHE_TTL", "300")),
+)
+_user_cache_lock = threading.Lock()
+
+
+def _select_user(external_user_id: str):
+    # Only the user row is needed; skip the selectin-loaded relationships
+    return (
+        select(User)
+        .where(User.external_user_id == external_user_id)
+        .options(noload(User.conversations), noload(User.agents))
+    )
+
+
+@traced()
+async def get_or_create_user(session, user_claims: Dict[str, Any], access_token: str = None) -> UserRead:
     """Get or create user from OIDC claims."""
     external_user_id = user_claims.get("sub")
     if not external_user_id:
         raise HTTPException(status_code=400, detail="Missing 'sub' claim in token")
-    
+
+    with _user_cache_lock:
+        cached_user = _user_cache.get(external_user_id)
+    if cached_user is not None:
+        return cached_user
+
     # Try to find existing user
-    stmt = select(User).where(User.external_user_id == external_user_id)
-    user = session.exec(stmt).first()
-    
+    user = session.exec(_select_user(external_user_id)).first()
+
     if not user:
-        # Fetch complete user info from OIDC provider using oic library
+        # Fetch complete user info from OIDC provider
         if not access_token:
             raise HTTPException(status_code=400, detail="Access token required to create user")
-        
-        userinfo = fetch_userinfo_from_oidc(access_token)
-        
-        # Create new user with info from OIDC provider
-        user = User(
+
+        userinfo = await fetch_userinfo_from_oidc(access_token)
+
+        # Create new user with info from OIDC provider. Concurrent first
+        # requests of the same user race here; the loser's insert is a no-op
+        # and both read back the winning row.
+        stmt = insert(User).values(
             uuid=uuid4(),
             external_user_id=external_user_id,
             email=userinfo.get("email"),
             name=userinfo.get("name") or userinfo.get("preferred_username"),
             created_at=datetime.utcnow()
-        )
-        session.add(user)
+        ).on_conflict_do_nothing(index_elements=["external_user_id"])
+        session.execute(stmt)
         session.commit()
-        session.refresh(user)
-    
-    return user
+        user = session.exec(_select_user(external_user_id)).one()
+
+    user_record = UserRead.model_validate(user)
+    with _user_cache_lock:
+        _user_cache[external_user_id] = user_record
+    return user_record
@@ -0,0 +1,27 @@
+"""Telemetry package."""
+
+from .config import (
+    get_loop_monitor_config,
+    get_metrics_config,
+    get_profiler_config,
+    get_tracing_config,
+)
+from .loop_monitor import start_loop_monitor, stop_loop_monitor
+from .metrics import get_meter, setup_metrics, shutdown_metrics
+from .tracing import setup_tracing, shutdown_tracing, start_span, traced
+
+__all__ = [
+    "get_loop_monitor_config",
+    "get_metrics_config",
+    "get_profiler_config",
+    "get_tracing_config",
+    "start_loop_monitor",
+    "stop_loop_monitor",
+    "get_meter",
+    "setup_metrics",
+    "shutdown_metrics",
+    "setup_tracing",
+    "shutdown_tracing",
+    "start_span",
+    "traced",
+]
@@ -0,0 +1,62 @@
+"""Telemetry configuration."""
+
+import os
+
+
+def get_tracing_config() -> dict:
+    """Get OpenTelemetry tracing settings from environment.
+
+    TRACING_EXPORTER selects where spans go:
+        - otlp: OTLP/HTTP collector (TRACING_OTLP_ENDPOINT, defaults to the
+          standard OTEL_EXPORTER_OTLP_* variables when unset)
+        - file: one JSON span per line appended to TRACING_FILE_PATH
+        - console: pretty-printed spans on stdout (local debugging only)
+    """
+    return {
+        "enabled": os.getenv("TRACING_ENABLED", "false").lower() == "true",
+        "exporter": os.getenv("TRACING_EXPORTER", "otlp").lower(),
+        "otlp_endpoint": os.getenv("TRACING_OTLP_ENDPOINT"),
+        "file_path": os.getenv("TRACING_FILE_PATH", "traces.jsonl"),
+        # Fraction of new traces to record; child spans follow their parent's decision
+        "sample_ratio": float(os.getenv("TRACING_SAMPLE_RATIO", "1.0")),
+        "service_name": os.getenv("TRACING_SERVICE_NAME", "strands-ai-sdk"),
+    }
+
+
+def get_metrics_config() -> dict:
+    """Get OpenTelemetry metrics settings from environment.
+
+    METRICS_EXPORTER accepts the same values as TRACING_EXPORTER.
+    """
+    return {
+        "enabled": os.getenv("METRICS_ENABLED", "false").lower() == "true",
+        "exporter": os.getenv("METRICS_EXPORTER", "otlp").lower(),
+        "otlp_endpoint": os.getenv("METRICS_OTLP_ENDPOINT"),
+        "file_path": os.getenv("METRICS_FILE_PATH", "metrics.jsonl"),
+        "export_interval_ms": int(os.getenv("METRICS_EXPORT_INTERVAL_MS", "60000")),
+        "service_name": os.getenv("TRACING_SERVICE_NAME", "strands-ai-sdk"),
+    }
+
+
+def get_loop_monitor_config() -> dict:
+    """Get event loop watchdog settings from environment."""
+    return {
+        "enabled": os.getenv("LOOP_MONITOR_ENABLED", "false").lower() == "true",
+        # How long a single callback may hold the loop before it is reported
+        "threshold_ms": float(os.getenv("LOOP_MONITOR_THRESHOLD_MS", "100")),
+        # Heartbeat period; also bounds the detection latency
+        "interval_ms": float(os.getenv("LOOP_MONITOR_INTERVAL_MS", "20")),
+    }
+
+
+def get_profiler_config() -> dict:
+    """Get on-demand request profiler settings from environment."""
+    return {
+        "enabled": os.getenv("PROFILER_ENABLED", "false").lower() == "true",
+        "output_dir": os.getenv("PROFILER_OUTPUT_DIR", "profiles"),
+        "interval_ms": float(os.getenv("PROFILER_INTERVAL_MS", "5")),
+        # Profiles running at once across the worker; further requests run unprofiled
+        "max_concurrent": int(os.getenv("PROFILER_MAX_CONCURRENT", "1")),
+        # Hard stop for long SSE streams
+        "max_duration_s": float(os.getenv("PROFILER_MAX_DURATION_S", "300")),
+    }
@@ -0,0 +1,146 @@
+"""Event loop blocking detector.
+
+A heartbeat task on the event loop records when it last ran. A watchdog
+thread checks the heartbeat; when it goes stale for longer than the
+threshold, the loop is stuck inside a single callback, so the watchdog
+captures the loop thread's current stack and attributes it to the request
+whose task is running.
+"""
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from typing import Optional
+
+from .config import get_loop_monitor_config
+from .metrics import get_meter
+from .request_context import get_route_name, get_running_request, install_task_factory
+
+logger = logging.getLogger(__name__)
+
+meter = get_meter()
+loop_lag_histogram = meter.create_histogram(
+    "event_loop.lag",
+    unit="ms",
+    description="Delay between when the loop heartbeat was due and when it ran",
+)
+loop_blocked_counter = meter.create_counter(
+    "event_loop.blocked",
+    description="Callbacks that held the event loop longer than the threshold",
+)
+loop_block_duration_histogram = meter.create_histogram(
+    "event_loop.block_duration",
+    unit="ms",
+    description="Duration of callbacks that held the event loop longer than the threshold",
+)
+
+
+class LoopMonitor:
+    """Watchdog that reports callbacks holding the event loop too long."""
+
+    def __init__(self, threshold_ms: float, interval_ms: float):
+        self.threshold = threshold_ms / 1000
+        self.interval = interval_ms / 1000
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._heartbeat_task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+        self._last_beat = time.monotonic()
+        # Route of the stall currently in progress, set by the watchdog
+        self._stalled_route: Optional[str] = None
+
+    def start(self) -> None:
+        """Start monitoring the running event loop."""
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._heartbeat_task = self._loop.create_task(self._heartbeat())
+        self._watchdog = threading.Thread(
+            target=self._watch, name="loop-monitor", daemon=True
+        )
+        self._watchdog.start()
+        logger.info(
+            f"Event loop monitor started (threshold={self.threshold * 1000:.0f}ms)"
+        )
+
+    def stop(self) -> None:
+        """Stop the heartbeat and the watchdog thread."""
+        self._stopped.set()
+        if self._heartbeat_task is not None:
+            self._heartbeat_task.cancel()
+
+    async def _heartbeat(self) -> None:
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = max(now - expected, 0.0)
+            loop_lag_histogram.record(lag * 1000)
+
+            stalled_route = self._stalled_route
+            if stalled_route is not None:
+                self._stalled_route = None
+                blocked_ms = (now - self._last_beat) * 1000
+                # The watchdog may have raced with an on-time heartbeat
+                if blocked_ms >= self.threshold * 1000:
+                    loop_block_duration_histogram.record(
+                        blocked_ms, {"route": stalled_route}
+                    )
+                    logger.warning(
+                        f"Event loop unblocked after {blocked_ms:.0f}ms (route={stalled_route})"
+                    )
+            self._last_beat = now
+
+    def _watch(self) -> None:
+        while not self._stopped.wait(self.interval):
+            if self._stalled_route is not None:
+                continue
+            stalled_for = time.monotonic() - self._last_beat - self.interval
+            if stalled_for >= self.threshold:
+                self._report_stall(stalled_for)
+
+    def _report_stall(self, stalled_for: float) -> None:
+        """Capture the loop thread's stack and attribute it to a request."""
+        frame = sys._current_frames().get(self._loop_thread_id)
+        stack = "".join(traceback.format_stack(frame)) if frame is not None else ""
+        scope = get_running_request(self._loop)
+        route = get_route_name(scope)
+        path = scope.get("path") if scope else None
+
+        self._stalled_route = route
+        loop_blocked_counter.add(1, {"route": route})
+        logger.warning(
+            f"Event loop blocked for {stalled_for * 1000:.0f}ms "
+            f"(route={route}, path={path}). Stack of the blocking callback:\n{stack}"
+        )
+
+
+_monitor: Optional[LoopMonitor] = None
+
+
+def start_loop_monitor() -> Optional[LoopMonitor]:
+    """Start the loop monitor if LOOP_MONITOR_ENABLED is set.
+
+    Must be called from within the running event loop (e.g. app lifespan).
+    """
+    global _monitor
+    config = get_loop_monitor_config()
+    if not config["enabled"] or _monitor is not None:
+        return _monitor
+
+    install_task_factory(asyncio.get_running_loop())
+    _monitor = LoopMonitor(config["threshold_ms"], config["interval_ms"])
+    _monitor.start()
+    return _monitor
+
+
+def stop_loop_monitor() -> None:
+    """Stop the loop monitor if it is running."""
+    global _monitor
+    if _monitor is not None:
+        _monitor.stop()
+        _monitor = None
@@ -0,0 +1,94 @@
+"""OpenTelemetry metrics setup.
+
+Instruments are created from get_meter() at import time. Until
+setup_metrics() installs a meter provider they are no-ops, so recording a
+metric is always safe.
+"""
+
+import logging
+from typing import Optional
+
+from opentelemetry import metrics
+from opentelemetry.sdk.metrics import MeterProvider
+from opentelemetry.sdk.metrics.export import ConsoleMetricExporter, PeriodicExportingMetricReader
+from opentelemetry.sdk.resources import Resource
+
+from .config import get_metrics_config
+
+logger = logging.getLogger(__name__)
+
+_provider: Optional[MeterProvider] = None
+
+
+def get_meter() -> metrics.Meter:
+    """Get the application meter."""
+    return metrics.get_meter("strands-ai-sdk")
+
+
+def _create_exporter(config: dict):
+    """Create the metric exporter selected by METRICS_EXPORTER."""
+    exporter = config["exporter"]
+
+    if exporter == "otlp":
+        try:
+            from opentelemetry.exporter.otlp.proto.http.metric_exporter import OTLPMetricExporter
+        except ImportError:
+            logger.error(
+                "OTLP exporter not installed. Install with: pip install 'strands-ai-sdk[telemetry]'"
+            )
+            return None
+        if config["otlp_endpoint"]:
+            return OTLPMetricExporter(endpoint=config["otlp_endpoint"])
+        return OTLPMetricExporter()
+
+    if exporter == "file":
+        out = open(config["file_path"], "a", encoding="utf-8")
+        return ConsoleMetricExporter(
+            out=out,
+            formatter=lambda data: data.to_json(indent=None) + "\n",
+        )
+
+    if exporter == "console":
+        return ConsoleMetricExporter()
+
+    logger.error(f"Unknown METRICS_EXPORTER: {exporter}")
+    return None
+
+
+def setup_metrics() -> bool:
+    """Configure the global meter provider from environment.
+
+    Safe to call more than once; only the first call has an effect.
+
+    Returns:
+        True if metrics export is enabled
+    """
+    global _provider
+    if _provider is not None:
+        return True
+
+    config = get_metrics_config()
+    if not config["enabled"]:
+        return False
+
+    exporter = _create_exporter(config)
+    if exporter is None:
+        return False
+
+    reader = PeriodicExportingMetricReader(
+        exporter, export_interval_millis=config["export_interval_ms"]
+    )
+    _provider = MeterProvider(
+        resource=Resource.create({"service.name": config["service_name"]}),
+        metric_readers=[reader],
+    )
+    metrics.set_meter_provider(_provider)
+
+    logger.info(f"Metrics enabled (exporter={config['exporter']})")
+    return True
+
+
+def shutdown_metrics() -> None:
+    """Flush pending metrics and shut down the meter provider."""
+    if _provider is not None:
+        _provider.shutdown()
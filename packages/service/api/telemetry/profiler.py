@@ -0,0 +1,121 @@
+"""On-demand sampling profiler for a single request.
+
+A sampler thread periodically captures the event loop thread's stack and
+keeps only the samples taken while one of the profiled request's tasks
+held the loop, so concurrent requests on the same worker do not pollute
+the profile. Samples are written in collapsed-stack format, which
+flamegraph.pl, speedscope and most flamegraph viewers read directly.
+"""
+
+import asyncio
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from types import FrameType
+from typing import Optional
+from uuid import uuid4
+
+from .config import get_profiler_config
+from .request_context import get_route_name, get_running_request, install_task_factory
+
+logger = logging.getLogger(__name__)
+
+_active_profiles = threading.BoundedSemaphore(get_profiler_config()["max_concurrent"])
+
+
+def _format_stack(frame: Optional[FrameType]) -> str:
+    """Format a frame chain root-first as collapsed-stack frames."""
+    frames = []
+    while frame is not None:
+        code = frame.f_code
+        frames.append(
+            f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+        )
+        frame = frame.f_back
+    frames.reverse()
+    return ";".join(frames)
+
+
+class RequestProfiler:
+    """Sampling profiler bound to one request scope."""
+
+    def __init__(self, scope: dict, config: dict):
+        self.profile_id = uuid4().hex[:12]
+        self.scope = scope
+        self.interval = config["interval_ms"] / 1000
+        self.max_duration = config["max_duration_s"]
+        self.output_dir = config["output_dir"]
+        self.output_path: Optional[str] = None
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._stopped = threading.Event()
+        self._samples: Counter = Counter()
+        self._total_samples = 0
+        self._thread = threading.Thread(
+            target=self._run, name=f"profiler-{self.profile_id}", daemon=True
+        )
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop sampling; the profile is written by the sampler thread."""
+        self._stopped.set()
+
+    def _run(self) -> None:
+        started = time.monotonic()
+        try:
+            while not self._stopped.wait(self.interval):
+                if time.monotonic() - started > self.max_duration:
+                    logger.warning(f"Profile {self.profile_id} hit the maximum duration")
+                    break
+                self._total_samples += 1
+                if get_running_request(self._loop) is not self.scope:
+                    continue
+                frame = sys._current_frames().get(self._loop_thread_id)
+                if frame is not None:
+                    self._samples[_format_stack(frame)] += 1
+            self._write(time.monotonic() - started)
+        finally:
+            _active_profiles.release()
+
+    def _write(self, duration: float) -> None:
+        route = get_route_name(self.scope)
+        timestamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S")
+        slug = re.sub(r"[^A-Za-z0-9_.-]+", "_", route).strip("_")
+        os.makedirs(self.output_dir, exist_ok=True)
+        self.output_path = os.path.join(
+            self.output_dir, f"{timestamp}-{slug}-{self.profile_id}.collapsed"
+        )
+        with open(self.output_path, "w", encoding="utf-8") as f:
+            for stack, count in self._samples.most_common():
+                f.write(f"{stack} {count}\n")
+
+        on_loop = sum(self._samples.values())
+        logger.info(
+            f"Profile {self.profile_id} for {route} written to {self.output_path} "
+            f"({duration:.1f}s, {on_loop}/{self._total_samples} samples on the event loop)"
+        )
+
+
+def start_request_profile(scope: dict) -> Optional[RequestProfiler]:
+    """Start profiling the request bound to scope.
+
+    Must be called from the request's task. Returns None when the
+    concurrent profile limit has been reached.
+    """
+    if not _active_profiles.acquire(blocking=False):
+        return None
+    try:
+        install_task_factory(asyncio.get_running_loop())
+        profiler = RequestProfiler(scope, get_profiler_config())
+        profiler.start()
+    except Exception:
+        _active_profiles.release()
+        raise
+    return profiler
@@ -0,0 +1,77 @@
+"""Map asyncio tasks back to the HTTP request they serve.
+
+Out-of-band observers such as the loop monitor run on their own thread and
+only see which task currently holds the event loop. Binding the ASGI scope
+to the request's task (and to every task it spawns) lets them attribute
+what they observe to a route.
+"""
+
+import asyncio
+import weakref
+from contextvars import ContextVar, Token
+from typing import Optional
+
+_request_scope: ContextVar[Optional[dict]] = ContextVar("request_scope", default=None)
+_task_scopes: "weakref.WeakKeyDictionary[asyncio.Task, dict]" = weakref.WeakKeyDictionary()
+
+
+def install_task_factory(loop: asyncio.AbstractEventLoop) -> None:
+    """Tag tasks created during a request with that request's scope.
+
+    Chains to any task factory that is already installed. Installing twice
+    on the same loop is a no-op.
+    """
+    previous_factory = loop.get_task_factory()
+    if getattr(previous_factory, "tags_request_scope", False):
+        return
+
+    def task_factory(loop, coro, **kwargs):
+        if previous_factory is not None:
+            task = previous_factory(loop, coro, **kwargs)
+        else:
+            task = asyncio.Task(coro, loop=loop, **kwargs)
+
+        context = kwargs.get("context")
+        scope = context.get(_request_scope) if context is not None else _request_scope.get()
+        if scope is not None:
+            _task_scopes[task] = scope
+        return task
+
+    task_factory.tags_request_scope = True
+    loop.set_task_factory(task_factory)
+
+
+def bind_request(scope: dict) -> Token:
+    """Bind the ASGI scope to the current task and its future children."""
+    task = asyncio.current_task()
+    if task is not None:
+        _task_scopes[task] = scope
+    return _request_scope.set(scope)
+
+
+def unbind_request(token: Token) -> None:
+    """Undo bind_request() for the current context."""
+    _request_scope.reset(token)
+
+
+def get_running_request(loop: asyncio.AbstractEventLoop) -> Optional[dict]:
+    """Get the scope of the request whose task currently holds the loop.
+
+    Safe to call from a thread other than the loop's.
+    """
+    task = asyncio.current_task(loop)
+    if task is None:
+        return None
+    return _task_scopes.get(task)
+
+
+def get_route_name(scope: Optional[dict]) -> str:
+    """Get a low-cardinality name for the request, e.g. "GET /api/files/{file_uuid}".
+
+    Requests that have not been routed yet (still in middleware) are
+    reported as "METHOD <middleware>" rather than by their raw path.
+    """
+    if scope is None:
+        return "unknown"
+    route = getattr(scope.get("route"), "path", None) or "<middleware>"
+    return f"{scope.get('method', '')} {route}".strip()
@@ -0,0 +1,149 @@
+"""OpenTelemetry tracing setup and span helpers.
+
+Spans created here share the global tracer provider with the Strands SDK,
+so model and tool spans emitted by the agent loop nest under the request
+and service spans of the same trace.
+"""
+
+import functools
+import inspect
+import logging
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from opentelemetry import trace
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+
+from .config import get_tracing_config
+
+logger = logging.getLogger(__name__)
+
+_tracer = trace.get_tracer("strands-ai-sdk")
+
+# Checked on every call so that disabled tracing costs a single global lookup
+_enabled = False
+_provider: Optional[TracerProvider] = None
+
+
+def _create_exporter(config: dict):
+    """Create the span exporter selected by TRACING_EXPORTER."""
+    exporter = config["exporter"]
+
+    if exporter == "otlp":
+        try:
+            from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        except ImportError:
+            logger.error(
+                "OTLP exporter not installed. Install with: pip install 'strands-ai-sdk[telemetry]'"
+            )
+            return None
+        if config["otlp_endpoint"]:
+            return OTLPSpanExporter(endpoint=config["otlp_endpoint"])
+        return OTLPSpanExporter()
+
+    if exporter == "file":
+        out = open(config["file_path"], "a", encoding="utf-8")
+        return ConsoleSpanExporter(
+            out=out,
+            formatter=lambda span: span.to_json(indent=None) + "\n",
+        )
+
+    if exporter == "console":
+        return ConsoleSpanExporter()
+
+    logger.error(f"Unknown TRACING_EXPORTER: {exporter}")
+    return None
+
+
+def setup_tracing() -> bool:
+    """Configure the global tracer provider from environment.
+
+    Safe to call more than once; only the first call has an effect.
+
+    Returns:
+        True if tracing is enabled
+    """
+    global _enabled, _provider
+    if _provider is not None:
+        return _enabled
+
+    config = get_tracing_config()
+    if not config["enabled"]:
+        return False
+
+    exporter = _create_exporter(config)
+    if exporter is None:
+        return False
+
+    _provider = TracerProvider(
+        resource=Resource.create({"service.name": config["service_name"]}),
+        sampler=ParentBased(TraceIdRatioBased(config["sample_ratio"])),
+    )
+    _provider.add_span_processor(BatchSpanProcessor(exporter))
+    trace.set_tracer_provider(_provider)
+    _enabled = True
+
+    logger.info(
+        f"Tracing enabled (exporter={config['exporter']}, sample_ratio={config['sample_ratio']})"
+    )
+    return True
+
+
+def shutdown_tracing() -> None:
+    """Flush pending spans and shut down the tracer provider."""
+    global _enabled
+    if _provider is not None:
+        _provider.shutdown()
+    _enabled = False
+
+
+@contextmanager
+def start_span(
+    name: str,
+    attributes: Optional[Dict[str, Any]] = None,
+) -> Iterator[Optional[trace.Span]]:
+    """Start a span as the current span.
+
+    Yields None when tracing is disabled.
+
+    Usage:
+        with start_span("s3.get_object", {"s3.key": s3_key}):
+            ...
+    """
+    if not _enabled:
+        yield None
+        return
+    with _tracer.start_as_current_span(name, attributes=attributes) as span:
+        yield span
+
+
+def traced(name: Optional[str] = None) -> Callable:
+    """Decorator that wraps a sync or async function in a span.
+
+    Args:
+        name: Span name, defaults to the function's qualified name
+    """
+    def decorator(func: Callable) -> Callable:
+        span_name = name or func.__qualname__
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                if not _enabled:
+                    return await func(*args, **kwargs)
+                with _tracer.start_as_current_span(span_name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with _tracer.start_as_current_span(span_name):
+                return func(*args, **kwargs)
+        return wrapper
+
+    return decorator
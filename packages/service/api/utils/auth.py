@@ -1,42 +1,48 @@
 """
 OIDC JWT Token Verification Utilities
 """
+import hashlib
 import os
+import threading
+import time
 from typing import Optional, Dict, Any
-from functools import lru_cache
+from cachetools import TLRUCache
 from jose import jwt, JWTError
 from fastapi import HTTPException, Header
 import httpx
 
+from ..services.jwks_service import add_key_change_listener, get_jwks_manager
+from ..telemetry import get_meter
 
-@lru_cache(maxsize=1)
-def get_jwks(issuer: str) -> Dict[str, Any]:
-    """
-    Fetch JWKS from OIDC provider's well-known endpoint
-    Cached to avoid repeated requests
-    """
-    well_known_url = f"{issuer.rstrip('/')}/.well-known/openid-configuration"
-    
-    try:
-        response = httpx.get(well_known_url, timeout=10.0)
-        response.raise_for_status()
-        config = response.json()
-        
-        jwks_uri = config.get('jwks_uri')
-        if not jwks_uri:
-            raise ValueError("JWKS URI not found in OIDC configuration")
-        
-        jwks_response = httpx.get(jwks_uri, timeout=10.0)
-        jwks_response.raise_for_status()
-        return jwks_response.json()
-    except Exception as e:
-        raise HTTPException(
-            status_code=500,
-            detail=f"Failed to fetch JWKS: {str(e)}"
-        )
+meter = get_meter()
+token_cache_counter = meter.create_counter(
+    "auth.token_cache.lookups",
+    description="Verified-token cache lookups, by result (hit or miss)",
+)
+
+# Verified claims keyed by token hash, each entry expiring at the token's exp
+_verified_tokens = TLRUCache(
+    maxsize=int(os.getenv("TOKEN_CACHE_SIZE", "10000")),
+    ttu=lambda _key, claims, _now: claims["exp"],
+    timer=time.time,
+)
+_verified_tokens_lock = threading.Lock()
+
+
+def _token_cache_key(token: str, issuer: str, audience: Optional[str]) -> str:
+    return hashlib.sha256(f"{issuer}|{audience}|{token}".encode()).hexdigest()
+
+
+def clear_token_cache(issuer: Optional[str] = None) -> None:
+    """Drop all cached token verifications (called when signing keys change)."""
+    with _verified_tokens_lock:
+        _verified_tokens.clear()
+
+
+add_key_change_listener(clear_token_cache)
 
 
-def verify_token(token: str, issuer: str, audience: Optional[str] = None) -> Dict[str, Any]:
+async def verify_token(token: str, issuer: str, audience: Optional[str] = None) -> Dict[str, Any]:
     """
     Verify JWT token using JWKS from OIDC provider
     
@@ -51,15 +57,36 @@ def verify_token(token: str, issuer: str, audience: Optional[str] = None) -> Dic
     Raises:
         HTTPException: If token is invalid
     """
+    # Tokens are reused for many requests; skip the RSA verification when
+    # this one was already verified and has not expired
+    cache_key = _token_cache_key(token, issuer, audience)
+    with _verified_tokens_lock:
+        claims = _verified_tokens.get(cache_key)
+    if claims is not None:
+        token_cache_counter.add(1, {"result": "hit"})
+        return claims
+    token_cache_counter.add(1, {"result": "miss"})
+
+    try:
+        # Select the signing key named by the token header
+        kid = jwt.get_unverified_header(token).get("kid")
+        key = await get_jwks_manager(issuer).get_key(kid)
+    except (httpx.HTTPError, ValueError) as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to fetch JWKS: {str(e)}"
+        )
+    except (JWTError, LookupError) as e:
+        raise HTTPException(
+            status_code=401,
+            detail=f"Invalid token: {str(e)}"
+        )
+
     try:
-        # Get JWKS
-        jwks = get_jwks(issuer)
-        
         # Decode and verify token
-        # python-jose will automatically select the right key from JWKS
         claims = jwt.decode(
             token,
-            jwks,
+            key,
             algorithms=["RS256"],
             issuer=issuer,
             audience=audience,
@@ -71,6 +98,9 @@ def verify_token(token: str, issuer: str, audience: Optional[str] = None) -> Dic
             }
         )
         
+        if isinstance(claims.get("exp"), (int, float)):
+            with _verified_tokens_lock:
+                _verified_tokens[cache_key] = claims
         return claims
         
     except JWTError as e:
@@ -122,4 +152,17 @@ async def get_current_user(authorization: Optional[str] = Header(None)) -> Dict[
         )
     
     # Verify token and return claims
-    return verify_token(token, issuer, audience)
+    return await verify_token(token, issuer, audience)
+
+
+def is_admin(user_claims: Optional[Dict[str, Any]]) -> bool:
+    """
+    Check whether verified token claims belong to an administrator
+
+    Administrators are listed by their `sub` claim in the comma-separated
+    ADMIN_USER_IDS environment variable.
+    """
+    if not user_claims:
+        return False
+    admin_ids = {uid.strip() for uid in os.getenv("ADMIN_USER_IDS", "").split(",") if uid.strip()}
+    return user_claims.get("sub") in admin_ids
@@ -0,0 +1,133 @@
+"""Markdown chunking and lexical tokenization for document retrieval.
+
+Also used by parse worker processes, so this module depends on the
+standard library only.
+"""
+
+import re
+from collections import Counter
+from typing import Dict, List
+
+# Chinese, Japanese and Korean scripts, which are written without spaces
+_CJK = "぀-ヿ㐀-䶿一-鿿가-힯豈-﫿"
+_CJK_RE = re.compile(f"[{_CJK}]")
+# Runs of CJK characters, or words of other letters and digits
+_TERM_RE = re.compile(f"[{_CJK}]+|[^\\W_{_CJK}]+")
+
+# Chunks are split at the coarsest of these that makes them fit
+_SEPARATORS = ("\n\n", "\n", "。", ". ", " ")
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the model tokens of a text without a tokenizer.
+
+    CJK characters count as a token each, other text as a token per four
+    characters.
+
+    Args:
+        text: Any text
+
+    Returns:
+        Estimated token count
+    """
+    cjk = len(_CJK_RE.findall(text))
+    return cjk + (len(text) - cjk + 3) // 4
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into the terms it is indexed and searched by.
+
+    Words are lowercased. CJK runs become overlapping character bigrams
+    (a lone character stays a unigram), which matches words without a
+    dictionary-based segmenter.
+
+    Args:
+        text: Any text
+
+    Returns:
+        Terms, in order of occurrence
+    """
+    terms = []
+    for match in _TERM_RE.finditer(text.lower()):
+        run = match.group()
+        if _CJK_RE.match(run) and len(run) > 1:
+            terms.extend(run[i:i + 2] for i in range(len(run) - 1))
+        else:
+            terms.append(run)
+    return terms
+
+
+def _split(text: str, max_tokens: int, separators: tuple) -> List[str]:
+    """Split text into consecutive slices of at most max_tokens tokens."""
+    if estimate_tokens(text) <= max_tokens:
+        return [text]
+    for i, separator in enumerate(separators):
+        parts = text.split(separator)
+        if len(parts) == 1:
+            continue
+        # The separator stays with the slice before it, so that slices
+        # joined together give back the text
+        pieces = [part + separator for part in parts[:-1]] + [parts[-1]]
+        slices = []
+        for piece in pieces:
+            if piece:
+                slices.extend(_split(piece, max_tokens, separators[i + 1:]))
+        return slices
+    # No separator left: cut (a token is at most one character)
+    return [text[i:i + max_tokens] for i in range(0, len(text), max_tokens)]
+
+
+def chunk_markdown(markdown: str, max_tokens: int) -> List[str]:
+    """
+    Split Markdown into chunks of about max_tokens tokens.
+
+    Chunks end at paragraph breaks where possible, then at line breaks,
+    sentence ends and spaces. They are slices of the text: joined
+    together, they give back the whole document.
+
+    Args:
+        markdown: Document text
+        max_tokens: Maximum estimated tokens per chunk
+
+    Returns:
+        Chunks, in document order
+    """
+    chunks: List[str] = []
+    current: List[str] = []
+    current_tokens = 0
+    for piece in _split(markdown, max_tokens, _SEPARATORS):
+        tokens = estimate_tokens(piece)
+        if current and current_tokens + tokens > max_tokens:
+            chunks.append("".join(current))
+            current, current_tokens = [], 0
+        current.append(piece)
+        current_tokens += tokens
+    if current:
+        chunks.append("".join(current))
+    return chunks
+
+
+def chunk_document(markdown: str, max_tokens: int) -> List[Dict]:
+    """
+    Chunk a document and count the terms of every chunk.
+
+    Args:
+        markdown: Document text
+        max_tokens: Maximum estimated tokens per chunk
+
+    Returns:
+        One dict per chunk, in document order, with content, token_count,
+        term_count and term_freqs (term -> occurrences)
+    """
+    chunks = []
+    for content in chunk_markdown(markdown, max_tokens):
+        terms = tokenize(content)
+        chunks.append({
+            "content": content,
+            "token_count": estimate_tokens(content),
+            "term_count": len(terms),
+            "term_freqs": dict(Counter(terms)),
+        })
+    return chunks
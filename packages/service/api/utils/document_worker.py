@@ -0,0 +1,188 @@
+"""Document conversion entry points, also used by parse worker processes.
+
+Worker processes are spawned fresh, so this module only depends on
+markitdown (and the PDF libraries it uses); importing the API services
+would load the agent stack into every worker.
+"""
+
+import io
+import logging
+import os
+import re
+import shutil
+import tempfile
+from typing import BinaryIO, List, Optional
+
+import pdfminer.high_level
+from markitdown import MarkItDown, StreamInfo
+from pdfminer.pdfdocument import PDFDocument
+from pdfminer.pdfpage import PDFPage
+from pdfminer.pdfparser import PDFParser
+
+try:
+    # markitdown's per-page PDF handling, reused so that documents
+    # converted in page ranges read exactly like whole conversions. These
+    # are private: pyproject.toml pins markitdown to the releases whose PDF
+    # converter this module mirrors.
+    import pdfplumber
+    from markitdown.converters._pdf_converter import (
+        _extract_form_content_from_words,
+        _merge_partial_numbering_lines,
+    )
+except ImportError:
+    # Without the helpers, convert PDFs with pdfminer alone (as markitdown
+    # did before 0.1.5)
+    _extract_form_content_from_words = None
+    _merge_partial_numbering_lines = None
+
+logger = logging.getLogger(__name__)
+
+# One converter per worker process
+_markitdown: Optional[MarkItDown] = None
+
+
+def warm_up() -> None:
+    """Create the converter ahead of the first document."""
+    global _markitdown
+    if _markitdown is None:
+        _markitdown = MarkItDown()
+
+
+def _convert_from_temp_file(content: BinaryIO, extension: str) -> Optional[str]:
+    tmp_path = None
+    try:
+        with tempfile.NamedTemporaryFile(suffix=extension, delete=False) as tmp:
+            shutil.copyfileobj(content, tmp)
+            tmp_path = tmp.name
+        return _markitdown.convert(tmp_path).text_content or None
+    finally:
+        if tmp_path and os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+
+
+def convert_document(
+    content: BinaryIO,
+    extension: str,
+    mime_type: Optional[str] = None,
+    filename: Optional[str] = None,
+) -> Optional[str]:
+    """
+    Convert a document to Markdown text.
+
+    The document is converted straight from the stream. Only if that
+    fails is it written to a temporary file and converted from the path,
+    for converters that need a real file.
+
+    Args:
+        content: Seekable binary stream with the document
+        extension: File extension including the dot, selects the converter
+        mime_type: MIME type of the file
+        filename: Original filename
+
+    Returns:
+        Markdown text, or None if the document has no text
+
+    Raises:
+        Exception: Whatever markitdown raises for unreadable documents
+    """
+    warm_up()
+    stream_info = StreamInfo(extension=extension, mimetype=mime_type, filename=filename)
+    try:
+        return _markitdown.convert_stream(content, stream_info=stream_info).text_content or None
+    except Exception as e:
+        logger.warning(f"Stream conversion of {filename} failed, retrying from a file: {e}")
+        content.seek(0)
+        return _convert_from_temp_file(content, extension)
+
+
+def convert_document_bytes(
+    data: bytes,
+    extension: str,
+    mime_type: Optional[str] = None,
+    filename: Optional[str] = None,
+) -> Optional[str]:
+    """Convert an in-memory document to Markdown text (see convert_document)."""
+    # BytesIO shares the bytes object's buffer instead of copying it
+    return convert_document(io.BytesIO(data), extension, mime_type, filename)
+
+
+def count_pdf_pages(path: str) -> int:
+    """Count the pages of a PDF file without parsing their content."""
+    with open(path, "rb") as f:
+        document = PDFDocument(PDFParser(f))
+        return sum(1 for _ in PDFPage.create_pages(document))
+
+
+def convert_pdf_pages(path: str, start: int, stop: int, text_only: bool = False) -> dict:
+    """
+    Convert a range of PDF pages the way markitdown converts a whole PDF.
+
+    markitdown renders pages with form-style content as Markdown tables
+    (pdfplumber), but converts documents without any such page with
+    pdfminer. Which applies is only known once every range is converted,
+    so ranges are converted with pdfplumber first, and with pdfminer
+    (text_only) when join_pdf_pages needs their plain text.
+
+    Args:
+        path: Path of the PDF file
+        start: First page, zero-based
+        stop: Page after the last one
+        text_only: Only extract the plain text
+
+    Returns:
+        Dict with form_pages (None if pdfplumber failed), chunks (the
+        Markdown of each page) and text (pdfminer text, or None)
+    """
+    result = {"form_pages": 0, "chunks": [], "text": None}
+    if text_only or _extract_form_content_from_words is None:
+        result["text"] = pdfminer.high_level.extract_text(path, page_numbers=range(start, stop))
+        return result
+    try:
+        with pdfplumber.open(path, pages=list(range(start + 1, stop + 1))) as pdf:
+            for page in pdf.pages:
+                page_content = _extract_form_content_from_words(page)
+                if page_content is not None:
+                    result["form_pages"] += 1
+                    if page_content.strip():
+                        result["chunks"].append(page_content)
+                else:
+                    text = page.extract_text()
+                    if text and text.strip():
+                        result["chunks"].append(text.strip())
+                page.close()
+    except Exception as e:
+        logger.warning(f"pdfplumber failed on pages {start}-{stop - 1}: {e}")
+        result["form_pages"] = None
+    return result
+
+
+def join_pdf_pages(ranges: List[dict]) -> Optional[str]:
+    """
+    Stitch the conversions of consecutive page ranges into one document.
+
+    Args:
+        ranges: Results of convert_pdf_pages, in page order, with their
+            text if needs_pdf_text(ranges)
+
+    Returns:
+        Markdown text, or None if the document has no text
+    """
+    markdown = None
+    if not needs_pdf_text(ranges):
+        markdown = "\n\n".join(chunk for r in ranges for chunk in r["chunks"]).strip()
+    if not markdown:
+        markdown = "".join(r["text"] for r in ranges)
+    if _merge_partial_numbering_lines is not None:
+        markdown = _merge_partial_numbering_lines(markdown)
+    # markitdown's normalization of every conversion result
+    markdown = "\n".join(line.rstrip() for line in re.split(r"\r?\n", markdown))
+    return re.sub(r"\n{3,}", "\n\n", markdown) or None
+
+
+def needs_pdf_text(ranges: List[dict]) -> bool:
+    """Whether join_pdf_pages uses the pdfminer text of every range."""
+    if any(r["form_pages"] is None for r in ranges):
+        return True
+    if not any(r["form_pages"] for r in ranges):
+        return True
+    return not any(r["chunks"] for r in ranges)
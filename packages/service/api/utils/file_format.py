@@ -45,6 +45,45 @@ ALLOWED_MIME_TYPES: list[str] = ALLOWED_DOCUMENT_TYPES + ALLOWED_IMAGE_TYPES
 # Maximum file size (20MB)
 MAX_FILE_SIZE: int = 20 * 1024 * 1024
 
+# Read size when streaming uploaded files (1MB)
+UPLOAD_CHUNK_SIZE: int = 1024 * 1024
+
+# Leading bytes ("magic numbers") of the allowed file types. .docx files
+# are ZIP archives and .doc files OLE2 compound files.
+MAGIC_NUMBERS: list[tuple[bytes, str]] = [
+    (b"%PDF-", "application/pdf"),
+    (b"PK\x03\x04", "application/vnd.openxmlformats-officedocument.wordprocessingml.document"),
+    (b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1", "application/msword"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+]
+
+
+# MIME type to file extension, for documents without one in their filename
+MIME_TO_EXTENSION: dict[str, str] = {
+    "application/pdf": ".pdf",
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.document": ".docx",
+    "application/msword": ".doc",
+}
+
+
+def get_file_extension(mime_type: str, filename: str) -> Optional[str]:
+    """
+    Get the file extension from the filename, or else from the MIME type.
+
+    Args:
+        mime_type: The MIME type of the file
+        filename: Original filename
+
+    Returns:
+        Lowercase extension including the dot, or None if unknown
+    """
+    if filename and "." in filename:
+        return "." + filename.rsplit(".", 1)[-1].lower()
+    return MIME_TO_EXTENSION.get(mime_type)
+
 
 def get_document_format(mime_type: str) -> Optional[str]:
     """
@@ -96,3 +135,24 @@ def get_image_format(mime_type: str) -> Optional[ImageFormat]:
         The corresponding Strands ImageFormat, or None if not supported
     """
     return MIME_TO_IMAGE_FORMAT.get(mime_type)
+
+
+def sniff_mime_type(header: bytes) -> Optional[str]:
+    """
+    Detect an allowed file type from the first bytes of the content.
+
+    Args:
+        header: Leading bytes of the file (at least 1 KB for PDFs, whose
+            signature may follow some junk)
+
+    Returns:
+        The MIME type, or None if the content is not of an allowed type
+    """
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return "image/webp"
+    if b"%PDF-" in header[:1024]:
+        return "application/pdf"
+    for magic, mime_type in MAGIC_NUMBERS:
+        if header.startswith(magic):
+            return mime_type
+    return None
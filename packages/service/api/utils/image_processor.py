@@ -1,88 +1,264 @@
 """Image processing utilities for LLM input."""
 
 import io
-from typing import Tuple
+import math
+from typing import Optional, Tuple
 
 from PIL import Image
 
+from ..telemetry import traced
+
 # Max image size for Bedrock (5MB), but we target 3.5MB to account for base64 overhead (~33%)
 MAX_IMAGE_SIZE_BYTES = 3 * 1024 * 1024  # 3MB raw = ~4MB base64
 MAX_DIMENSION = 4096  # Max width/height
 
+# Image targets per model, matched as a substring of the model id. Claude
+# downscales images whose long edge exceeds 1568 px or that are over
+# about 1.15 megapixels before the model sees them, so sending more only
+# adds request bytes and input-processing latency.
+IMAGE_PROFILES: dict[str, dict] = {
+    "anthropic.claude": {
+        "max_long_edge": 1568,
+        "max_megapixels": 1.15,
+        "max_bytes": MAX_IMAGE_SIZE_BYTES,
+        "format": "jpeg",
+    },
+}
+
+# Used for models without a profile
+DEFAULT_IMAGE_PROFILE: dict = {
+    "max_long_edge": MAX_DIMENSION,
+    "max_megapixels": None,
+    "max_bytes": MAX_IMAGE_SIZE_BYTES,
+    "format": "jpeg",
+}
+
+# Output formats for re-encoded images: (Pillow format, MIME type)
+OUTPUT_FORMATS: dict[str, Tuple[str, str]] = {
+    "jpeg": ("JPEG", "image/jpeg"),
+    "webp": ("WEBP", "image/webp"),
+}
+
+# Images with more pixels are rejected before decoding (decompression
+# bombs: a few KB of PNG can expand to gigabytes of pixels)
+MAX_IMAGE_PIXELS = 50_000_000
+
+# JPEG quality range searched for the best quality that fits
+MAX_QUALITY = 85
+MIN_QUALITY = 40
+
+# JPEGs may be decoded DCT-scaled down to this fraction of the target
+# dimensions, instead of decoding at full size for a small reduction
+DRAFT_MIN_SCALE = 0.8
+
+# Predicted sizes are aimed this far below the limit, so that one resize
+# is usually enough
+SIZE_MARGIN = 0.9
+
+
+class ImageTooLargeError(ValueError):
+    """Raised for images whose pixel count exceeds MAX_IMAGE_PIXELS."""
+
+
+def _to_rgb(img: Image.Image) -> Image.Image:
+    """Convert to RGB for JPEG output, compositing transparency on white."""
+    if img.mode == 'RGB':
+        return img
+    if img.mode == 'P':
+        img = img.convert('RGBA')
+    if img.mode in ('RGBA', 'LA'):
+        # Has alpha channel - composite on white background
+        background = Image.new('RGB', img.size, (255, 255, 255))
+        background.paste(img, mask=img.split()[-1])
+        return background
+    # L (grayscale), CMYK, etc - just convert
+    return img.convert('RGB')
+
+
+def _check_pixels(img: Image.Image) -> None:
+    if img.width * img.height > MAX_IMAGE_PIXELS:
+        raise ImageTooLargeError(
+            f"Image dimensions exceed limit: {img.width}x{img.height} "
+            f"(max {MAX_IMAGE_PIXELS} pixels)"
+        )
+
+
+def check_image_header(header: bytes) -> None:
+    """
+    Reject an image with too many pixels, given only its first bytes.
+
+    Images whose dimensions are not within `header` pass; they are
+    checked again when the whole image is compressed.
+
+    Args:
+        header: Leading bytes of the image
+
+    Raises:
+        ImageTooLargeError: If the image has more than MAX_IMAGE_PIXELS pixels
+    """
+    try:
+        img = Image.open(io.BytesIO(header))
+    except Exception:
+        return
+    _check_pixels(img)
+
+
+def get_image_profile(model_id: Optional[str]) -> dict:
+    """
+    Get the image targets for a model.
+
+    Args:
+        model_id: Model ID from the agent config (e.g. a Bedrock model ID)
+
+    Returns:
+        Profile with max_long_edge, max_megapixels, max_bytes and format
+    """
+    for pattern, profile in IMAGE_PROFILES.items():
+        if model_id and pattern in model_id:
+            return profile
+    return DEFAULT_IMAGE_PROFILE
+
 
+def _encode(img: Image.Image, output_format: str, quality: int, final: bool = True) -> bytes:
+    buffer = io.BytesIO()
+    if output_format == "jpeg":
+        # Huffman optimization only makes the output smaller, so probes skip it
+        img.save(buffer, format="JPEG", quality=quality, optimize=final)
+    else:
+        img.save(buffer, format=OUTPUT_FORMATS[output_format][0], quality=quality)
+    return buffer.getvalue()
+
+
+def _best_quality(
+    img: Image.Image, output_format: str, max_size: int, low: bytes, high_size: int
+) -> bytes:
+    """
+    Search the highest quality (in steps of 5) whose encoding fits.
+
+    MIN_QUALITY is known to fit (encoded as `low`) and MAX_QUALITY not to
+    (at high_size bytes). Each probe bisects the range at the quality
+    where the size is interpolated to reach the limit, so it usually
+    takes one or two probes.
+    """
+    low_quality, high_quality = MIN_QUALITY, MAX_QUALITY
+    while high_quality - low_quality > 5:
+        guess = low_quality + (
+            (max_size - len(low)) * (high_quality - low_quality) / max(high_size - len(low), 1)
+        )
+        quality = min(max(int(guess) // 5 * 5, low_quality + 5), high_quality - 5)
+        encoded = _encode(img, output_format, quality, final=False)
+        if len(encoded) <= max_size:
+            low_quality, low = quality, encoded
+        else:
+            high_quality, high_size = quality, len(encoded)
+    if output_format == "jpeg":
+        return _encode(img, output_format, low_quality)
+    return low
+
+
+@traced("image.compress")
 def compress_image(
     content: bytes,
     mime_type: str,
     max_size: int = MAX_IMAGE_SIZE_BYTES,
     max_dimension: int = MAX_DIMENSION,
+    max_pixels: Optional[int] = None,
+    output_format: str = "jpeg",
 ) -> Tuple[bytes, str]:
     """
     Compress image to fit within size limits.
 
+    The image is decoded once, close to the target size (JPEG draft mode,
+    whole-factor reduction for other formats). If it does not fit at the
+    lowest quality, it is shrunk by a ratio predicted from the bytes per
+    pixel of that encoding; then the quality is bisected, so only a
+    handful of encodes are needed. Images with more than MAX_IMAGE_PIXELS
+    pixels are rejected before decoding.
+
     Args:
         content: Original image bytes
         mime_type: Original MIME type
         max_size: Maximum size in bytes
         max_dimension: Maximum width/height
+        max_pixels: Maximum width * height, if limited
+        output_format: Format of re-encoded images ("jpeg" or "webp")
 
     Returns:
         Tuple of (compressed_bytes, output_mime_type)
+
+    Raises:
+        ImageTooLargeError: If the image has more than MAX_IMAGE_PIXELS pixels
     """
+    # Only the header is read here
+    img = Image.open(io.BytesIO(content))
+    _check_pixels(img)
+
+    pixels = img.width * img.height
     # If already small enough, return as-is
-    if len(content) <= max_size:
-        img = Image.open(io.BytesIO(content))
-        # Still check dimensions
-        if img.width <= max_dimension and img.height <= max_dimension:
-            return content, mime_type
+    if (
+        len(content) <= max_size
+        and img.width <= max_dimension
+        and img.height <= max_dimension
+        and (max_pixels is None or pixels <= max_pixels)
+    ):
+        return content, mime_type
 
-    # Open image
-    img = Image.open(io.BytesIO(content))
+    # Fit within the maximum dimensions, keeping the aspect ratio
+    ratio = min(1.0, max_dimension / img.width, max_dimension / img.height)
+    if max_pixels is not None:
+        ratio = min(ratio, math.sqrt(max_pixels / pixels))
+    target = (max(1, int(img.width * ratio)), max(1, int(img.height * ratio)))
+    # Nothing is decoded yet: JPEGs are decoded DCT-scaled (1/2, 1/4 or
+    # 1/8), at the smallest scale close enough to the target size
+    img.draft(None, (int(target[0] * DRAFT_MIN_SCALE), int(target[1] * DRAFT_MIN_SCALE)))
+    img = _to_rgb(img)
+    if img.width > target[0] or img.height > target[1]:
+        # Large reductions start with a cheap whole-factor reduce
+        img = img.resize(target, Image.Resampling.LANCZOS, reducing_gap=2.0)
 
-    # Convert to RGB for JPEG output
-    if img.mode != 'RGB':
-        if img.mode in ('RGBA', 'LA'):
-            # Has alpha channel - composite on white background
-            background = Image.new('RGB', img.size, (255, 255, 255))
-            background.paste(img, mask=img.split()[-1])
-            img = background
-        elif img.mode == 'P':
-            # Palette mode - convert to RGBA first, then composite
-            img = img.convert('RGBA')
-            background = Image.new('RGB', img.size, (255, 255, 255))
-            background.paste(img, mask=img.split()[-1])
-            img = background
-        else:
-            # L (grayscale), etc - just convert
-            img = img.convert('RGB')
-
-    # Resize if dimensions exceed max
-    if img.width > max_dimension or img.height > max_dimension:
-        ratio = min(max_dimension / img.width, max_dimension / img.height)
-        new_size = (int(img.width * ratio), int(img.height * ratio))
-        img = img.resize(new_size, Image.Resampling.LANCZOS)
-
-    # Try to compress to fit size limit
-    output_mime = "image/jpeg"
-    quality = 85
-
-    while quality >= 20:
-        buffer = io.BytesIO()
-        img.save(buffer, format="JPEG", quality=quality, optimize=True)
-        compressed = buffer.getvalue()
-
-        if len(compressed) <= max_size:
-            return compressed, output_mime
-
-        # Reduce quality or resize further
-        if quality > 50:
-            quality -= 10
-        else:
-            # Also reduce dimensions
-            quality -= 5
-            new_size = (int(img.width * 0.9), int(img.height * 0.9))
-            img = img.resize(new_size, Image.Resampling.LANCZOS)
+    output_mime = OUTPUT_FORMATS[output_format][1]
+    for _ in range(4):
+        encoded = _encode(img, output_format, MAX_QUALITY)
+        if len(encoded) <= max_size:
+            return encoded, output_mime
 
-    # Final attempt with minimum quality
-    buffer = io.BytesIO()
-    img.save(buffer, format="JPEG", quality=20, optimize=True)
-    return buffer.getvalue(), output_mime
+        low = _encode(img, output_format, MIN_QUALITY, final=False)
+        if len(low) <= max_size:
+            return _best_quality(img, output_format, max_size, low, len(encoded)), output_mime
+
+        # Bytes per pixel stay roughly constant under resizing, so the
+        # pixel count that fits follows from this encoding
+        ratio = math.sqrt(max_size * SIZE_MARGIN / len(low))
+        new_size = (max(1, int(img.width * ratio)), max(1, int(img.height * ratio)))
+        img = img.resize(new_size, Image.Resampling.LANCZOS, reducing_gap=2.0)
+
+    return _encode(img, output_format, MIN_QUALITY), output_mime
+
+
+def compress_image_for_model(
+    content: bytes, mime_type: str, model_id: Optional[str]
+) -> Tuple[bytes, str]:
+    """
+    Compress image to the targets of the model that will read it.
+
+    Images already within the targets are returned as-is after reading
+    only their header.
+
+    Args:
+        content: Image bytes
+        mime_type: MIME type of the image
+        model_id: Model ID from the agent config
+
+    Returns:
+        Tuple of (compressed_bytes, output_mime_type)
+    """
+    profile = get_image_profile(model_id)
+    max_megapixels = profile["max_megapixels"]
+    return compress_image(
+        content,
+        mime_type,
+        max_size=profile["max_bytes"],
+        max_dimension=profile["max_long_edge"],
+        max_pixels=int(max_megapixels * 1_000_000) if max_megapixels else None,
+        output_format=profile["format"],
+    )
@@ -7,7 +7,6 @@ from uuid import UUID
 from fastapi.responses import StreamingResponse
 from openai import OpenAI
 from openai.types.chat.chat_completion_message_param import ChatCompletionMessageParam
-from sqlmodel import Session
 from strands import Agent
 from strands.types.content import ContentBlock
 
@@ -17,6 +16,7 @@ import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from api.utils.prompt import ClientMessage
 from api.services.content_builder import ContentBlockBuilder
+from api.telemetry import start_span
 
 
 async def stream_strands_agent(
@@ -26,7 +26,6 @@ async def stream_strands_agent(
     on_finish: Callable[[Dict[str, Any]], None] = None,
     file_ids: Optional[List[str]] = None,
     user_uuid: Optional[UUID] = None,
-    session: Optional[Session] = None,
 ):
     """Yield Server-Sent Events for a streaming Strands Agent completion.
     
@@ -112,11 +111,13 @@ async def stream_strands_agent(
                     text_content = last_msg.content
 
             # Build agent_input with files if provided
-            if file_ids and session and user_uuid:
+            if file_ids and user_uuid:
                 # Use ContentBlockBuilder to build ContentBlocks with files
-                content_builder = ContentBlockBuilder(session)
+                content_builder = ContentBlockBuilder(
+                    model_id=agent.model.get_config().get("model_id")
+                )
                 file_uuids = [UUID(fid) for fid in file_ids]
-                agent_input = content_builder.build(text_content, file_uuids, user_uuid)
+                agent_input = await content_builder.build(text_content, file_uuids, user_uuid)
             else:
                 # No files, just text
                 agent_input: list[ContentBlock] = []
@@ -124,7 +125,9 @@ async def stream_strands_agent(
                     agent_input.append({'text': text_content})
         
         # Stream agent response
-        async for event in agent.stream_async(agent_input):
+        # Strands model and tool spans nest under this span
+        with start_span("agent.stream", {"agent.approval_response": is_approval_response}):
+            async for event in agent.stream_async(agent_input):
                 # Handle streaming text content
                 if 'event' in event and 'contentBlockDelta' in event['event']:
                     content_block = event['event']['contentBlockDelta']
@@ -0,0 +1,6 @@
+"""End-to-end benchmarks for the FastAPI backend.
+
+Boots api.index:app against local stand-ins (Postgres, moto/MinIO S3, a
+stub OIDC issuer and a scripted model provider) and drives it with load
+scenarios. Run with `python -m benchmarks`; see benchmarks/README.md.
+"""
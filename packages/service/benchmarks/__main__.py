@@ -0,0 +1,212 @@
+"""Run the end-to-end benchmark suite.
+
+    cd packages/service
+    python -m benchmarks --scenarios chat,history,upload,poll --concurrency 32
+    python -m benchmarks --save-baseline benchmarks/baseline.json
+    python -m benchmarks --baseline benchmarks/baseline.json
+
+Exits with status 1 when a metric regresses beyond --tolerance relative to
+the baseline.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+from datetime import datetime, timezone
+
+import httpx
+
+from .issuer import StubIssuer
+from .report import (
+    RssSampler,
+    compare_to_baseline,
+    load_json,
+    print_results,
+    save_json,
+    summarize,
+)
+from .scenarios import SCENARIOS, ScenarioContext, seed_conversations
+from .stack import S3_ENV, S3StandIn, Worker, migrate_database
+
+logger = logging.getLogger("benchmarks")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--scenarios", default="chat,history,upload,poll",
+                        help=f"Comma-separated subset of: {', '.join(SCENARIOS)}")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=16, help="Requests in flight")
+    parser.add_argument("--users", type=int, default=8, help="Distinct authenticated users")
+    parser.add_argument("--seed-conversations", type=int, default=20,
+                        help="Conversations created for the history scenario")
+    parser.add_argument("--upload-kb", type=int, default=256, help="Upload payload size")
+    parser.add_argument("--database-url",
+                        default=os.getenv("BENCH_DATABASE_URL", os.getenv("DATABASE_URL")),
+                        help="Postgres URL (default: BENCH_DATABASE_URL or DATABASE_URL)")
+    parser.add_argument("--s3-endpoint", default=os.getenv("BENCH_S3_ENDPOINT"),
+                        help="External S3 endpoint such as MinIO (default: in-process moto)")
+    parser.add_argument("--s3-bucket", default="strands-benchmark")
+
+    model = parser.add_argument_group("fake model")
+    model.add_argument("--tokens", type=int, default=200, help="Tokens per answer")
+    model.add_argument("--token-rate", type=float, default=200,
+                       help="Tokens per second (0 = unthrottled)")
+    model.add_argument("--first-token-ms", type=float, default=300, help="Model latency per turn")
+    model.add_argument("--tool-calls", type=int, default=1, help="Tool calls per chat turn")
+
+    output = parser.add_argument_group("output")
+    output.add_argument("--output", help="Write results as JSON")
+    output.add_argument("--baseline", help="Compare against a saved baseline")
+    output.add_argument("--save-baseline", help="Save results as the new baseline")
+    output.add_argument("--tolerance", type=float, default=0.10,
+                        help="Allowed relative regression against the baseline")
+    return parser.parse_args()
+
+
+async def create_agent(client: httpx.AsyncClient, token: str) -> str:
+    response = await client.post(
+        "/api/agents",
+        json={"name": "benchmark"},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    response.raise_for_status()
+    return str(response.json()["uuid"])
+
+
+async def run_scenarios(args: argparse.Namespace, worker: Worker, issuer: StubIssuer) -> dict:
+    tokens = [issuer.mint_token(f"bench-user-{i}") for i in range(args.users)]
+    limits = httpx.Limits(max_connections=args.concurrency * 2)
+    timeout = httpx.Timeout(120.0)
+    async with httpx.AsyncClient(base_url=worker.url, limits=limits, timeout=timeout) as client:
+        ctx = ScenarioContext(
+            client=client,
+            tokens=tokens,
+            agent_id=await create_agent(client, tokens[0]),
+            upload_bytes=args.upload_kb * 1024,
+        )
+
+        # Warm up: creates every user row and loads the agent/tool modules
+        await asyncio.gather(*(
+            client.get("/api/conversations", headers=ctx.headers(token)) for token in tokens
+        ))
+
+        results = {}
+        for name in args.scenarios.split(","):
+            name = name.strip()
+            if name == "history" and not ctx.conversation_ids:
+                await seed_conversations(ctx, args.seed_conversations, args.concurrency)
+
+            logger.info(f"Running {name}: {args.requests} requests, concurrency {args.concurrency}")
+            with RssSampler(worker.pid) as rss:
+                started = time.perf_counter()
+                samples = await SCENARIOS[name](ctx, args.requests, args.concurrency)
+                elapsed = time.perf_counter() - started
+
+            errors = [s.error for s in samples if not s.ok]
+            if errors:
+                logger.warning(f"{name}: {len(errors)} failed requests, first: {errors[0]}")
+            ok = [s for s in samples if s.ok]
+            result = {
+                "requests": len(samples),
+                "errors": len(errors),
+                "duration_s": round(elapsed, 3),
+                "throughput_rps": round(len(ok) / elapsed, 2),
+                "latency_ms": summarize([s.latency_ms for s in ok]),
+                "rss_mb": rss.summary(),
+            }
+            ttfts = [s.ttft_ms for s in ok if s.ttft_ms is not None]
+            if ttfts:
+                result["ttft_ms"] = summarize(ttfts)
+            results[name] = result
+        return results
+
+
+def main() -> int:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    for noisy in ("httpx", "werkzeug"):
+        logging.getLogger(noisy).setLevel(logging.WARNING)
+    args = parse_args()
+    unknown = set(s.strip() for s in args.scenarios.split(",")) - set(SCENARIOS)
+    if unknown:
+        logger.error(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+        return 2
+    if not args.database_url:
+        logger.error("Set --database-url, BENCH_DATABASE_URL or DATABASE_URL (e.g. after `pnpm db:up`)")
+        return 2
+
+    fake_model = {
+        "tokens": args.tokens,
+        "token_rate": args.token_rate,
+        "first_token_ms": args.first_token_ms,
+        "tool_calls": args.tool_calls,
+    }
+
+    # The harness talks to the S3 stand-in with the same dummy credentials
+    os.environ.update(S3_ENV)
+    issuer = StubIssuer()
+    s3 = S3StandIn(args.s3_bucket, args.s3_endpoint)
+    worker = None
+    try:
+        issuer_url = issuer.start()
+        s3_endpoint = s3.start()
+        migrate_database(args.database_url)
+
+        worker = Worker({
+            **S3_ENV,
+            "DATABASE_URL": args.database_url,
+            "OIDC_ISSUER": issuer_url,
+            "OIDC_CLIENT_ID": issuer.audience,
+            "MSC_S3_BUCKET": args.s3_bucket,
+            "MSC_S3_ENDPOINT": s3_endpoint,
+            # Used by the Strands S3 session manager's own boto3 client
+            "AWS_ENDPOINT_URL_S3": s3_endpoint,
+            "BENCH_FAKE_MODEL": json.dumps(fake_model),
+        })
+        worker.start()
+
+        scenarios = asyncio.run(run_scenarios(args, worker, issuer))
+    finally:
+        if worker is not None:
+            worker.stop()
+        s3.stop()
+        issuer.stop()
+
+    results = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "config": {
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "users": args.users,
+            "fake_model": fake_model,
+        },
+        "scenarios": scenarios,
+    }
+    print_results(results)
+
+    if args.output:
+        save_json(args.output, results)
+    if args.save_baseline:
+        save_json(args.save_baseline, results)
+        logger.info(f"Baseline saved to {args.save_baseline}")
+    if args.baseline:
+        baseline = load_json(args.baseline)
+        if baseline.get("config") != results["config"]:
+            logger.warning("Baseline was recorded with a different configuration")
+        regressions = compare_to_baseline(results, baseline, args.tolerance)
+        if regressions:
+            logger.error(f"{len(regressions)} regression(s) beyond {args.tolerance:.0%}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
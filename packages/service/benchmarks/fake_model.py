@@ -0,0 +1,130 @@
+"""Scripted Strands model provider for benchmarks.
+
+Streams a fixed number of text tokens at a configurable rate and, on the
+first turns of a request, scripted tool calls. The agent loop, tool
+execution, session persistence and SSE translation all run for real; only
+the network round trip to Bedrock is replaced.
+"""
+
+import asyncio
+import json
+import time
+from typing import Any, AsyncIterable, Optional, Type, TypeVar
+from uuid import uuid4
+
+from pydantic import BaseModel
+from strands.models import Model
+from strands.types.content import Messages
+from strands.types.streaming import StreamEvent
+from strands.types.tools import ToolSpec
+
+T = TypeVar("T", bound=BaseModel)
+
+WORDS = (
+    "the agent streams scripted tokens so that benchmark runs measure the "
+    "service rather than the model provider latency"
+).split()
+
+
+class FakeModel(Model):
+    """Model provider that replays a scripted response.
+
+    Config:
+        tokens: Text tokens streamed in the final answer
+        token_rate: Tokens per second (0 streams as fast as possible)
+        first_token_ms: Delay before the first event of each turn
+        tool_calls: Tool calls issued before the final answer
+        tool_name: Tool invoked by the scripted tool calls
+        structured_output: Fields returned, validated into the output
+            model, when structured output is requested
+    """
+
+    def __init__(self, **model_config: Any):
+        self.config = {
+            "model_id": "benchmark-fake",
+            "tokens": 200,
+            "token_rate": 0,
+            "first_token_ms": 0,
+            "tool_calls": 0,
+            "tool_name": "current_time",
+            "structured_output": {},
+        }
+        self.update_config(**model_config)
+
+    def update_config(self, **model_config: Any) -> None:
+        self.config.update(model_config)
+
+    def get_config(self) -> dict:
+        return self.config
+
+    async def structured_output(
+        self,
+        output_model: Type[T],
+        prompt: Messages,
+        system_prompt: Optional[str] = None,
+        **kwargs: Any,
+    ):
+        yield {"output": output_model.model_validate(self.config["structured_output"])}
+
+    @staticmethod
+    def _tool_results_since_user_turn(messages: Messages) -> int:
+        """Count tool results the agent loop has fed back in this request."""
+        count = 0
+        for message in reversed(messages):
+            blocks = message.get("content", [])
+            results = sum(1 for block in blocks if "toolResult" in block)
+            if message.get("role") == "user" and not results:
+                break
+            count += results
+        return count
+
+    async def stream(
+        self,
+        messages: Messages,
+        tool_specs: Optional[list[ToolSpec]] = None,
+        system_prompt: Optional[str] = None,
+        **kwargs: Any,
+    ) -> AsyncIterable[StreamEvent]:
+        started = time.perf_counter()
+        if self.config["first_token_ms"]:
+            await asyncio.sleep(self.config["first_token_ms"] / 1000)
+
+        yield {"messageStart": {"role": "assistant"}}
+
+        tool_names = {spec["name"] for spec in tool_specs or []}
+        call_tool = (
+            self._tool_results_since_user_turn(messages) < self.config["tool_calls"]
+            and self.config["tool_name"] in tool_names
+        )
+
+        if call_tool:
+            yield {
+                "contentBlockStart": {
+                    "start": {
+                        "toolUse": {
+                            "toolUseId": f"tooluse_{uuid4().hex[:16]}",
+                            "name": self.config["tool_name"],
+                        }
+                    }
+                }
+            }
+            yield {"contentBlockDelta": {"delta": {"toolUse": {"input": json.dumps({})}}}}
+            yield {"contentBlockStop": {}}
+            yield {"messageStop": {"stopReason": "tool_use"}}
+        else:
+            interval = 1 / self.config["token_rate"] if self.config["token_rate"] else 0
+            yield {"contentBlockStart": {"start": {}}}
+            for i in range(self.config["tokens"]):
+                if interval:
+                    await asyncio.sleep(interval)
+                yield {"contentBlockDelta": {"delta": {"text": WORDS[i % len(WORDS)] + " "}}}
+            yield {"contentBlockStop": {}}
+            yield {"messageStop": {"stopReason": "end_turn"}}
+
+        output_tokens = 1 if call_tool else self.config["tokens"]
+        yield {
+            "metadata": {
+                "usage": {"inputTokens": 0, "outputTokens": output_tokens, "totalTokens": output_tokens},
+                "metrics": {"latencyMs": int((time.perf_counter() - started) * 1000)},
+            }
+        }
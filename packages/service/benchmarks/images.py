@@ -0,0 +1,269 @@
+"""CPU time and peak memory of image compression for LLM input.
+
+Compresses a generated corpus of PNG, JPEG, GIF and WebP images with two
+implementations of `compress_image`:
+
+- `before`: the previous implementation, which decodes at full
+  resolution (opening the image twice) and searches quality with a
+  linear loop of re-encodes and 0.9x resizes
+- `after`: `api.utils.image_processor.compress_image`
+
+Every (image, implementation) pair runs in a fresh subprocess, so peak
+RSS is not polluted by earlier runs.
+
+    cd packages/service
+    python -m benchmarks.images
+    python -m benchmarks.images --repeat 5 --only photo_24mp.jpg,alpha.png
+"""
+
+import argparse
+import io
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from typing import List, Tuple
+
+from PIL import Image, ImageDraw
+
+# (file name, width, height, kind)
+CORPUS = [
+    ("photo_small.jpg", 1024, 768, "photo"),
+    ("photo_12mp.jpg", 4000, 3000, "photo"),
+    ("photo_24mp.jpg", 6000, 4000, "photo"),
+    ("photo_48mp.jpg", 8000, 6000, "photo"),
+    ("grain_16mp.jpg", 4096, 4096, "grain"),
+    ("photo_8mp.png", 3264, 2448, "photo"),
+    ("screenshot.png", 2560, 1600, "flat"),
+    ("alpha.png", 4500, 3000, "alpha"),
+    ("poster.webp", 5000, 3500, "photo"),
+    ("banner.gif", 4800, 1200, "flat"),
+    ("bomb.png", 12000, 12000, "flat"),
+]
+
+
+def legacy_compress_image(
+    content: bytes,
+    mime_type: str,
+    max_size: int = 3 * 1024 * 1024,
+    max_dimension: int = 4096,
+) -> Tuple[bytes, str]:
+    """The previous compress_image, kept as the baseline."""
+    if len(content) <= max_size:
+        img = Image.open(io.BytesIO(content))
+        if img.width <= max_dimension and img.height <= max_dimension:
+            return content, mime_type
+
+    img = Image.open(io.BytesIO(content))
+    if img.mode != 'RGB':
+        if img.mode in ('RGBA', 'LA'):
+            background = Image.new('RGB', img.size, (255, 255, 255))
+            background.paste(img, mask=img.split()[-1])
+            img = background
+        elif img.mode == 'P':
+            img = img.convert('RGBA')
+            background = Image.new('RGB', img.size, (255, 255, 255))
+            background.paste(img, mask=img.split()[-1])
+            img = background
+        else:
+            img = img.convert('RGB')
+
+    if img.width > max_dimension or img.height > max_dimension:
+        ratio = min(max_dimension / img.width, max_dimension / img.height)
+        new_size = (int(img.width * ratio), int(img.height * ratio))
+        img = img.resize(new_size, Image.Resampling.LANCZOS)
+
+    output_mime = "image/jpeg"
+    quality = 85
+    while quality >= 20:
+        buffer = io.BytesIO()
+        img.save(buffer, format="JPEG", quality=quality, optimize=True)
+        compressed = buffer.getvalue()
+        if len(compressed) <= max_size:
+            return compressed, output_mime
+        if quality > 50:
+            quality -= 10
+        else:
+            quality -= 5
+            new_size = (int(img.width * 0.9), int(img.height * 0.9))
+            img = img.resize(new_size, Image.Resampling.LANCZOS)
+
+    buffer = io.BytesIO()
+    img.save(buffer, format="JPEG", quality=20, optimize=True)
+    return buffer.getvalue(), output_mime
+
+
+def _photo(width: int, height: int, grain: float = 0.35) -> Image.Image:
+    """Smooth gradients with sensor-like noise: compresses like a photo."""
+    gradient = Image.linear_gradient("L").resize((width, height))
+    channels = [
+        Image.blend(gradient.rotate(angle, expand=False).resize((width, height)),
+                    Image.effect_noise((width, height), sigma), grain)
+        for angle, sigma in ((0, 40), (90, 55), (45, 70))
+    ]
+    img = Image.merge("RGB", channels)
+    draw = ImageDraw.Draw(img)
+    for i in range(40):
+        x, y = (i * 7919) % width, (i * 104729) % height
+        draw.ellipse((x, y, x + width // 8, y + height // 8), fill=(i * 37 % 256, i * 91 % 256, i * 53 % 256))
+    return img
+
+
+def _flat(width: int, height: int) -> Image.Image:
+    """Flat colours and thin lines: compresses like a screenshot."""
+    img = Image.new("RGB", (width, height), (246, 247, 249))
+    draw = ImageDraw.Draw(img)
+    for y in range(0, height, 24):
+        draw.rectangle((40, y + 6, 40 + (y * 13) % (width - 80), y + 14), fill=(60, 64, 72))
+    for x in range(0, width, 320):
+        draw.rectangle((x, 0, x + 4, height), fill=(200, 40, 90))
+    return img
+
+
+def build_corpus(directory: str) -> List[str]:
+    """Write the corpus images (once) and return their paths."""
+    paths = []
+    for name, width, height, kind in CORPUS:
+        path = os.path.join(directory, name)
+        paths.append(path)
+        if os.path.exists(path):
+            continue
+        if kind == "flat":
+            img = _flat(width, height)
+        else:
+            # Heavy grain does not fit the size limit even at low quality
+            img = _photo(width, height, grain=0.9 if kind == "grain" else 0.35)
+        if kind == "alpha":
+            alpha = Image.linear_gradient("L").resize((width, height))
+            img.putalpha(alpha)
+        ext = name.rsplit(".", 1)[-1]
+        if ext == "jpg":
+            img.save(path, "JPEG", quality=95)
+        elif ext == "gif":
+            img.convert("P", palette=Image.Palette.ADAPTIVE).save(path, "GIF")
+        elif ext == "webp":
+            img.save(path, "WEBP", quality=90)
+        else:
+            img.save(path, "PNG")
+    return paths
+
+
+MIME_TYPES = {"jpg": "image/jpeg", "png": "image/png", "gif": "image/gif", "webp": "image/webp"}
+
+
+def _reset_peak_rss() -> int:
+    """Reset the process's peak RSS (Linux), returning the current RSS in KiB."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+    return _read_status("VmRSS")
+
+
+def _read_status(field: str) -> int:
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    # ru_maxrss is in KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def run_worker(implementation: str, path: str, repeat: int) -> dict:
+    """Compress one image in this process and report CPU time and memory."""
+    if implementation == "before":
+        compress = legacy_compress_image
+    else:
+        from api.utils.image_processor import compress_image as compress
+
+    with open(path, "rb") as f:
+        content = f.read()
+    mime_type = MIME_TYPES[path.rsplit(".", 1)[-1]]
+
+    # Pillow warns about (and above twice the limit refuses) huge images;
+    # lift its guard so the baseline shows what decoding them costs
+    Image.MAX_IMAGE_PIXELS = None
+    rss_before = _reset_peak_rss()
+    cpu_times = []
+    output = None
+    for _ in range(repeat):
+        started = time.process_time()
+        try:
+            output, output_mime = compress(content, mime_type)
+        except ValueError as e:
+            result = f"rejected: {type(e).__name__}"
+        cpu_times.append(time.process_time() - started)
+    rss_peak = _read_status("VmHWM")
+
+    if output is not None:
+        with Image.open(io.BytesIO(output)) as img:
+            result = f"{output_mime.split('/')[-1]} {img.width}x{img.height}"
+    return {
+        "cpu_ms": round(min(cpu_times) * 1000, 1),
+        "peak_rss_mb": round(max(rss_peak - rss_before, 0) / 1024, 1),
+        "input_kb": len(content) // 1024,
+        "output_kb": len(output) // 1024 if output is not None else 0,
+        "result": result,
+    }
+
+
+def measure(implementation: str, path: str, repeat: int) -> dict:
+    result = subprocess.run(
+        [sys.executable, "-m", "benchmarks.images", "--worker", implementation, path,
+         "--repeat", str(repeat)],
+        capture_output=True, text=True, check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.images",
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--corpus-dir", default=os.path.join(tempfile.gettempdir(), "strands-image-corpus"),
+                        help="Where the generated corpus is cached")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per image (best CPU time is kept)")
+    parser.add_argument("--only", help="Comma-separated corpus file names")
+    parser.add_argument("--worker", nargs=2, metavar=("IMPLEMENTATION", "PATH"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_worker(args.worker[0], args.worker[1], args.repeat)))
+        return 0
+
+    os.makedirs(args.corpus_dir, exist_ok=True)
+    paths = build_corpus(args.corpus_dir)
+    if args.only:
+        wanted = set(args.only.split(","))
+        paths = [p for p in paths if os.path.basename(p) in wanted]
+
+    print(f"\n{'image':<16} {'input':>8} {'impl':<7} {'cpu ms':>8} {'peak MB':>8} "
+          f"{'output':>8}  result")
+    totals = {"before": [0.0, 0.0], "after": [0.0, 0.0]}
+    for path in paths:
+        for implementation in ("before", "after"):
+            r = measure(implementation, path, args.repeat)
+            totals[implementation][0] += r["cpu_ms"]
+            totals[implementation][1] = max(totals[implementation][1], r["peak_rss_mb"])
+            print(
+                f"{os.path.basename(path):<16} {r['input_kb']:>6}KB {implementation:<7} "
+                f"{r['cpu_ms']:>8} {r['peak_rss_mb']:>8} {r['output_kb']:>6}KB  {r['result']}"
+            )
+
+    print(f"\ntotal cpu ms: before {totals['before'][0]:.0f}, after {totals['after'][0]:.0f} "
+          f"({totals['before'][0] / max(totals['after'][0], 1):.2f}x)")
+    print(f"max peak MB:  before {totals['before'][1]:.0f}, after {totals['after'][1]:.0f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,123 @@
+"""Stub OIDC issuer for benchmarks.
+
+Serves the discovery document, a JWKS with one RSA key and a userinfo
+endpoint from a background thread, and mints RS256 access tokens signed
+with that key, so the auth middleware verifies tokens exactly as it does
+against a real provider.
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jose import jwk, jwt
+
+
+class StubIssuer:
+    """Minimal OIDC provider running on localhost."""
+
+    def __init__(self, audience: str = "benchmark-client", kid: str = "benchmark-key"):
+        self.audience = audience
+        self.kid = kid
+        private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        self._private_pem = private_key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        ).decode()
+        public_pem = private_key.public_key().public_bytes(
+            serialization.Encoding.PEM,
+            serialization.PublicFormat.SubjectPublicKeyInfo,
+        ).decode()
+        self._jwk = {
+            **jwk.construct(public_pem, "RS256").to_dict(),
+            "kid": kid,
+            "use": "sig",
+        }
+        self._server: Optional[ThreadingHTTPServer] = None
+        self.url = ""
+
+    def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Start serving and return the issuer URL."""
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self.url = f"http://{host}:{self._server.server_port}"
+        threading.Thread(
+            target=self._server.serve_forever, name="stub-issuer", daemon=True
+        ).start()
+        return self.url
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+
+    def mint_token(self, sub: str, ttl: int = 3600) -> str:
+        """Mint an RS256 access token for the given subject."""
+        now = int(time.time())
+        claims = {
+            "iss": self.url,
+            "sub": sub,
+            "aud": self.audience,
+            "iat": now,
+            "exp": now + ttl,
+            "email": f"{sub}@benchmark.local",
+            "name": sub,
+        }
+        return jwt.encode(claims, self._private_pem, algorithm="RS256", headers={"kid": self.kid})
+
+    def _discovery(self) -> dict:
+        return {
+            "issuer": self.url,
+            "authorization_endpoint": f"{self.url}/authorize",
+            "token_endpoint": f"{self.url}/token",
+            "userinfo_endpoint": f"{self.url}/userinfo",
+            "jwks_uri": f"{self.url}/jwks",
+            "response_types_supported": ["code"],
+            "subject_types_supported": ["public"],
+            "id_token_signing_alg_values_supported": ["RS256"],
+        }
+
+    def _handler(self):
+        issuer = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == "/.well-known/openid-configuration":
+                    self._send_json(issuer._discovery())
+                elif self.path == "/jwks":
+                    self._send_json({"keys": [issuer._jwk]})
+                elif self.path.startswith("/userinfo"):
+                    self._userinfo()
+                else:
+                    self._send_json({"error": "not_found"}, status=404)
+
+            def _userinfo(self):
+                auth = self.headers.get("Authorization", "")
+                try:
+                    claims = jwt.get_unverified_claims(auth.split(" ", 1)[1])
+                except Exception:
+                    self._send_json({"error": "invalid_token"}, status=401)
+                    return
+                self._send_json({
+                    "sub": claims["sub"],
+                    "email": claims.get("email"),
+                    "name": claims.get("name"),
+                })
+
+            def _send_json(self, payload: dict, status: int = 200):
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
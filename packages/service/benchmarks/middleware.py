@@ -0,0 +1,256 @@
+"""SSE frame throughput through the middleware stack.
+
+Streams N frames from a bare FastAPI route through two middleware stacks
+with identical behaviour, driving the ASGI app directly (no sockets):
+
+- `before`: the previous `@app.middleware("http")` functions, which run on
+  Starlette's BaseHTTPMiddleware and relay every body chunk through an
+  extra task and memory stream per middleware
+- `after`: the pure ASGI classes from `api.middleware`
+
+Both stacks verify a real RS256 token against the stub issuer and resolve
+the user from the (pre-seeded) user cache, so no database is needed.
+
+    cd packages/service
+    python -m benchmarks.middleware
+    python -m benchmarks.middleware --frames 2000 --requests 50 --concurrency 8
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+from datetime import datetime
+from typing import Callable, List
+from uuid import uuid4
+
+from .issuer import StubIssuer
+from .report import summarize
+
+
+def build_before(app_factory: Callable):
+    """The previous function-based middleware stack."""
+    from fastapi import Request
+    from fastapi.responses import JSONResponse
+    from vercel.headers import set_headers
+
+    from api.database.session import get_session, set_session_context
+    from api.middleware.auth import PUBLIC_PATHS
+    from api.services.user_service import get_or_create_user
+    from api.telemetry import start_span
+    from api.utils.auth import verify_token
+
+    app = app_factory()
+
+    @app.middleware("http")
+    async def _vercel_set_headers(request: Request, call_next):
+        set_headers(dict(request.headers))
+        return await call_next(request)
+
+    @app.middleware("http")
+    async def authenticate_requests(request: Request, call_next):
+        if request.url.path in PUBLIC_PATHS or not request.url.path.startswith("/api/"):
+            return await call_next(request)
+        parts = request.headers.get("authorization", "").split()
+        if len(parts) != 2 or parts[0].lower() != "bearer":
+            return JSONResponse(status_code=401, content={"detail": "Invalid authorization header"})
+        try:
+            with start_span("middleware.authenticate"):
+                claims = await verify_token(
+                    parts[1], os.getenv("OIDC_ISSUER"), os.getenv("OIDC_CLIENT_ID")
+                )
+                request.state.user = claims
+                request.state.db_user = await get_or_create_user(get_session(), claims, parts[1])
+        except Exception as e:
+            return JSONResponse(status_code=401, content={"detail": str(e)})
+        return await call_next(request)
+
+    @app.middleware("http")
+    async def database_session_middleware(request: Request, call_next):
+        if request.url.path.startswith("/api/"):
+            with start_span(
+                "middleware.database_session",
+                {"http.method": request.method, "http.target": request.url.path},
+            ):
+                with set_session_context():
+                    return await call_next(request)
+        return await call_next(request)
+
+    return app
+
+
+def build_after(app_factory: Callable):
+    """The pure ASGI middleware stack, registered as in api.index."""
+    from api.middleware import (
+        AuthenticationMiddleware,
+        DatabaseSessionMiddleware,
+        VercelHeadersMiddleware,
+    )
+
+    app = app_factory()
+    app.add_middleware(VercelHeadersMiddleware)
+    app.add_middleware(AuthenticationMiddleware)
+    app.add_middleware(DatabaseSessionMiddleware)
+    return app
+
+
+def sse_app_factory(frames: int, frame_bytes: int) -> Callable:
+    from fastapi import FastAPI
+    from fastapi.responses import StreamingResponse
+
+    frame = f"data: {{\"type\":\"text-delta\",\"delta\":\"{'x' * frame_bytes}\"}}\n\n"
+
+    def factory():
+        app = FastAPI()
+
+        @app.post("/api/agent/chat")
+        async def chat():
+            async def stream():
+                for _ in range(frames):
+                    yield frame
+            return StreamingResponse(stream(), media_type="text/event-stream")
+
+        return app
+
+    return factory
+
+
+async def run_request(app, token: str) -> dict:
+    """Drive one request through the ASGI app, counting body chunks."""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": "/api/agent/chat",
+        "raw_path": b"/api/agent/chat",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"authorization", f"Bearer {token}".encode()), (b"host", b"bench")],
+        "client": ("127.0.0.1", 1234),
+        "server": ("bench", 80),
+    }
+    done = asyncio.Event()
+    request_sent = False
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await done.wait()
+        return {"type": "http.disconnect"}
+
+    result = {"status": None, "chunks": 0, "bytes": 0}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            result["status"] = message["status"]
+        elif message["type"] == "http.response.body":
+            if message.get("body"):
+                result["chunks"] += 1
+                result["bytes"] += len(message["body"])
+            if not message.get("more_body", False):
+                done.set()
+
+    await app(scope, receive, send)
+    done.set()
+    return result
+
+
+async def measure(app, tokens: List[str], requests: int, concurrency: int) -> dict:
+    # Warm up (JWKS fetch, token cache)
+    for token in tokens:
+        warmup = await run_request(app, token)
+        if warmup["status"] != 200:
+            raise RuntimeError(f"Warm-up request failed with status {warmup['status']}")
+
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    frames = 0
+
+    async def one(i: int):
+        nonlocal frames
+        async with semaphore:
+            started = time.perf_counter()
+            result = await run_request(app, tokens[i % len(tokens)])
+            latencies.append((time.perf_counter() - started) * 1000)
+            frames += result["chunks"]
+
+    started = time.perf_counter()
+    cpu_started = time.process_time()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    elapsed = time.perf_counter() - started
+    cpu = time.process_time() - cpu_started
+    return {
+        "frames": frames,
+        "frames_per_s": round(frames / elapsed),
+        "us_per_frame": round(cpu / frames * 1e6, 2),
+        "latency_ms": summarize(latencies),
+    }
+
+
+def seed_user_cache(subs: List[str]) -> None:
+    """Resolve the benchmark users from the cache instead of the database."""
+    from api.models.user import UserRead
+    from api.services import user_service
+
+    now = datetime.utcnow()
+    for i, sub in enumerate(subs, start=1):
+        user_service._user_cache[sub] = UserRead(
+            id=i, uuid=uuid4(), external_user_id=sub, email=f"{sub}@benchmark.local",
+            name=sub, created_at=now, updated_at=now,
+        )
+
+
+async def run(args: argparse.Namespace) -> int:
+    factory = sse_app_factory(args.frames, args.frame_bytes)
+    issuer = StubIssuer()
+    issuer_url = issuer.start()
+    os.environ["OIDC_ISSUER"] = issuer_url
+    os.environ["OIDC_CLIENT_ID"] = issuer.audience
+    try:
+        subs = [f"bench-user-{i}" for i in range(args.users)]
+        tokens = [issuer.mint_token(sub) for sub in subs]
+        seed_user_cache(subs)
+
+        results = {}
+        for name, build in (("before", build_before), ("after", build_after)):
+            results[name] = await measure(build(factory), tokens, args.requests, args.concurrency)
+    finally:
+        issuer.stop()
+
+    print(f"\n{'stack':<8} {'frames':>8} {'frames/s':>10} {'cpu us/frame':>13} "
+          f"{'p50 ms':>8} {'p95 ms':>8}")
+    for name, r in results.items():
+        print(
+            f"{name:<8} {r['frames']:>8} {r['frames_per_s']:>10} {r['us_per_frame']:>13} "
+            f"{r['latency_ms']['p50']:>8} {r['latency_ms']['p95']:>8}"
+        )
+    speedup = results["after"]["frames_per_s"] / results["before"]["frames_per_s"]
+    print(f"\nafter/before throughput: {speedup:.2f}x")
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.middleware",
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--frames", type=int, default=1000, help="SSE frames per response")
+    parser.add_argument("--frame-bytes", type=int, default=16, help="Text delta size per frame")
+    parser.add_argument("--requests", type=int, default=40, help="Streams per stack")
+    parser.add_argument("--concurrency", type=int, default=8, help="Streams in flight")
+    parser.add_argument("--users", type=int, default=4, help="Distinct token subjects")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    return asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,193 @@
+"""Wall time of page-parallel PDF parsing against whole-document parsing.
+
+Converts a generated corpus of long PDFs (prose, and prose with pages of
+column-aligned tables) through `ParseQueue` with process pools of
+increasing size:
+
+- `whole`: the document converted by markitdown in one worker, as every
+  document was before page-range splitting (and as single-worker pools
+  still do)
+- `split`: the document converted in page ranges (up to two per worker,
+  of at least `--min-pages` pages) spread over the pool, and stitched
+  back in page order
+
+Every split conversion is checked to produce exactly the Markdown of the
+whole conversion. Speedups are bounded by the number of cores, which the
+report shows next to them.
+
+    cd packages/service
+    python -m benchmarks.pdfs
+    python -m benchmarks.pdfs --workers 1,2,4,8 --only prose_300.pdf
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from typing import List, Optional
+
+# (file name, pages, a table page every n pages or None)
+CORPUS = [
+    ("prose_100.pdf", 100, None),
+    ("prose_300.pdf", 300, None),
+    ("report_300.pdf", 300, 25),
+]
+
+WORDS = (
+    "the service converts uploaded documents to markdown so that the model can read them "
+    "while parsing runs in worker processes that never block the event loop of the api "
+    "long reports spend most of their time in layout analysis of every page"
+).split()
+
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def _prose_page(number: int) -> str:
+    lines = []
+    for line in range(46):
+        start = (number * 7 + line * 5) % len(WORDS)
+        words = (WORDS[start:] + WORDS)[:12]
+        lines.append(f"({_escape(' '.join(words))}) Tj 0 -14 Td")
+    return f"BT /F1 11 Tf 72 730 Td ({number}) Tj 0 -20 Td " + " ".join(lines) + " ET"
+
+
+def _table_page(number: int) -> str:
+    cells = []
+    columns = ("Item", "Region", "Quarter", "Units", "Revenue")
+    for row in range(30):
+        y = 720 - row * 20
+        values = columns if row == 0 else (
+            f"item-{number}-{row}", ("north", "south", "east", "west")[row % 4],
+            f"Q{row % 4 + 1}", str(row * 37 % 1000), f"{row * 1234 % 99999}.00",
+        )
+        for column, value in enumerate(values):
+            cells.append(f"BT /F1 10 Tf {72 + column * 100} {y} Td ({value}) Tj ET")
+    return " ".join(cells)
+
+
+def make_pdf(pages: int, table_every: Optional[int]) -> bytes:
+    """Write a PDF with one Helvetica content stream per page."""
+    # 1: catalog, 2: page tree, 3: font, then a page and its content per page
+    objects = {
+        1: "<< /Type /Catalog /Pages 2 0 R >>",
+        3: "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    }
+    kids = []
+    for number in range(pages):
+        page_id, content_id = 4 + number * 2, 5 + number * 2
+        kids.append(f"{page_id} 0 R")
+        is_table = table_every is not None and number % table_every == table_every - 1
+        stream = _table_page(number) if is_table else _prose_page(number)
+        objects[page_id] = (
+            "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Contents {content_id} 0 R /Resources << /Font << /F1 3 0 R >> >> >>"
+        )
+        objects[content_id] = f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream"
+    objects[2] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {pages} >>"
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = {}
+    for object_id in sorted(objects):
+        offsets[object_id] = len(out)
+        out += f"{object_id} 0 obj\n{objects[object_id]}\nendobj\n".encode("latin-1")
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    for object_id in sorted(objects):
+        out += f"{offsets[object_id]:010d} 00000 n \n".encode()
+    out += (
+        f"trailer << /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n"
+    ).encode()
+    return bytes(out)
+
+
+def build_corpus(directory: str) -> List[str]:
+    """Write the corpus PDFs (once) and return their paths."""
+    paths = []
+    for name, pages, table_every in CORPUS:
+        path = os.path.join(directory, name)
+        paths.append(path)
+        if not os.path.exists(path):
+            with open(path, "wb") as f:
+                f.write(make_pdf(pages, table_every))
+    return paths
+
+
+async def measure(path: str, workers: int, min_pages: int, repeat: int) -> tuple:
+    """Convert one PDF with a pool of `workers` processes; best wall time."""
+    from api.services.parse_queue import ParseQueue
+
+    queue = ParseQueue(mode="process", workers=workers, pdf_min_pages_per_task=min_pages)
+    queue._executor = queue._create_executor()
+    await queue._warm_up()
+    with open(path, "rb") as f:
+        content = f.read()
+    name = os.path.basename(path)
+    times = []
+    try:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            markdown = await queue._convert(content, ".pdf", "application/pdf", name)
+            times.append(time.perf_counter() - started)
+    finally:
+        await queue.stop()
+    return min(times), markdown
+
+
+async def run(paths: List[str], worker_counts: List[int], min_pages: int, repeat: int) -> int:
+    cores = os.cpu_count() or 1
+    print(f"\n{cores} cores, at least {min_pages} pages per task")
+    print(f"{'document':<16} {'workers':>7} {'mode':<6} {'wall s':>8} {'speedup':>8} "
+          f"{'bound':>6}  output")
+    mismatches = 0
+    for path in paths:
+        # One worker never splits: the whole-document baseline
+        baseline, expected = await measure(path, 1, min_pages, repeat)
+        name = os.path.basename(path)
+        print(f"{name:<16} {1:>7} {'whole':<6} {baseline:>8.2f} {1.0:>7.2f}x {1:>6}  "
+              f"{len(expected or '')} chars")
+        for workers in worker_counts:
+            if workers == 1:
+                continue
+            wall, markdown = await measure(path, workers, min_pages, repeat)
+            identical = markdown == expected
+            mismatches += not identical
+            print(f"{name:<16} {workers:>7} {'split':<6} {wall:>8.2f} {baseline / wall:>7.2f}x "
+                  f"{min(workers, cores):>6}  {'identical' if identical else 'DIFFERS'}")
+    if mismatches:
+        print(f"\n{mismatches} split conversions differ from the whole conversion")
+    return 1 if mismatches else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.pdfs",
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    cores = os.cpu_count() or 1
+    default_workers = sorted({1, 2, 4, cores})
+    parser.add_argument("--corpus-dir", default=os.path.join(tempfile.gettempdir(), "strands-pdf-corpus"),
+                        help="Where the generated corpus is cached")
+    parser.add_argument("--workers", default=",".join(map(str, default_workers)),
+                        help="Comma-separated pool sizes to measure")
+    parser.add_argument("--min-pages", type=int, default=16,
+                        help="Minimum pages per converted range (PDF_MIN_PAGES_PER_TASK)")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per measurement (best is kept)")
+    parser.add_argument("--only", help="Comma-separated corpus file names")
+    args = parser.parse_args()
+
+    os.makedirs(args.corpus_dir, exist_ok=True)
+    paths = build_corpus(args.corpus_dir)
+    if args.only:
+        wanted = set(args.only.split(","))
+        paths = [p for p in paths if os.path.basename(p) in wanted]
+    worker_counts = sorted({int(w) for w in args.workers.split(",")})
+    return asyncio.run(run(paths, worker_counts, args.min_pages, args.repeat))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
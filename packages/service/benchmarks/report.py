@@ -0,0 +1,145 @@
+"""Result aggregation, worker RSS sampling and baseline comparison."""
+
+import json
+import threading
+from typing import Dict, List, Optional
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Linearly interpolated percentile of values (pct in 0-100)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    lower = int(rank)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+
+def summarize(values: List[float]) -> Dict[str, float]:
+    """Latency summary in milliseconds."""
+    if not values:
+        return {}
+    return {
+        "p50": round(percentile(values, 50), 2),
+        "p95": round(percentile(values, 95), 2),
+        "p99": round(percentile(values, 99), 2),
+        "mean": round(sum(values) / len(values), 2),
+        "max": round(max(values), 2),
+    }
+
+
+def read_rss_mb(pid: int) -> float:
+    """Resident set size of a process in MiB, read from /proc."""
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+class RssSampler:
+    """Samples a process's RSS on a background thread."""
+
+    def __init__(self, pid: int, interval: float = 0.1):
+        self.pid = pid
+        self.interval = interval
+        self.samples: List[float] = []
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="rss-sampler", daemon=True)
+
+    def __enter__(self) -> "RssSampler":
+        self.samples.append(read_rss_mb(self.pid))
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stopped.set()
+        self._thread.join()
+        self.samples.append(read_rss_mb(self.pid))
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            try:
+                self.samples.append(read_rss_mb(self.pid))
+            except FileNotFoundError:
+                return
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "start": round(self.samples[0], 1),
+            "peak": round(max(self.samples), 1),
+            "end": round(self.samples[-1], 1),
+        }
+
+
+# (section, key) -> True if higher is better
+COMPARED_METRICS = {
+    ("throughput_rps", None): True,
+    ("latency_ms", "p50"): False,
+    ("latency_ms", "p95"): False,
+    ("latency_ms", "p99"): False,
+    ("ttft_ms", "p50"): False,
+    ("ttft_ms", "p95"): False,
+    ("rss_mb", "peak"): False,
+}
+
+
+def _metric(result: dict, section: str, key: Optional[str]) -> Optional[float]:
+    value = result.get(section)
+    if key is not None:
+        value = value.get(key) if isinstance(value, dict) else None
+    return value
+
+
+def compare_to_baseline(results: dict, baseline: dict, tolerance: float) -> List[str]:
+    """Print a comparison table and return the regressions beyond tolerance.
+
+    Args:
+        results: Current run, as produced by the harness
+        baseline: A previously saved run
+        tolerance: Allowed relative regression, e.g. 0.1 for 10%
+    """
+    regressions = []
+    print(f"\n{'scenario':<10} {'metric':<16} {'baseline':>10} {'current':>10} {'change':>8}")
+    for scenario, result in results["scenarios"].items():
+        base = baseline.get("scenarios", {}).get(scenario)
+        if base is None:
+            continue
+        for (section, key), higher_is_better in COMPARED_METRICS.items():
+            current, previous = _metric(result, section, key), _metric(base, section, key)
+            if not current or not previous:
+                continue
+            change = (current - previous) / previous
+            regressed = -change > tolerance if higher_is_better else change > tolerance
+            name = f"{section}.{key}" if key else section
+            marker = "  REGRESSION" if regressed else ""
+            print(f"{scenario:<10} {name:<16} {previous:>10.2f} {current:>10.2f} {change:>+7.1%}{marker}")
+            if regressed:
+                regressions.append(f"{scenario} {name} {change:+.1%}")
+    return regressions
+
+
+def print_results(results: dict) -> None:
+    print(f"\n{'scenario':<10} {'reqs':>6} {'errors':>6} {'rps':>8} {'p50':>8} {'p95':>8} "
+          f"{'p99':>8} {'ttft p50':>9} {'rss peak':>9}")
+    for scenario, result in results["scenarios"].items():
+        latency = result["latency_ms"]
+        ttft = f"{result['ttft_ms']['p50']:.1f}" if "ttft_ms" in result else "-"
+        print(
+            f"{scenario:<10} {result['requests']:>6} {result['errors']:>6} "
+            f"{result['throughput_rps']:>8.1f} {latency.get('p50', 0):>8.1f} "
+            f"{latency.get('p95', 0):>8.1f} {latency.get('p99', 0):>8.1f} "
+            f"{ttft:>9} {result['rss_mb']['peak']:>8.1f}M"
+        )
+
+
+def load_json(path: str) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_json(path: str, data: dict) -> None:
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2)
+        f.write("\n")
@@ -0,0 +1,203 @@
+"""Load scenarios driven against a running worker.
+
+Each scenario issues a fixed number of requests with bounded concurrency
+and returns per-request samples; aggregation happens in the harness.
+"""
+
+import asyncio
+import io
+import itertools
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, List, Optional
+from uuid import uuid4
+
+import httpx
+
+
+@dataclass
+class Sample:
+    """Outcome of a single request."""
+
+    latency_ms: float
+    ok: bool
+    ttft_ms: Optional[float] = None
+    error: Optional[str] = None
+
+
+@dataclass
+class ScenarioContext:
+    """State shared by the scenarios of one run."""
+
+    client: httpx.AsyncClient
+    tokens: List[str]
+    agent_id: str
+    prompt: str = "Benchmark prompt"
+    upload_bytes: int = 256 * 1024
+    conversation_ids: List[str] = field(default_factory=list)
+    _token_cycle: Optional[itertools.cycle] = None
+
+    def next_token(self) -> str:
+        if self._token_cycle is None:
+            self._token_cycle = itertools.cycle(self.tokens)
+        return next(self._token_cycle)
+
+    def headers(self, token: Optional[str] = None) -> dict:
+        return {"Authorization": f"Bearer {token or self.next_token()}"}
+
+
+async def run_requests(
+    request: Callable[[int], Awaitable[Sample]], total: int, concurrency: int
+) -> List[Sample]:
+    """Run request(i) for i in range(total) with at most concurrency in flight."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def bounded(i: int) -> Sample:
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                return await request(i)
+            except Exception as e:
+                return Sample(
+                    latency_ms=(time.perf_counter() - started) * 1000,
+                    ok=False,
+                    error=f"{type(e).__name__}: {e}",
+                )
+
+    return await asyncio.gather(*(bounded(i) for i in range(total)))
+
+
+def _chat_body(conversation_id: str, agent_id: str, text: str) -> dict:
+    return {
+        "id": conversation_id,
+        "agent_id": agent_id,
+        "message": {
+            "id": f"msg-{uuid4().hex}",
+            "role": "user",
+            "parts": [{"type": "text", "text": text}],
+        },
+    }
+
+
+async def chat_once(ctx: ScenarioContext, conversation_id: Optional[str] = None) -> Sample:
+    """Stream one chat completion; TTFT is the time to the first text delta."""
+    conversation_id = conversation_id or str(uuid4())
+    started = time.perf_counter()
+    ttft_ms = None
+    async with ctx.client.stream(
+        "POST",
+        "/api/agent/chat",
+        json=_chat_body(conversation_id, ctx.agent_id, ctx.prompt),
+        headers=ctx.headers(),
+    ) as response:
+        if response.status_code != 200:
+            await response.aread()
+            return Sample(
+                latency_ms=(time.perf_counter() - started) * 1000,
+                ok=False,
+                error=f"HTTP {response.status_code}: {response.text[:200]}",
+            )
+        errored = False
+        async for line in response.aiter_lines():
+            if ttft_ms is None and line.startswith('data: {"type":"text-delta"'):
+                ttft_ms = (time.perf_counter() - started) * 1000
+            elif line.startswith('data: {"type":"error"'):
+                errored = True
+    latency_ms = (time.perf_counter() - started) * 1000
+    if errored:
+        return Sample(latency_ms=latency_ms, ok=False, error="error frame in stream")
+    return Sample(latency_ms=latency_ms, ok=True, ttft_ms=ttft_ms)
+
+
+async def _timed_get(ctx: ScenarioContext, url: str) -> Sample:
+    started = time.perf_counter()
+    response = await ctx.client.get(url, headers=ctx.headers())
+    latency_ms = (time.perf_counter() - started) * 1000
+    if response.status_code != 200:
+        return Sample(latency_ms=latency_ms, ok=False, error=f"HTTP {response.status_code}")
+    return Sample(latency_ms=latency_ms, ok=True)
+
+
+def _upload_payload(size: int) -> bytes:
+    """A PNG of roughly the given size (random pixels do not compress)."""
+    from PIL import Image
+
+    side = max(int((size / 3) ** 0.5), 1)
+    image = Image.frombytes("RGB", (side, side), os.urandom(side * side * 3))
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG", compress_level=1)
+    return buffer.getvalue()
+
+
+async def seed_conversations(ctx: ScenarioContext, count: int, concurrency: int) -> None:
+    """Create conversations with history for the history and poll scenarios.
+
+    All seeded conversations belong to the first benchmark user, whose token
+    the history scenario then uses.
+    """
+    token = ctx.tokens[0]
+
+    async def seed(i: int) -> Sample:
+        conversation_id = str(uuid4())
+        seeded = ScenarioContext(
+            client=ctx.client, tokens=[token], agent_id=ctx.agent_id, prompt=ctx.prompt
+        )
+        sample = await chat_once(seeded, conversation_id)
+        if sample.ok:
+            ctx.conversation_ids.append(conversation_id)
+        return sample
+
+    await run_requests(seed, count, concurrency)
+    if not ctx.conversation_ids:
+        raise RuntimeError("Seeding conversations failed; see worker logs")
+
+
+async def chat(ctx: ScenarioContext, total: int, concurrency: int) -> List[Sample]:
+    """Concurrent chat streams, each in a new conversation."""
+    return await run_requests(lambda i: chat_once(ctx), total, concurrency)
+
+
+async def history(ctx: ScenarioContext, total: int, concurrency: int) -> List[Sample]:
+    """Message history loads of seeded conversations."""
+    token = ctx.tokens[0]
+    owner = ScenarioContext(client=ctx.client, tokens=[token], agent_id=ctx.agent_id)
+    ids = ctx.conversation_ids
+
+    return await run_requests(
+        lambda i: _timed_get(owner, f"/api/conversations/{ids[i % len(ids)]}/messages"),
+        total,
+        concurrency,
+    )
+
+
+async def upload(ctx: ScenarioContext, total: int, concurrency: int) -> List[Sample]:
+    """Single-file image uploads."""
+    payload = _upload_payload(ctx.upload_bytes)
+
+    async def upload_once(i: int) -> Sample:
+        started = time.perf_counter()
+        response = await ctx.client.post(
+            "/api/files/upload",
+            files={"files": (f"bench-{i}.png", payload, "image/png")},
+            headers=ctx.headers(),
+        )
+        latency_ms = (time.perf_counter() - started) * 1000
+        if response.status_code != 200:
+            return Sample(latency_ms=latency_ms, ok=False, error=f"HTTP {response.status_code}")
+        return Sample(latency_ms=latency_ms, ok=True)
+
+    return await run_requests(upload_once, total, concurrency)
+
+
+async def poll(ctx: ScenarioContext, total: int, concurrency: int) -> List[Sample]:
+    """Conversation list polling, as the sidebar does."""
+    return await run_requests(lambda i: _timed_get(ctx, "/api/conversations"), total, concurrency)
+
+
+SCENARIOS = {
+    "chat": chat,
+    "history": history,
+    "upload": upload,
+    "poll": poll,
+}
@@ -0,0 +1,129 @@
+"""Local stand-ins for the services the API depends on.
+
+Postgres is expected to be running locally (`pnpm db:up`); S3 is served by
+an in-process moto server unless an external endpoint such as MinIO is
+given; OIDC is served by StubIssuer. The API itself runs in a worker
+subprocess (see worker.py).
+"""
+
+import logging
+import os
+import socket
+import subprocess
+import sys
+import time
+from typing import Optional
+
+import boto3
+import httpx
+
+logger = logging.getLogger(__name__)
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Dummy credentials for the S3 stand-in, also used by the worker
+S3_ENV = {
+    "AWS_ACCESS_KEY_ID": "benchmark",
+    "AWS_SECRET_ACCESS_KEY": "benchmark",
+    "AWS_DEFAULT_REGION": "us-east-1",
+}
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class S3StandIn:
+    """Moto S3 server, or an external S3-compatible endpoint (e.g. MinIO)."""
+
+    def __init__(self, bucket: str, endpoint: Optional[str] = None):
+        self.bucket = bucket
+        self.endpoint = endpoint
+        self._server = None
+
+    def start(self) -> str:
+        if self.endpoint is None:
+            try:
+                from moto.server import ThreadedMotoServer
+            except ImportError:
+                raise RuntimeError(
+                    "moto is not installed. Install with: pip install 'strands-ai-sdk[bench]' "
+                    "or pass --s3-endpoint to use MinIO"
+                )
+            port = free_port()
+            self._server = ThreadedMotoServer(ip_address="127.0.0.1", port=port, verbose=False)
+            self._server.start()
+            self.endpoint = f"http://127.0.0.1:{port}"
+
+        client = boto3.client(
+            "s3",
+            endpoint_url=self.endpoint,
+            aws_access_key_id=S3_ENV["AWS_ACCESS_KEY_ID"],
+            aws_secret_access_key=S3_ENV["AWS_SECRET_ACCESS_KEY"],
+            region_name=S3_ENV["AWS_DEFAULT_REGION"],
+        )
+        try:
+            client.create_bucket(Bucket=self.bucket)
+        except client.exceptions.BucketAlreadyOwnedByYou:
+            pass
+        return self.endpoint
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.stop()
+
+
+def migrate_database(database_url: str) -> None:
+    """Bring the benchmark database up to the latest schema."""
+    subprocess.run(
+        [sys.executable, "-m", "alembic", "upgrade", "head"],
+        cwd=SERVICE_DIR,
+        env={**os.environ, "DATABASE_URL": database_url},
+        check=True,
+        capture_output=True,
+    )
+
+
+class Worker:
+    """API worker subprocess running benchmarks.worker."""
+
+    def __init__(self, env: dict, port: Optional[int] = None):
+        self.port = port or free_port()
+        self.url = f"http://127.0.0.1:{self.port}"
+        self.env = env
+        self.process: Optional[subprocess.Popen] = None
+
+    def start(self, timeout: float = 60.0) -> None:
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "benchmarks.worker", "--port", str(self.port)],
+            cwd=SERVICE_DIR,
+            env={**os.environ, **self.env},
+            # The agent's default callback handler prints every token
+            stdout=subprocess.DEVNULL,
+        )
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"Worker exited with code {self.process.returncode}")
+            try:
+                if httpx.get(f"{self.url}/openapi.json", timeout=1.0).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            time.sleep(0.2)
+        self.stop()
+        raise RuntimeError(f"Worker did not become ready within {timeout:.0f}s")
+
+    @property
+    def pid(self) -> int:
+        return self.process.pid
+
+    def stop(self) -> None:
+        if self.process is not None and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
@@ -0,0 +1,322 @@
+"""Replay benchmark for the Strands-to-SSE translator.
+
+Recorded `agent.stream_async` event sequences (benchmarks/traces/*.json)
+are replayed through `stream_strands_agent` at full speed, without a model,
+database or network. Each trace has a snapshot of the frames it must emit
+(*.frames.json), so translator optimizations cannot silently change the
+protocol.
+
+    cd packages/service
+    python -m benchmarks.translator replay              # check snapshots, then time
+    python -m benchmarks.translator check               # snapshots only
+    python -m benchmarks.translator check --update      # accept new output
+    python -m benchmarks.translator record --name my_trace --prompt "What time is it?"
+
+Recording runs the default agent against the configured model provider.
+"""
+
+import argparse
+import asyncio
+import glob
+import json
+import os
+import sys
+import time
+import tracemalloc
+import uuid
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+from strands.interrupt import Interrupt
+
+TRACES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "traces")
+
+# The only event keys stream_strands_agent reads
+TRANSLATED_KEYS = ("event", "message", "tool_interrupt_event")
+
+
+def project_event(event: Dict[str, Any]) -> Dict[str, Any]:
+    """Reduce a live stream event to the JSON-serializable keys the translator reads.
+
+    Events the translator ignores are kept as empty dicts so that replay
+    iterates over the same number of events as the live stream.
+    """
+    projected = {}
+    for key in TRANSLATED_KEYS:
+        if key not in event:
+            continue
+        value = event[key]
+        if key == "tool_interrupt_event":
+            value = {
+                "tool_use": value["tool_use"],
+                "interrupts": [
+                    {"id": i.id, "name": i.name, "reason": i.reason} for i in value["interrupts"]
+                ],
+            }
+        projected[key] = value
+    return projected
+
+
+def restore_event(event: Dict[str, Any]) -> Dict[str, Any]:
+    """Turn a recorded event back into what the translator receives live."""
+    if "tool_interrupt_event" in event:
+        interrupt_event = event["tool_interrupt_event"]
+        return {
+            "tool_interrupt_event": {
+                "tool_use": interrupt_event["tool_use"],
+                "interrupts": [Interrupt(**i) for i in interrupt_event["interrupts"]],
+            }
+        }
+    return event
+
+
+class ReplayAgent:
+    """Stands in for a Strands Agent, yielding a recorded event sequence."""
+
+    def __init__(self, events: List[Dict[str, Any]]):
+        self.events = events
+
+    async def stream_async(self, agent_input):
+        for event in self.events:
+            yield event
+
+
+class DeterministicUUIDs:
+    """Replacement for the uuid module that makes frame ids reproducible."""
+
+    def __init__(self):
+        self._counter = 0
+
+    def uuid4(self) -> uuid.UUID:
+        self._counter += 1
+        # Put the counter in the leading digits, which the short ids keep
+        return uuid.UUID(int=self._counter << 96)
+
+
+def load_trace(path: str) -> dict:
+    from api.utils.prompt import ClientMessage
+
+    with open(path) as f:
+        trace = json.load(f)
+    return {
+        "name": os.path.splitext(os.path.basename(path))[0],
+        "path": path,
+        "messages": [ClientMessage.model_validate(m) for m in trace["messages"]],
+        "events": [restore_event(e) for e in trace["events"]],
+    }
+
+
+def trace_paths(names: Optional[List[str]] = None) -> List[str]:
+    paths = sorted(
+        p for p in glob.glob(os.path.join(TRACES_DIR, "*.json")) if not p.endswith(".frames.json")
+    )
+    if names:
+        paths = [p for p in paths if os.path.splitext(os.path.basename(p))[0] in names]
+    return paths
+
+
+async def translate(trace: dict, deterministic: bool = False) -> SimpleNamespace:
+    """Run one trace through stream_strands_agent and collect its output."""
+    from api.utils import stream
+
+    finished = []
+
+    def on_finish(message: dict, message_id: str = None):
+        finished.append({"message": message, "message_id": message_id})
+
+    original_uuid = stream.uuid_module
+    if deterministic:
+        stream.uuid_module = DeterministicUUIDs()
+    try:
+        frames = [
+            frame
+            async for frame in stream.stream_strands_agent(
+                ReplayAgent(trace["events"]), trace["messages"], on_finish=on_finish
+            )
+        ]
+    finally:
+        stream.uuid_module = original_uuid
+    return SimpleNamespace(frames=frames, on_finish=finished)
+
+
+def snapshot_path(trace: dict) -> str:
+    return os.path.join(TRACES_DIR, f"{trace['name']}.frames.json")
+
+
+async def check_snapshots(traces: List[dict], update: bool) -> bool:
+    """Compare emitted frames and the on_finish payload against snapshots."""
+    ok = True
+    for trace in traces:
+        output = await translate(trace, deterministic=True)
+        snapshot = {"frames": output.frames, "on_finish": output.on_finish}
+        path = snapshot_path(trace)
+
+        if update or not os.path.exists(path):
+            with open(path, "w") as f:
+                json.dump(snapshot, f, indent=2, ensure_ascii=False)
+                f.write("\n")
+            print(f"{trace['name']}: snapshot written")
+            continue
+
+        with open(path) as f:
+            expected = json.load(f)
+        if expected == snapshot:
+            print(f"{trace['name']}: ok")
+            continue
+
+        ok = False
+        print(f"{trace['name']}: MISMATCH")
+        for i, (want, got) in enumerate(zip(expected["frames"], snapshot["frames"])):
+            if want != got:
+                print(f"  frame {i}:\n    expected {want!r}\n    got      {got!r}")
+                break
+        else:
+            if len(expected["frames"]) != len(snapshot["frames"]):
+                print(f"  expected {len(expected['frames'])} frames, got {len(snapshot['frames'])}")
+            else:
+                print("  on_finish payload differs")
+    return ok
+
+
+async def measure(trace: dict, min_time: float) -> dict:
+    """Time a trace and measure its memory behaviour."""
+    events = len(trace["events"])
+
+    # Warm up, and size the output
+    output = await translate(trace)
+    output_bytes = sum(len(frame.encode()) for frame in output.frames)
+
+    iterations = 0
+    started = time.perf_counter()
+    while True:
+        await translate(trace)
+        iterations += 1
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_time:
+            break
+
+    # tracemalloc slows execution down, so it runs separately from timing
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    tracemalloc.reset_peak()
+    baseline, _ = tracemalloc.get_traced_memory()
+    await translate(trace)
+    _, peak = tracemalloc.get_traced_memory()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    allocated_blocks = sum(
+        stat.count_diff for stat in after.compare_to(before, "lineno") if stat.count_diff > 0
+    )
+
+    return {
+        "events": events,
+        "frames": len(output.frames),
+        "iterations": iterations,
+        "events_per_s": round(events * iterations / elapsed),
+        "us_per_event": round(elapsed / (events * iterations) * 1e6, 2),
+        "peak_bytes_per_event": round((peak - baseline) / events, 1),
+        "retained_blocks_per_event": round(allocated_blocks / events, 2),
+        "output_bytes": output_bytes,
+    }
+
+
+async def replay(args: argparse.Namespace) -> int:
+    traces = [load_trace(p) for p in trace_paths(args.traces)]
+    if not traces:
+        print("No traces found")
+        return 1
+    if not await check_snapshots(traces, update=False):
+        print("\nSnapshot check failed; run `check --update` if the change is intended")
+        return 1
+
+    results = {}
+    for trace in traces:
+        results[trace["name"]] = await measure(trace, args.min_time)
+
+    print(f"\n{'trace':<20} {'events':>7} {'frames':>7} {'events/s':>10} {'us/event':>9} "
+          f"{'peak B/ev':>10} {'blocks/ev':>10} {'out bytes':>10}")
+    for name, r in results.items():
+        print(
+            f"{name:<20} {r['events']:>7} {r['frames']:>7} {r['events_per_s']:>10} "
+            f"{r['us_per_event']:>9} {r['peak_bytes_per_event']:>10} "
+            f"{r['retained_blocks_per_event']:>10} {r['output_bytes']:>10}"
+        )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+            f.write("\n")
+    return 0
+
+
+async def record(args: argparse.Namespace) -> int:
+    """Record a live agent.stream_async run as a trace."""
+    from dotenv import load_dotenv
+    from strands.experimental import config_to_agent
+
+    from api.utils.prompt import ClientMessage
+
+    load_dotenv(".env.local")
+    agent = config_to_agent(
+        config=args.config,
+        tools=["strands_tools.current_time", "strands_tools.calculator", "api/utils/tools.py"],
+        callback_handler=None,
+    )
+    message = ClientMessage(
+        id=f"msg-{uuid.uuid4().hex}",
+        role="user",
+        parts=[{"type": "text", "text": args.prompt}],
+    )
+    events = [
+        project_event(event)
+        async for event in agent.stream_async([{"text": args.prompt}])
+    ]
+
+    path = os.path.join(TRACES_DIR, f"{args.name}.json")
+    with open(path, "w") as f:
+        json.dump(
+            {"messages": [message.model_dump(exclude_none=True)], "events": events},
+            f,
+            indent=2,
+            ensure_ascii=False,
+            default=str,
+        )
+        f.write("\n")
+    print(f"Recorded {len(events)} events to {path}")
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.translator",
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    replay_parser = commands.add_parser("replay", help="Check snapshots and time each trace")
+    replay_parser.add_argument("traces", nargs="*", help="Trace names (default: all)")
+    replay_parser.add_argument("--min-time", type=float, default=1.0,
+                               help="Seconds to replay each trace for")
+    replay_parser.add_argument("--output", help="Write results as JSON")
+
+    check_parser = commands.add_parser("check", help="Compare output against snapshots")
+    check_parser.add_argument("traces", nargs="*", help="Trace names (default: all)")
+    check_parser.add_argument("--update", action="store_true", help="Rewrite the snapshots")
+
+    record_parser = commands.add_parser("record", help="Record a live agent run")
+    record_parser.add_argument("--name", required=True)
+    record_parser.add_argument("--prompt", required=True)
+    record_parser.add_argument("--config", default="api/config/default_agent.json")
+
+    args = parser.parse_args()
+    if args.command == "replay":
+        return asyncio.run(replay(args))
+    if args.command == "check":
+        traces = [load_trace(p) for p in trace_paths(args.traces)]
+        return 0 if asyncio.run(check_snapshots(traces, args.update)) else 1
+    return asyncio.run(record(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
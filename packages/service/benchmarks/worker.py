@@ -0,0 +1,48 @@
+"""Benchmark worker process.
+
+Runs api.index:app under uvicorn with the Bedrock model replaced by
+FakeModel. The harness starts this module as a subprocess so that the
+worker's RSS can be sampled on its own; the model script is passed as
+JSON in BENCH_FAKE_MODEL.
+
+    python -m benchmarks.worker --port 8765
+"""
+
+import argparse
+import json
+import os
+
+import uvicorn
+
+from .fake_model import FakeModel
+
+
+def install_fake_model(model_config: dict) -> None:
+    """Make every chat agent use FakeModel instead of the configured model."""
+    from api.routes import agent as agent_routes
+
+    create_agent_with_session = agent_routes.create_agent_with_session
+
+    def create_agent_with_fake_model(conversation_id: str, *args, **kwargs):
+        agent = create_agent_with_session(conversation_id, *args, **kwargs)
+        agent.model = FakeModel(**model_config)
+        return agent
+
+    agent_routes.create_agent_with_session = create_agent_with_fake_model
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    install_fake_model(json.loads(os.environ.get("BENCH_FAKE_MODEL", "{}")))
+
+    from api.index import app
+
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+"""add_parse_status_to_file_uploads
+
+Revision ID: b8e1f0c2d4a7
+Revises: 7c5da4272a92
+Create Date: 2026-10-18 09:12:41.538204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8e1f0c2d4a7'
+down_revision: Union[str, Sequence[str], None] = '7c5da4272a92'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Existing documents were parsed during upload
+    op.add_column('file_uploads', sa.Column('parse_status', sqlmodel.sql.sqltypes.AutoString(length=20), nullable=False, server_default='completed'))
+    op.create_index(op.f('ix_file_uploads_parse_status'), 'file_uploads', ['parse_status'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_file_uploads_parse_status'), table_name='file_uploads')
+    op.drop_column('file_uploads', 'parse_status')
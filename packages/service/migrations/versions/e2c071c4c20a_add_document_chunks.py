@@ -0,0 +1,43 @@
+"""add_document_chunks
+
+Revision ID: e2c071c4c20a
+Revises: f2c6d8a1e935
+Create Date: 2026-10-19 00:10:22.245975
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2c071c4c20a'
+down_revision: Union[str, Sequence[str], None] = 'f2c6d8a1e935'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Existing documents are chunked the first time a message uses them
+    op.create_table('document_chunks',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('file_uuid', sa.Uuid(), nullable=False),
+    sa.Column('position', sa.Integer(), nullable=False),
+    sa.Column('content', sa.Text(), nullable=False),
+    sa.Column('token_count', sa.Integer(), nullable=False),
+    sa.Column('term_count', sa.Integer(), nullable=False),
+    sa.Column('term_freqs', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.ForeignKeyConstraint(['file_uuid'], ['file_uploads.uuid'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('file_uuid', 'position')
+    )
+    op.create_index('ix_document_chunks_term_freqs', 'document_chunks', ['term_freqs'], unique=False, postgresql_using='gin')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_document_chunks_term_freqs', table_name='document_chunks', postgresql_using='gin')
+    op.drop_table('document_chunks')
@@ -0,0 +1,47 @@
+"""add_file_blobs
+
+Revision ID: e4a9c3d17b52
+Revises: b8e1f0c2d4a7
+Create Date: 2026-10-18 23:31:06.114522
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4a9c3d17b52'
+down_revision: Union[str, Sequence[str], None] = 'b8e1f0c2d4a7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('file_blobs',
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('sha256', sqlmodel.sql.sqltypes.AutoString(length=64), nullable=False),
+    sa.Column('s3_key', sqlmodel.sql.sqltypes.AutoString(length=500), nullable=False),
+    sa.Column('size', sa.Integer(), nullable=False),
+    sa.Column('mime_type', sqlmodel.sql.sqltypes.AutoString(length=100), nullable=False),
+    sa.Column('markdown_content', sa.Text(), nullable=True),
+    sa.Column('ref_count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_file_blobs_sha256'), 'file_blobs', ['sha256'], unique=True)
+    # Existing uploads keep their own objects and are not hashed
+    op.add_column('file_uploads', sa.Column('content_sha256', sqlmodel.sql.sqltypes.AutoString(length=64), nullable=True))
+    op.create_index(op.f('ix_file_uploads_content_sha256'), 'file_uploads', ['content_sha256'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_file_uploads_content_sha256'), table_name='file_uploads')
+    op.drop_column('file_uploads', 'content_sha256')
+    op.drop_index(op.f('ix_file_blobs_sha256'), table_name='file_blobs')
+    op.drop_table('file_blobs')
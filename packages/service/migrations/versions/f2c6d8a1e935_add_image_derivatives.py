@@ -0,0 +1,36 @@
+"""add_image_derivatives
+
+Revision ID: f2c6d8a1e935
+Revises: e4a9c3d17b52
+Create Date: 2026-10-19 00:12:47.902316
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2c6d8a1e935'
+down_revision: Union[str, Sequence[str], None] = 'e4a9c3d17b52'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Existing images have no derivative and are compressed when used
+    for table in ('file_blobs', 'file_uploads'):
+        op.add_column(table, sa.Column('derivative_s3_key', sqlmodel.sql.sqltypes.AutoString(length=500), nullable=True))
+        op.add_column(table, sa.Column('derivative_mime_type', sqlmodel.sql.sqltypes.AutoString(length=100), nullable=True))
+        op.add_column(table, sa.Column('derivative_size', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in ('file_uploads', 'file_blobs'):
+        op.drop_column(table, 'derivative_size')
+        op.drop_column(table, 'derivative_mime_type')
+        op.drop_column(table, 'derivative_s3_key')